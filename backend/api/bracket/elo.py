@@ -0,0 +1,104 @@
+"""
+Elo ratings.
+
+A side with rating r1 is expected to score 1 / (1 + 10 ** ((r2 - r1) / 400))
+against a side rated r2, and after the match both move by K times the
+difference between what the first side scored (1 for a win, 0.5 for a tie, 0
+for a loss) and what it was expected to. A side of several players is rated
+as the mean of its players, and every player of the side moves by the side's
+change.
+
+replay_ratings() recomputes every rating from a whole match history at once.
+Elo is sequential, but two matches only depend on each other through shared
+players, so the history is cut into layers: each match goes one layer after
+the latest match of any of its players. Matches within a layer have no
+player in common and are rated together with NumPy, giving exactly the
+ratings of playing the matches one by one in order.
+
+Like engine.py, nothing here touches Django.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+
+
+def expected_score(rating, opponent):
+    return 1 / (1 + 10 ** ((np.asarray(opponent) - np.asarray(rating)) / 400))
+
+
+def rating_change(rating1, rating2, outcome, k=K_FACTOR):
+    """Change to the first side's rating; the second side moves by the negative."""
+    return k * (np.asarray(outcome) - expected_score(rating1, rating2))
+
+
+@dataclass(frozen=True)
+class Replay:
+    # Per player
+    ratings: np.ndarray = field(repr=False)
+    matches_played: np.ndarray = field(repr=False)
+    # Per match, the change applied to side 1 (NaN for a match missing a side)
+    changes: np.ndarray = field(repr=False)
+
+
+def _layers(num_players, member_match, member_player, num_matches):
+    """Layer of every match; member arrays must be sorted by match."""
+    bounds = np.searchsorted(member_match, np.arange(num_matches + 1)).tolist()
+    players = member_player.tolist()
+    last = [0] * num_players
+    layers = [0] * num_matches
+    for match in range(num_matches):
+        group = players[bounds[match]:bounds[match + 1]]
+        layer = 1 + max([last[player] for player in group], default=0)
+        layers[match] = layer
+        for player in group:
+            last[player] = layer
+    return np.array(layers, dtype=np.int64)
+
+
+def replay_ratings(num_players, member_match, member_player, member_side, outcomes,
+                   initial=INITIAL_RATING, k=K_FACTOR):
+    """
+    Rate a match history from scratch. Matches are numbered 0 to
+    len(outcomes) - 1 in the order they were played, outcomes holding what
+    side 1 scored. Each member row puts player member_player on side 1 or 2
+    (member_side) of match member_match. Returns a Replay.
+    """
+    outcomes = np.asarray(outcomes, dtype=np.float64)
+    num_matches = len(outcomes)
+    member_match = np.asarray(member_match, dtype=np.int64)
+    member_player = np.asarray(member_player, dtype=np.int64)
+    second = np.asarray(member_side) == 2
+
+    order = np.argsort(member_match, kind='stable')
+    member_match, member_player, second = member_match[order], member_player[order], second[order]
+
+    # Members grouped by layer, still in match order within each layer
+    layers = _layers(num_players, member_match, member_player, num_matches)
+    order = np.argsort(layers[member_match], kind='stable')
+    member_match, member_player, second = member_match[order], member_player[order], second[order]
+    bounds = np.searchsorted(layers[member_match], np.arange(1, layers.max(initial=0) + 2))
+
+    ratings = np.full(num_players, initial, dtype=np.float64)
+    changes = np.full(num_matches, np.nan)
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        matches, players, sides = member_match[start:end], member_player[start:end], second[start:end]
+        starts = np.r_[True, matches[1:] != matches[:-1]]
+        local = np.cumsum(starts) - 1
+        count = int(local[-1]) + 1
+        slots = local * 2 + sides
+
+        totals = np.bincount(slots, weights=ratings[players], minlength=2 * count).reshape(count, 2)
+        sizes = np.bincount(slots, minlength=2 * count).reshape(count, 2)
+        means = totals / np.maximum(sizes, 1)
+        change = rating_change(means[:, 0], means[:, 1], outcomes[matches[starts]], k)
+        change[(sizes == 0).any(axis=1)] = np.nan
+
+        rated = ~np.isnan(change[local])
+        ratings[players[rated]] += np.where(sides, -change[local], change[local])[rated]
+        changes[matches[starts]] = change
+
+    played = np.bincount(member_player[~np.isnan(changes[member_match])], minlength=num_players)
+    return Replay(ratings=ratings, matches_played=played, changes=changes)
@@ -0,0 +1,168 @@
+"""
+Pure bracket planning.
+
+Nothing in this module touches Django. Each planner takes plain team records
+and returns an immutable tuple of PlannedMatch objects describing the rows the
+Generate* mutations should write, so pairing logic can be exercised and
+benchmarked without a database.
+"""
+import random
+from dataclasses import dataclass
+
+from .seeding import first_round_pairs
+
+
+@dataclass(frozen=True)
+class TeamEntry:
+    team_id: int
+    # First participant of the team, used to fill MatchParticipant rows
+    participant_id: int = None
+
+
+@dataclass(frozen=True)
+class PlannedSide:
+    team_number: int
+    team_id: int
+    participant_id: int
+
+
+@dataclass(frozen=True)
+class PlannedMatch:
+    round: int
+    seed: int
+    court: str
+    status: str = "Scheduled"
+    bracket_type: str = "winners"
+    score1: str = "0"
+    score2: str = "0"
+    sides: tuple = ()
+    # Scheduled start and end; the tournament's dates when not set
+    start_date: object = None
+    end_date: object = None
+
+    @property
+    def is_bye(self):
+        return self.status == "Bye"
+
+
+def shuffled(entries, rng=None):
+    """
+    Entries in a random order drawn from rng, a random.Random, so a seeded
+    source gives the same bracket every time; the random module by default.
+    """
+    entries = list(entries)
+    (rng or random).shuffle(entries)
+    return entries
+
+
+def random_source(random_seed):
+    """A random.Random seeded with random_seed, or None (the random module) when it is None."""
+    return None if random_seed is None else random.Random(random_seed)
+
+
+def _sides(*entries):
+    # Teams without a participant cannot be linked to a MatchParticipant row
+    return tuple(
+        PlannedSide(team_number=number, team_id=entry.team_id, participant_id=entry.participant_id)
+        for number, entry in enumerate(entries, start=1)
+        if entry is not None and entry.participant_id is not None
+    )
+
+
+def bye_match(entry, round_number, seed, bracket_type="winners"):
+    """A bye: the lone team advances without playing."""
+    return PlannedMatch(
+        round=round_number,
+        seed=seed,
+        court="Bye",
+        status="Bye",
+        bracket_type=bracket_type,
+        score1="N/A",
+        score2="N/A",
+        sides=_sides(entry),
+    )
+
+
+def head_to_head(entry1, entry2, round_number, seed, court, bracket_type="winners"):
+    """A scheduled match between two teams, entry1 playing as team 1."""
+    return PlannedMatch(
+        round=round_number,
+        seed=seed,
+        court=court,
+        bracket_type=bracket_type,
+        sides=_sides(entry1, entry2),
+    )
+
+
+def plan_swiss_round(entries, round_number=1):
+    """
+    A Swiss round pairing adjacent entries. With an odd count the last entry
+    (the lowest ranked once entries are sorted by record) receives the bye.
+    """
+    entries = list(entries)
+    planned = []
+
+    if len(entries) % 2 == 1:
+        bye_entry = entries.pop()
+        planned.append(bye_match(bye_entry, round_number, seed=len(entries) + 1, bracket_type="swiss"))
+
+    for i in range(0, len(entries) - 1, 2):
+        seed = i // 2 + 1
+        planned.append(
+            head_to_head(entries[i], entries[i + 1], round_number, seed, f"Court {seed}", bracket_type="swiss"))
+
+    return tuple(planned)
+
+
+def plan_round_robin(entries):
+    """
+    Full round robin schedule using the circle method: n teams play n - 1
+    rounds (n rounded up to even) of n / 2 matches each.
+    """
+    entries = list(entries)
+    n = len(entries)
+
+    # If odd number of teams, add a "BYE" placeholder that sits out each round
+    if n % 2 == 1:
+        n += 1
+    team_indices = list(range(n))
+    if n != len(entries):
+        team_indices[-1] = None
+
+    planned = []
+    seed = 1
+    for round_number in range(1, n):
+        for i in range(n // 2):
+            team1_idx = team_indices[i]
+            team2_idx = team_indices[n - 1 - i]
+            if team1_idx is None or team2_idx is None:
+                continue
+
+            planned.append(head_to_head(
+                entries[team1_idx], entries[team2_idx], round_number, seed, f"Court {seed}"))
+            seed += 1
+
+        # Keep the first team fixed and rotate the rest
+        team_indices = [team_indices[0]] + [team_indices[-1]] + team_indices[1:-1]
+
+    return tuple(planned)
+
+
+def plan_seeded_elimination(entries, round_number, bracket_type="winners"):
+    """
+    First elimination round for entries ranked best to worst, on the standard
+    bracket positions of seeding.py: the top seeds can only meet late, and
+    every bye goes to a top seed in this round, so no later round needs one.
+    Matches are numbered in bracket order, winner of 1 against winner of 2.
+    """
+    entries = list(entries)
+    planned = []
+    for i, (high_seed, low_seed) in enumerate(first_round_pairs(len(entries))):
+        if low_seed is None:
+            planned.append(bye_match(entries[high_seed], round_number, seed=i + 1, bracket_type=bracket_type))
+        else:
+            planned.append(head_to_head(
+                entries[high_seed], entries[low_seed], round_number, i + 1, f"Court {i + 1}",
+                bracket_type=bracket_type))
+
+    return tuple(planned)
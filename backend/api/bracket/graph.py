@@ -0,0 +1,145 @@
+"""
+Double elimination brackets as a graph of match slots.
+
+The whole bracket is laid out when the tournament starts: every match that can
+be played is a slot, and each slot says where its winner and its loser go next
+(a slot key and the side they fill there). Advancing after a result is then a
+matter of following those two edges, with no need to work out the state of
+the bracket from the matches played so far.
+
+For n teams the bracket is padded to N = 2**k positions with k = ceil(log2 n):
+
+- winners bracket: k rounds of N/2, N/4, ..., 1 slots, seeded as in
+  seeding.py so that seed 1 and seed 2 can only meet in the final; byes go
+  to the top seeds
+- losers bracket: 2(k - 1) rounds. Round 1 pairs the losers of winners
+  round 1; every even round takes the losers of the next winners round on
+  side 2 (in reverse order every other time, to keep rematches apart), and
+  the odd rounds after round 1 halve the field
+- championship: the winners bracket champion on side 1 against the losers
+  bracket champion on side 2, and a reset slot played only if side 2 wins
+
+Each side also records whether a team will ever reach it, so slots left with
+one team by byes pass it straight through and slots with none are never
+played. Like engine.py, nothing here touches Django.
+"""
+from dataclasses import dataclass
+
+from .seeding import bracket_size, seed_order
+
+WINNERS = "winners"
+LOSERS = "losers"
+CHAMPIONSHIP = "championship"
+
+
+@dataclass(frozen=True)
+class PlannedSlot:
+    # (bracket type, round within that bracket, position), unique in a bracket
+    key: tuple
+    bracket_type: str
+    # Match round, counted across brackets from first_round
+    round: int
+    # 1-based position within the round, used as the match seed
+    position: int
+    # Entries placed before the first match, for winners bracket round 1
+    entries: tuple = (None, None)
+    # Whether a team will ever arrive at each side
+    expects: tuple = (True, True)
+    # (slot key, side) pairs, or None
+    winner_to: tuple = None
+    loser_to: tuple = None
+    # Only played if the team on side 2 of the slot feeding it wins
+    if_necessary: bool = False
+
+    @property
+    def is_bye(self):
+        return self.expects.count(True) == 1
+
+    @property
+    def is_dead(self):
+        return not any(self.expects)
+
+
+def plan_double_elimination_graph(entries, first_round=1):
+    """
+    Every slot of a double elimination bracket for entries ranked best to
+    worst, ordered by round. Raises an Exception for fewer than two entries.
+    """
+    entries = list(entries)
+    if len(entries) < 2:
+        raise Exception("At least two teams are required for a double elimination bracket.")
+
+    size = bracket_size(len(entries))
+    levels = size.bit_length() - 1
+    losers_rounds = 2 * (levels - 1)
+    championship = (CHAMPIONSHIP, 1, 1)
+    reset = (CHAMPIONSHIP, 2, 1)
+
+    slots = {}
+
+    def add(key, bracket_type, round_number, **fields):
+        slots[key] = dict(
+            key=key, bracket_type=bracket_type, round=round_number, position=key[2],
+            entries=[None, None], expects=[False, False], winner_to=None, loser_to=None, if_necessary=False)
+        slots[key].update(fields)
+
+    # Winners bracket
+    for level in range(1, levels + 1):
+        for index in range(size >> level):
+            key = (WINNERS, level, index + 1)
+            winner_to = (WINNERS, level + 1, index // 2 + 1), index % 2 + 1
+            if level == levels:
+                winner_to = championship, 1
+
+            if levels == 1:
+                loser_to = championship, 2
+            elif level == 1:
+                loser_to = (LOSERS, 1, index // 2 + 1), index % 2 + 1
+            else:
+                count = size >> level
+                position = count - index if level % 2 == 0 else index + 1
+                loser_to = (LOSERS, 2 * (level - 1), position), 2
+            add(key, WINNERS, first_round + level - 1, winner_to=winner_to, loser_to=loser_to)
+
+    # Losers bracket
+    for level in range(1, losers_rounds + 1):
+        count = size >> ((level + 1) // 2 + 1)
+        for index in range(count):
+            key = (LOSERS, level, index + 1)
+            if level == losers_rounds:
+                winner_to = championship, 2
+            elif level % 2 == 1:
+                winner_to = (LOSERS, level + 1, index + 1), 1
+            else:
+                winner_to = (LOSERS, level + 1, index // 2 + 1), index % 2 + 1
+            add(key, LOSERS, first_round + level, winner_to=winner_to)
+
+    add(championship, CHAMPIONSHIP, first_round + 2 * levels - 1, winner_to=(reset, 1), loser_to=(reset, 2))
+    add(reset, CHAMPIONSHIP, first_round + 2 * levels, if_necessary=True)
+
+    # Seed the first round; positions past the last entry are byes
+    order = seed_order(size)
+    for index in range(size // 2):
+        slot = slots[(WINNERS, 1, index + 1)]
+        for side, seed in enumerate(order[2 * index:2 * index + 2]):
+            if seed < len(entries):
+                slot['entries'][side] = entries[seed]
+                slot['expects'][side] = True
+
+    # Work out which sides will ever be filled, in round order so every
+    # slot is final before it feeds the next
+    ordered = sorted(slots.values(), key=lambda slot: (slot['round'], slot['bracket_type'] != WINNERS, slot['key']))
+    for slot in ordered:
+        if slot['if_necessary']:
+            continue
+        has_winner = any(slot['expects'])
+        has_loser = all(slot['expects'])
+        for edge, present in ((slot['winner_to'], has_winner), (slot['loser_to'], has_loser)):
+            if edge is not None:
+                target, side = edge
+                slots[target]['expects'][side - 1] = slots[target]['expects'][side - 1] or present
+
+    return tuple(
+        PlannedSlot(**{**slot, 'entries': tuple(slot['entries']), 'expects': tuple(slot['expects'])})
+        for slot in ordered
+    )
@@ -0,0 +1,65 @@
+"""
+Persistence for planned matches.
+
+Generated rounds and schedules are written with one bulk insert for the Match
+rows and one for their MatchParticipant rows, inside a single transaction, so
+a failure never leaves half a bracket behind.
+"""
+import logging
+
+from django.db import transaction
+
+from ..logs import traced
+from ..models import Match, MatchParticipant, score_value
+from ..snapshot import bump_bracket_version
+
+logger = logging.getLogger(__name__)
+
+
+def persist_plan(tournament, plan):
+    """
+    Save a sequence of PlannedMatch objects for the tournament and return the
+    created Match rows in plan order.
+    """
+    plan = list(plan)
+    if not plan:
+        return []
+
+    matches = [
+        Match(
+            tournament=tournament,
+            start_date=planned.start_date or tournament.start_date,
+            end_date=planned.end_date or tournament.end_date,
+            status=planned.status,
+            court=planned.court,
+            seed=planned.seed,
+            round=planned.round,
+            score1=planned.score1,
+            score2=planned.score2,
+            # bulk_create skips Match.save(), so the integer scores are set
+            # here; planned matches are never completed and have no winner
+            score1_value=score_value(planned.score1),
+            score2_value=score_value(planned.score2),
+            bracket_type=planned.bracket_type,
+        )
+        for planned in plan
+    ]
+
+    with traced(logger, "Plan saved", tournament=tournament.tournament_id, matches=len(matches)), transaction.atomic():
+        # Primary keys are set on the instances by bulk_create on PostgreSQL
+        # and SQLite, which lets the participant rows point at them directly
+        Match.objects.bulk_create(matches)
+        MatchParticipant.objects.bulk_create([
+            MatchParticipant(
+                match_id=match,
+                participant_id_id=side.participant_id,
+                team_number=side.team_number,
+                team_id_id=side.team_id,
+            )
+            for match, planned in zip(matches, plan)
+            for side in planned.sides
+        ])
+        # bulk_create sends no signals, so invalidate the bracket snapshot here
+        bump_bracket_version(tournament.tournament_id)
+
+    return matches
@@ -0,0 +1,217 @@
+"""
+Whole tournaments played out without a database.
+
+play_out pairs the entries with the same planners the Generate* mutations use
+and decides every match with a score model, round after round, until the
+tournament is over. It returns the PlannedMatch objects in the order the
+mutations would have created them, with scores and statuses filled in, so
+fixtures.py can bulk insert fully played tournaments.
+
+Every random choice is drawn from the random.Random passed in, so the same
+seed always plays the same tournament. Like engine.py, nothing here touches
+Django.
+"""
+import math
+from dataclasses import dataclass, replace
+
+from .engine import bye_match, head_to_head, plan_round_robin, plan_seeded_elimination, plan_swiss_round
+from .graph import plan_double_elimination_graph
+from .swiss import SwissPlayer, pair_swiss, plan_swiss_pairing
+from .tiebreaks import compute_swiss_standings
+
+SINGLE_ELIMINATION = "Single Elimination"
+DOUBLE_ELIMINATION = "Double Elimination"
+ROUND_ROBIN = "Round Robin"
+SWISS = "Swiss System"
+ROUND_ROBIN_TO_SINGLE_ELIMINATION = "Round Robin to Single Elimination"
+ROUND_ROBIN_TO_DOUBLE_ELIMINATION = "Round Robin to Double Elimination"
+FORMATS = (
+    SINGLE_ELIMINATION, DOUBLE_ELIMINATION, ROUND_ROBIN, SWISS,
+    ROUND_ROBIN_TO_SINGLE_ELIMINATION, ROUND_ROBIN_TO_DOUBLE_ELIMINATION)
+
+
+def _margin(rng, winner_first):
+    # Winner's score and a lower loser's score, never a tie
+    winner = rng.randint(15, 25)
+    loser = rng.randint(0, winner - 1)
+    return (winner, loser) if winner_first else (loser, winner)
+
+
+def random_scores(rng, strength1, strength2):
+    """Either team wins with even odds."""
+    return _margin(rng, rng.random() < 0.5)
+
+
+def strength_scores(rng, strength1, strength2):
+    """Team 1 wins with the Elo expectation of its strength over team 2's."""
+    return _margin(rng, rng.random() < 1 / (1 + 10 ** ((strength2 - strength1) / 400)))
+
+
+def favourite_scores(rng, strength1, strength2):
+    """The stronger team always wins; team 1 on equal strength."""
+    return _margin(rng, strength1 >= strength2)
+
+
+# Name -> function (rng, strength1, strength2) -> (score1, score2)
+SCORE_MODELS = {
+    "random": random_scores,
+    "strength": strength_scores,
+    "favourite": favourite_scores,
+}
+
+
+@dataclass(frozen=True)
+class PlayedSlot:
+    # A double elimination PlannedSlot with the entries that reached it and
+    # the index of its match in the played matches, if it was played
+    slot: object
+    entry1: object = None
+    entry2: object = None
+    match: int = None
+
+
+def swiss_rounds(num_entries):
+    """Rounds needed to leave a single unbeaten team."""
+    return max(1, math.ceil(math.log2(num_entries)))
+
+
+class _Playout:
+    def __init__(self, entries, strengths, rng, score_model):
+        self.entries = {entry.team_id: entry for entry in entries}
+        self.strengths = strengths
+        self.rng = rng
+        self.score = SCORE_MODELS[score_model]
+        self.matches = []
+
+    def play(self, planned):
+        """Score a planned match and return (winner, loser) entries; byes return (entry, None)."""
+        if planned.is_bye:
+            self.matches.append(planned)
+            return self.entries[planned.sides[0].team_id], None
+        side1, side2 = planned.sides
+        score1, score2 = self.score(self.rng, self.strengths[side1.team_id], self.strengths[side2.team_id])
+        self.matches.append(replace(planned, status="Completed", score1=str(score1), score2=str(score2)))
+        entry1, entry2 = self.entries[side1.team_id], self.entries[side2.team_id]
+        return (entry1, entry2) if score1 > score2 else (entry2, entry1)
+
+
+def play_out(format, entries, strengths, rng, score_model="strength", rounds=None):
+    """
+    Play a tournament of entries (TeamEntry objects, in draw order) to the
+    end. strengths maps a team id to the strength the score model reads.
+    rounds limits Swiss tournaments, swiss_rounds() by default. Returns
+    (matches, slots): the played PlannedMatch objects and, for the double
+    elimination formats, a PlayedSlot for every slot of the bracket.
+    """
+    if format not in FORMATS:
+        raise Exception(f"Unknown format {format}, expected one of {', '.join(FORMATS)}.")
+    if score_model not in SCORE_MODELS:
+        raise Exception(f"Unknown score model {score_model}, expected one of {', '.join(SCORE_MODELS)}.")
+    entries = list(entries)
+    if len(entries) < 2:
+        raise Exception("At least two teams are required to play a tournament.")
+
+    playout = _Playout(entries, strengths, rng, score_model)
+    slots = ()
+    if format == SINGLE_ELIMINATION:
+        _single_elimination(playout, entries)
+    elif format == DOUBLE_ELIMINATION:
+        slots = _double_elimination(playout, entries)
+    elif format == ROUND_ROBIN:
+        for planned in plan_round_robin(entries):
+            playout.play(planned)
+    elif format == SWISS:
+        _swiss(playout, entries, rounds or swiss_rounds(len(entries)))
+    elif format == ROUND_ROBIN_TO_SINGLE_ELIMINATION:
+        _single_elimination(playout, _round_robin_stage(playout, entries, "winners"), first_round=2)
+    else:
+        slots = _double_elimination(playout, _round_robin_stage(playout, entries, "round_robin"), first_round=2)
+    return tuple(playout.matches), slots
+
+
+def _round_robin_stage(playout, entries, bracket_type):
+    """
+    Play the round robin stage of a two stage tournament, all in round 1, and
+    return the entries ranked by wins, as GenerateRoundRobinTo*Elimination
+    ranks them (the score models never tie, so points follow wins).
+    """
+    wins = {}
+    for planned in plan_round_robin(entries):
+        winner, loser = playout.play(replace(planned, round=1, bracket_type=bracket_type))
+        for side in playout.matches[-1].sides:
+            wins.setdefault(side.team_id, 0)
+        wins[winner.team_id] += 1
+    return [playout.entries[team_id] for team_id in sorted(wins, key=lambda team_id: -wins[team_id])]
+
+
+def _single_elimination(playout, entries, first_round=1):
+    # The seeded first round gives every bye, so later rounds pair the
+    # winners in match order, as GenerateNextRound does
+    winners = [playout.play(planned)[0] for planned in plan_seeded_elimination(entries, round_number=first_round)]
+    round_number = first_round
+    while len(winners) > 1:
+        round_number += 1
+        winners = [
+            playout.play(head_to_head(winners[i], winners[i + 1], round_number, i // 2 + 1, f"Court {i // 2 + 1}"))[0]
+            for i in range(0, len(winners) - 1, 2)
+        ]
+
+
+def _double_elimination(playout, entries, first_round=1):
+    # Slots come in round order and edges only point at later rounds, so one
+    # pass plays the bracket, moving teams along like slots._resolve_slots
+    planned_slots = plan_double_elimination_graph(entries, first_round)
+    by_key = {slot.key: slot for slot in planned_slots}
+    arrived = {slot.key: list(slot.entries) for slot in planned_slots}
+    played = []
+    for slot in planned_slots:
+        entry1, entry2 = arrived[slot.key]
+        if slot.is_dead or (entry1 is None and entry2 is None):
+            played.append(PlayedSlot(slot))
+            continue
+
+        index = len(playout.matches)
+        if slot.is_bye:
+            winner, loser = playout.play(
+                bye_match(entry1 or entry2, slot.round, seed=slot.position, bracket_type=slot.bracket_type))
+        else:
+            winner, loser = playout.play(head_to_head(
+                entry1, entry2, slot.round, slot.position, f"Court {slot.position}", bracket_type=slot.bracket_type))
+        played.append(PlayedSlot(slot, entry1, entry2, index))
+
+        # The bracket reset is only played if the winners bracket champion lost
+        if slot.winner_to is not None and by_key[slot.winner_to[0]].if_necessary and winner is entry1:
+            continue
+        for edge, entry in ((slot.winner_to, winner), (slot.loser_to, loser)):
+            if edge is not None and entry is not None:
+                arrived[edge[0]][edge[1] - 1] = entry
+    return tuple(played)
+
+
+def _swiss(playout, entries, rounds):
+    team_ids = [entry.team_id for entry in entries]
+    results, byes, played = [], [], {}
+    for round_number in range(1, rounds + 1):
+        if round_number == 1:
+            planned = plan_swiss_round(entries)
+        else:
+            standings = compute_swiss_standings(team_ids, results, byes)
+            pairing = pair_swiss(
+                [
+                    SwissPlayer(entry=playout.entries[standing.team_id], score=standing.score, had_bye=standing.byes > 0)
+                    for standing in standings
+                ],
+                played,
+            )
+            planned = plan_swiss_pairing(pairing, round_number)
+
+        for match in planned:
+            winner, loser = playout.play(match)
+            if loser is None:
+                byes.append(winner.team_id)
+                continue
+            result = playout.matches[-1]
+            team1, team2 = (side.team_id for side in result.sides)
+            results.append((team1, team2, int(result.score1), int(result.score2)))
+            played.setdefault(team1, set()).add(team2)
+            played.setdefault(team2, set()).add(team1)
@@ -0,0 +1,99 @@
+"""
+Shared lookups used when setting up a round.
+
+Each helper costs a single query however many teams the tournament has.
+"""
+from django.db.models import OuterRef, Subquery
+
+from ..models import MatchParticipant, Participant, Team
+from .engine import TeamEntry
+from .tiebreaks import compute_swiss_standings
+
+
+def _first_participant():
+    return Participant.objects.filter(team_id=OuterRef('pk')).order_by('participant_id').values('participant_id')[:1]
+
+
+def teams_with_first_participant(tournament):
+    """Teams of the tournament annotated with first_participant_id (None for empty teams)."""
+    return Team.objects.filter(tournament_id=tournament).annotate(first_participant_id=Subquery(_first_participant()))
+
+
+def first_participant_ids(tournament, team_ids=None):
+    """Map of team_id to the id of its first participant, for teams that have one (limited to team_ids if given)."""
+    teams = teams_with_first_participant(tournament)
+    if team_ids is not None:
+        teams = teams.filter(team_id__in=team_ids)
+    rows = teams.filter(first_participant_id__isnull=False).values_list('team_id', 'first_participant_id')
+    return dict(rows)
+
+
+def team_entries(teams, participant_ids=None, require_participant=True):
+    """
+    Engine records for the given teams in order. Teams are either annotated by
+    teams_with_first_participant or looked up in participant_ids. Teams with no
+    participant are dropped unless require_participant is False.
+    """
+    entries = []
+    for team in teams:
+        if participant_ids is None:
+            participant_id = team.first_participant_id
+        else:
+            participant_id = participant_ids.get(team.team_id)
+        if participant_id is None and require_participant:
+            continue
+        entries.append(TeamEntry(team_id=team.team_id, participant_id=participant_id))
+    return entries
+
+
+def played_opponents(tournament):
+    """Map of team_id to the set of team_ids it has met in any match of the tournament."""
+    sides = MatchParticipant.objects.filter(match_id__tournament=tournament).exclude(
+        match_id__status="Bye").values_list('match_id', 'team_id')
+
+    teams_by_match = {}
+    for match_id, team_id in sides:
+        teams_by_match.setdefault(match_id, set()).add(team_id)
+
+    opponents = {}
+    for teams in teams_by_match.values():
+        for team_id in teams:
+            opponents.setdefault(team_id, set()).update(teams - {team_id})
+    return opponents
+
+
+def _results_and_byes(tournament, up_to_round=None):
+    sides = MatchParticipant.objects.filter(
+        match_id__tournament=tournament, match_id__status__in=["Completed", "Bye"])
+    if up_to_round is not None:
+        sides = sides.filter(match_id__round__lte=up_to_round)
+    rows = sides.values_list(
+        'match_id', 'match_id__status', 'team_number', 'team_id', 'match_id__score1_value', 'match_id__score2_value')
+
+    matches = {}
+    byes = []
+    for match_id, status, team_number, team_id, score1, score2 in rows:
+        if status == "Bye":
+            byes.append(team_id)
+            continue
+        if score1 is None or score2 is None:
+            continue
+        match = matches.setdefault(match_id, [None, None, score1, score2])
+        match[team_number - 1] = team_id
+    results = [tuple(match) for match in matches.values() if None not in match[:2]]
+    return results, byes
+
+
+def match_results(tournament):
+    """(team1_id, team2_id, score1, score2) of every completed match of the tournament with both teams."""
+    return _results_and_byes(tournament)[0]
+
+
+def swiss_standings(tournament, up_to_round=None):
+    """
+    Ranked tiebreak standings (see tiebreaks.py) for every team of the
+    tournament, from one bulk fetch of its completed matches and byes.
+    """
+    results, byes = _results_and_byes(tournament, up_to_round)
+    team_ids = Team.objects.filter(tournament_id=tournament).values_list('team_id', flat=True)
+    return compute_swiss_standings(team_ids, results, byes)
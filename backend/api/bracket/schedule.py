@@ -0,0 +1,130 @@
+"""
+Court and time slot assignment.
+
+The venue day is cut into slots of slot_minutes between opening and closing
+time, and every slot has one place per court. Matches are placed greedily,
+slot by slot and in the order given (for a round robin, round by round), on
+the first free court: a match goes in the earliest slot where both its teams
+are free and have sat out rest_slots slots since their last match. Filling
+every court of a slot before moving on keeps the schedule compact, and since
+each team's rounds are placed in order its idle time stays short.
+
+The same placement re-solves a schedule part way through the day: teams and
+courts still busy with matches that have started (or are overrunning) are
+passed in with the time they are free, and only matches yet to start move.
+Like engine.py, nothing here touches Django.
+"""
+from dataclasses import dataclass, replace
+from datetime import datetime, time, timedelta
+
+
+@dataclass(frozen=True)
+class Venue:
+    courts: int
+    slot_minutes: int
+    opens: time
+    closes: time
+    # Slots a team sits out between two of its matches
+    rest_slots: int = 0
+
+
+@dataclass(frozen=True)
+class CourtSlot:
+    # 1-based court number
+    court: int
+    start: datetime
+    end: datetime
+
+
+class SlotGrid:
+    """Slot indexes to start times and back, counting from the day of `start`."""
+
+    def __init__(self, venue, start):
+        if venue.courts < 1:
+            raise Exception("At least one court is required to schedule matches.")
+        self.length = timedelta(minutes=venue.slot_minutes)
+        self.first_day = start.date()
+        self.opens = venue.opens
+        self.tzinfo = start.tzinfo
+        day = datetime.combine(self.first_day, venue.closes) - datetime.combine(self.first_day, venue.opens)
+        self.per_day = day // self.length if venue.slot_minutes > 0 else 0
+        if self.per_day < 1:
+            raise Exception("The venue must be open for at least one slot a day.")
+
+    def start_of(self, index):
+        day, slot = divmod(index, self.per_day)
+        opening = datetime.combine(self.first_day + timedelta(days=day), self.opens, tzinfo=self.tzinfo)
+        return opening + slot * self.length
+
+    def first_at(self, moment):
+        """Index of the first slot starting at or after moment."""
+        day = (moment.date() - self.first_day).days
+        if day < 0:
+            return 0
+        opening = datetime.combine(moment.date(), self.opens, tzinfo=self.tzinfo)
+        slot = max(0, -(-(moment - opening) // self.length))
+        if slot >= self.per_day:
+            return (day + 1) * self.per_day
+        return day * self.per_day + slot
+
+
+def schedule_matches(pairs, venue, start, team_free_at=None, court_free_at=None):
+    """
+    A CourtSlot for each (team1_id, team2_id) pair, in the same order, with
+    no match starting before `start`. team_free_at and court_free_at map team
+    ids and court numbers to the time they are free, for teams and courts
+    still busy with matches that are not being rescheduled.
+    """
+    grid = SlotGrid(venue, start)
+    first_slot = grid.first_at(start)
+    rest = venue.rest_slots
+
+    # Slot from which each team and court can next be used
+    team_ready = {}
+    for team_id, free_at in (team_free_at or {}).items():
+        team_ready[team_id] = grid.first_at(free_at) + rest
+    court_ready = [first_slot] * venue.courts
+    for court, free_at in (court_free_at or {}).items():
+        if 1 <= court <= venue.courts:
+            court_ready[court - 1] = max(first_slot, grid.first_at(free_at))
+
+    # Matches still to place, as a linked list so placing one is O(1) and a
+    # slot's scan stops as soon as its courts are full
+    count = len(pairs)
+    following = list(range(1, count + 1))
+    head = 0
+    remaining = count
+    placed = [None] * count
+    slot = first_slot
+    while remaining:
+        courts = [court for court in range(venue.courts) if court_ready[court] <= slot]
+        start_time = grid.start_of(slot)
+        previous, index = None, head
+        while courts and index < count:
+            teams = pairs[index]
+            if any(team_ready.get(team_id, slot) > slot for team_id in teams):
+                previous = index
+            else:
+                placed[index] = CourtSlot(court=courts.pop(0) + 1, start=start_time, end=start_time + grid.length)
+                for team_id in teams:
+                    team_ready[team_id] = slot + 1 + rest
+                if previous is None:
+                    head = following[index]
+                else:
+                    following[previous] = following[index]
+                remaining -= 1
+            index = following[index]
+        slot += 1
+
+    return placed
+
+
+def schedule_plan(plan, venue, start):
+    """The PlannedMatch objects of plan with their court, start and end filled in."""
+    plan = list(plan)
+    pairs = [tuple(side.team_id for side in planned.sides) for planned in plan]
+    slots = schedule_matches(pairs, venue, start)
+    return tuple(
+        replace(planned, court=f"Court {slot.court}", start_date=slot.start, end_date=slot.end)
+        for planned, slot in zip(plan, slots)
+    )
@@ -0,0 +1,61 @@
+"""
+Standard bracket seeding.
+
+Entries ranked best to worst are placed on the N = 2**k positions of a
+bracket so that, if the better seed always wins, seeds 1 and 2 only meet in
+the final, the top four only in the semifinals, and so on. Each first round
+match pairs seed s with seed N + 1 - s.
+
+A field that is not a power of two fills the bracket with empty positions.
+Those are always the lowest seeds, so every bye goes to a top seed, and all
+of them come in the first round. The first round always has N / 2 matches
+(a bye counts as a match), which leaves a power of two teams in every later
+round and no byes after the first.
+
+The position orders of brackets of up to MAX_TABLE_SIZE entrants are worked
+out once at import; larger brackets are computed on demand. Like engine.py,
+nothing here touches Django.
+"""
+MAX_TABLE_SIZE = 4096
+
+
+def _orders(max_size):
+    orders = {1: (0,)}
+    order, size = [0], 1
+    while size < max_size:
+        size *= 2
+        # Each position of the smaller bracket splits into its seed and the
+        # seed it would meet in the new first round
+        order = [seed for s in order for seed in (s, size - 1 - s)]
+        orders[size] = tuple(order)
+    return orders
+
+
+# Bracket size -> seed indexes in position order, e.g. (0, 3, 1, 2) for 4
+SEED_ORDERS = _orders(MAX_TABLE_SIZE)
+
+
+def bracket_size(num_entries):
+    size = 1
+    while size < num_entries:
+        size *= 2
+    return size
+
+
+def seed_order(size):
+    """Seed indexes in bracket position order, e.g. [0, 3, 1, 2] for 4."""
+    if size in SEED_ORDERS:
+        return list(SEED_ORDERS[size])
+    return list(_orders(size)[size])
+
+
+def first_round_pairs(num_entries):
+    """
+    (seed, seed) index pairs of the first round in bracket position order,
+    the better seed first; the second is None for a bye.
+    """
+    order = seed_order(bracket_size(num_entries))
+    return [
+        (high, low if low < num_entries else None)
+        for high, low in ((min(pair), max(pair)) for pair in zip(order[0::2], order[1::2]))
+    ]
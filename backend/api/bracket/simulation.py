@@ -0,0 +1,349 @@
+"""
+Monte Carlo tournament simulation.
+
+Teams get Bradley-Terry strengths fitted to the completed results, so team i
+beats team j with probability s_i / (s_i + s_j). The rest of the tournament
+is then played out many times at once: every simulator works on arrays with
+one row per simulated tournament, so a round of matches is a handful of NumPy
+operations whatever the number of simulations.
+
+The simulators follow the pairing rules the bracket generators use:
+
+- knockout: the current round's winners meet in seed order (1v2, 3v4, ...)
+  with the odd team out getting a bye, as GenerateNextRound pairs single
+  elimination rounds; a seeded start uses the bracket positions of
+  seeding.py, as plan_seeded_elimination does
+- slot graph: double elimination brackets laid out by graph.py, following
+  each slot's winner and loser edges, including the bracket reset
+- Swiss: teams paired by score from the top, the lowest getting the bye. This
+  leaves out the rematch avoidance of pair_swiss, which cannot be vectorized
+- round robin: every remaining match played once
+
+Each simulator returns a (simulations, teams) array of how far each team got
+(the round it was knocked out in, or its score); more is better and the
+champion gets infinity. places() turns that into finishing places.
+
+Like engine.py, nothing here touches Django.
+"""
+import multiprocessing
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .seeding import first_round_pairs
+
+# Virtual games each team plays against an average team, keeping the
+# strengths of teams with few or one-sided results finite
+PRIOR_GAMES = 2.0
+# Upper bound on simulations x teams held in memory at once
+CHUNK_CELLS = 2_000_000
+
+
+def fit_strengths(num_teams, first, second, first_points, iterations=200, prior_games=PRIOR_GAMES):
+    """
+    Bradley-Terry strengths by minorization-maximization. first and second
+    are team indexes of completed matches, first_points 1 for a win of first,
+    0.5 for a tie and 0 for a loss.
+    """
+    first = np.asarray(first, dtype=np.int64)
+    second = np.asarray(second, dtype=np.int64)
+    first_points = np.asarray(first_points, dtype=np.float64)
+
+    wins = np.bincount(first, weights=first_points, minlength=num_teams) + \
+        np.bincount(second, weights=1 - first_points, minlength=num_teams) + prior_games / 2
+    strengths = np.ones(num_teams)
+    for _ in range(iterations):
+        per_game = 1 / (strengths[first] + strengths[second])
+        denominator = np.bincount(first, weights=per_game, minlength=num_teams) + \
+            np.bincount(second, weights=per_game, minlength=num_teams) + prior_games / (strengths + 1)
+        updated = wins / denominator
+        updated /= np.exp(np.log(updated).mean())
+        if np.allclose(updated, strengths, rtol=1e-9, atol=0):
+            break
+        strengths = updated
+    return strengths
+
+
+def win_matrix(strengths):
+    """P[i, j], the probability that team i beats team j."""
+    strengths = np.asarray(strengths, dtype=np.float64)
+    return strengths[:, None] / (strengths[:, None] + strengths[None, :])
+
+
+def _play(rng, P, first, second):
+    """Winners and losers of first v second, elementwise; -1 teams lose to anyone and -1 v -1 gives -1."""
+    present1, present2 = first >= 0, second >= 0
+    beats = rng.random(first.shape) < P[np.maximum(first, 0), np.maximum(second, 0)]
+    first_wins = present1 & (beats | ~present2)
+    return np.where(first_wins, first, second), np.where(first_wins, second, first)
+
+
+def _eliminate(reached, losers, round_number):
+    rows = np.nonzero(losers >= 0)
+    reached[rows[0], losers[rows]] = round_number
+
+
+def places(reached):
+    """0-based finishing places from how far each team got; teams level share the better place."""
+    sims, teams = reached.shape
+    ranks = np.array(reached, dtype=np.float64)
+    finite = ranks[np.isfinite(ranks)]
+    low, high = (finite.min(), finite.max()) if finite.size else (0.0, 0.0)
+    ranks[np.isposinf(ranks)] = high + 1
+    ranks[np.isneginf(ranks)] = low - 1
+    ranks -= low - 1
+
+    # Place = number of teams that got strictly further. One searchsorted
+    # covers every row once each row is shifted past the one before it.
+    offsets = (np.arange(sims) * (high - low + 3))[:, None]
+    ordered = (np.sort(ranks, axis=1) + offsets).ravel()
+    at = np.searchsorted(ordered, (ranks + offsets).ravel(), side='right').reshape(sims, teams)
+    return teams - (at - np.arange(sims)[:, None] * teams)
+
+
+def _ranking(rng, scores):
+    """Team indexes best first by score, ties broken at random."""
+    # Scores move in steps of at least half a point, so noise below that
+    # only reorders level teams
+    return np.argsort(rng.random(scores.shape) * 0.5 - scores, axis=1)
+
+
+@dataclass(frozen=True)
+class KnockoutState:
+    # Matches of the current round in seed order as (team1, team2, winner)
+    # team indexes; team2 is -1 for a bye and winner -1 while undecided
+    matches: tuple
+    round: int
+    # How far every team has already got (see reached in the module docstring)
+    reached: np.ndarray = field(repr=False, default=None)
+
+
+def _knockout_rounds(rng, P, alive, reached, round_number):
+    while alive.shape[1] > 1:
+        pairs = alive.shape[1] // 2
+        winners, losers = _play(rng, P, alive[:, 0:2 * pairs:2], alive[:, 1:2 * pairs:2])
+        _eliminate(reached, losers, round_number)
+        alive = np.concatenate([winners, alive[:, 2 * pairs:]], axis=1)
+        round_number += 1
+    rows = np.nonzero(alive[:, 0] >= 0)[0]
+    reached[rows, alive[rows, 0]] = np.inf
+    return reached
+
+
+def simulate_knockout(rng, P, state, sims):
+    reached = np.tile(state.reached, (sims, 1))
+    columns = []
+    for team1, team2, winner in state.matches:
+        if winner >= 0 or team2 < 0:
+            columns.append(np.full(sims, winner if winner >= 0 else team1))
+            continue
+        winners, losers = _play(rng, P, np.full(sims, team1), np.full(sims, team2))
+        _eliminate(reached, losers, state.round)
+        columns.append(winners)
+    alive = np.stack(columns, axis=1)
+    return _knockout_rounds(rng, P, alive, reached, state.round + 1)
+
+
+def _seeded_knockout(rng, P, ranked, reached, round_number):
+    """Knockout from a seeded start, as plan_seeded_elimination lays it out."""
+    columns = []
+    for high, low in first_round_pairs(ranked.shape[1]):
+        if low is None:
+            columns.append(ranked[:, high])
+            continue
+        winners, losers = _play(rng, P, ranked[:, high], ranked[:, low])
+        _eliminate(reached, losers, round_number)
+        columns.append(winners)
+    return _knockout_rounds(rng, P, np.stack(columns, axis=1), reached, round_number + 1)
+
+
+@dataclass(frozen=True)
+class GraphState:
+    # Slots in round order as dicts with the keys of PlannedSlot plus team1,
+    # team2 and winner team indexes (-1 when unknown); edges are slot indexes
+    slots: tuple
+    reached: np.ndarray = field(repr=False, default=None)
+
+
+def graph_slots(planned, teams=None, winners=None):
+    """
+    GraphState slots for PlannedSlot objects: edges become slot indexes, and
+    teams and winners map a slot key to its (team1, team2) indexes and winner.
+    """
+    index = {slot.key: position for position, slot in enumerate(planned)}
+    slots = []
+    for slot in planned:
+        team1, team2 = (teams or {}).get(slot.key, (-1, -1))
+        slots.append({
+            'round': slot.round,
+            'expects': slot.expects,
+            'entries': slot.entries,
+            'if_necessary': slot.if_necessary,
+            'winner_to': (index[slot.winner_to[0]], slot.winner_to[1]) if slot.winner_to else None,
+            'loser_to': (index[slot.loser_to[0]], slot.loser_to[1]) if slot.loser_to else None,
+            'team1': team1,
+            'team2': team2,
+            'winner': (winners or {}).get(slot.key, -1),
+        })
+    return tuple(slots)
+
+
+def _simulate_slots(rng, P, slots, sides, reached):
+    """Play out a slot graph; sides[i] holds the (2, sims) team arrays of slot i."""
+    sims = reached.shape[0]
+    for index, slot in enumerate(slots):
+        if not any(slot['expects']):
+            continue
+        first, second = sides[index]
+        if slot['winner'] >= 0:
+            winners = np.full(sims, slot['winner'])
+            losers = np.where(first == winners, second, first)
+        else:
+            winners, losers = _play(rng, P, first, second)
+
+        reset = slot['winner_to'] is not None and slots[slot['winner_to'][0]]['if_necessary']
+        # The bracket reset is only played where the side 2 team won
+        played_on = (winners != first) if reset else np.ones(sims, dtype=bool)
+        for edge, teams, moves in ((slot['winner_to'], winners, played_on), (slot['loser_to'], losers, played_on)):
+            if edge is not None:
+                target, side = edge
+                sides[target][side - 1] = np.where(moves, teams, sides[target][side - 1])
+
+        # A loser with nowhere to go is out; so is the losers bracket
+        # champion when the reset is not needed
+        eliminated = losers if slot['loser_to'] is None else np.where(played_on, -1, losers)
+        _eliminate(reached, eliminated, slot['round'])
+        if slot['winner_to'] is None or reset:
+            champions = winners if slot['winner_to'] is None else np.where(played_on, -1, winners)
+            rows = np.nonzero(champions >= 0)[0]
+            reached[rows, champions[rows]] = np.inf
+    return reached
+
+
+def _slot_sides(slots, sims):
+    return [
+        [np.full(sims, slot['team1']), np.full(sims, slot['team2'])]
+        for slot in slots
+    ]
+
+
+def simulate_graph(rng, P, state, sims):
+    reached = np.tile(state.reached, (sims, 1))
+    return _simulate_slots(rng, P, state.slots, _slot_sides(state.slots, sims), reached)
+
+
+def _seeded_graph(rng, P, slots, ranked, reached):
+    """A slot graph whose first round is seeded from ranked (sims, teams); slot entries are seed indexes."""
+    sims = ranked.shape[0]
+    sides = _slot_sides(slots, sims)
+    for index, slot in enumerate(slots):
+        for side, seed in enumerate(slot['entries']):
+            if seed is not None:
+                sides[index][side] = ranked[:, seed]
+    return _simulate_slots(rng, P, slots, sides, reached)
+
+
+@dataclass(frozen=True)
+class LeagueState:
+    # Current scores of every team and the matches still to play as
+    # (team1, team2) index pairs; teams not taking part have -inf
+    scores: np.ndarray = field(repr=False)
+    remaining: tuple = ()
+    # Swiss rounds still to pair after the remaining matches
+    swiss_rounds: int = 0
+    # What follows the round robin: None, "single" or "double" elimination
+    then: str = None
+    # Slot graph planned for the double elimination stage, entries as seeds
+    stage_slots: tuple = ()
+    stage_round: int = 2
+
+
+def _wins(winners, teams):
+    """(sims, teams) count of each team in the rows of winners."""
+    sims = winners.shape[0]
+    flat = (winners + np.arange(sims)[:, None] * teams).ravel()
+    return np.bincount(flat, minlength=sims * teams).reshape(sims, teams)
+
+
+def simulate_league(rng, P, state, sims):
+    scores = np.tile(state.scores, (sims, 1))
+    rows = np.arange(sims)
+    if state.remaining:
+        pairs = np.asarray(state.remaining, dtype=np.int64)
+        winners, _ = _play(rng, P, np.tile(pairs[:, 0], (sims, 1)), np.tile(pairs[:, 1], (sims, 1)))
+        scores += _wins(winners, scores.shape[1])
+
+    playing = int(np.isfinite(state.scores).sum())
+    for _ in range(state.swiss_rounds):
+        ranked = _ranking(rng, scores)[:, :playing]
+        pairs = playing // 2
+        winners, _ = _play(rng, P, ranked[:, 0:2 * pairs:2], ranked[:, 1:2 * pairs:2])
+        scores += _wins(winners, scores.shape[1])
+        if playing % 2:
+            scores[rows, ranked[:, playing - 1]] += 1
+
+    if state.then is None:
+        # Level scores are split at random rather than sharing a place
+        return scores + rng.random(scores.shape) * 0.5
+
+    ranked = _ranking(rng, scores)[:, :playing]
+    reached = np.where(np.isfinite(scores), 0.0, -np.inf)
+    if state.then == "single":
+        return _seeded_knockout(rng, P, ranked, reached, state.stage_round)
+    return _seeded_graph(rng, P, state.stage_slots, ranked, reached)
+
+
+SIMULATORS = {
+    KnockoutState: simulate_knockout,
+    GraphState: simulate_graph,
+    LeagueState: simulate_league,
+}
+
+
+@dataclass(frozen=True)
+class Probabilities:
+    simulations: int
+    # Per team index
+    win: np.ndarray
+    top_two: np.ndarray
+    top_four: np.ndarray
+    expected_place: np.ndarray
+
+
+def _run_chunk(P, state, sims, seed):
+    rng = np.random.default_rng(seed)
+    finished = places(SIMULATORS[type(state)](rng, P, state, sims))
+    return (
+        (finished == 0).sum(axis=0),
+        (finished < 2).sum(axis=0),
+        (finished < 4).sum(axis=0),
+        finished.sum(axis=0),
+    )
+
+
+def simulate(P, state, sims, seed=None, processes=1):
+    """
+    Play the rest of the tournament sims times and return Probabilities.
+    With processes > 1 the simulations are split across a process pool.
+    """
+    # Round robin matches still to play take a column each as well
+    width = P.shape[0] + len(getattr(state, 'remaining', ()))
+    chunk = max(1, min(sims, CHUNK_CELLS // width))
+    sizes = [chunk] * (sims // chunk) + ([sims % chunk] if sims % chunk else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(P, state, size, child) for size, child in zip(sizes, seeds)]
+
+    if processes and processes > 1 and len(tasks) > 1:
+        with multiprocessing.get_context("spawn").Pool(min(processes, len(tasks))) as pool:
+            results = pool.starmap(_run_chunk, tasks)
+    else:
+        results = [_run_chunk(*task) for task in tasks]
+
+    win, top_two, top_four, place_total = (sum(parts) for parts in zip(*results))
+    return Probabilities(
+        simulations=sims,
+        win=win / sims,
+        top_two=top_two / sims,
+        top_four=top_four / sims,
+        expected_place=place_total / sims + 1,
+    )
@@ -0,0 +1,162 @@
+"""
+Double elimination brackets stored as BracketSlot rows.
+
+create_bracket_slots writes the slot graph planned by graph.py when the
+tournament starts. From then on a completed match only touches its own slot
+and the one or two slots its edges point at: the winner and loser are placed
+there, and a slot whose teams have all arrived gets its match. Byes are
+decided as soon as they are created, so they cascade through in the same call.
+"""
+from itertools import groupby
+
+from django.db import transaction
+
+from ..models import BracketSlot
+from .engine import TeamEntry, bye_match, head_to_head
+from .graph import CHAMPIONSHIP, plan_double_elimination_graph
+from .persistence import persist_plan
+from .queries import first_participant_ids
+
+
+def create_bracket_slots(tournament, entries, first_round=1):
+    """
+    Lay out the double elimination bracket for entries ranked best to worst
+    and create its first matches. Returns the created Match rows.
+    """
+    planned = plan_double_elimination_graph(entries, first_round)
+
+    with transaction.atomic():
+        # Edges only point at later rounds, so creating the last round first
+        # means every slot's targets are saved before it is
+        rows = {}
+        for _, group in groupby(reversed(planned), key=lambda slot: slot.round):
+            batch = []
+            for slot in group:
+                entry1, entry2 = slot.entries
+                row = BracketSlot(
+                    tournament=tournament,
+                    bracket_type=slot.bracket_type,
+                    round=slot.round,
+                    position=slot.position,
+                    team1_id=entry1.team_id if entry1 else None,
+                    team2_id=entry2.team_id if entry2 else None,
+                    expects_team1=slot.expects[0],
+                    expects_team2=slot.expects[1],
+                    winner_to=rows[slot.winner_to[0]] if slot.winner_to else None,
+                    winner_to_side=slot.winner_to[1] if slot.winner_to else None,
+                    loser_to=rows[slot.loser_to[0]] if slot.loser_to else None,
+                    loser_to_side=slot.loser_to[1] if slot.loser_to else None,
+                    if_necessary=slot.if_necessary,
+                )
+                rows[slot.key] = row
+                batch.append(row)
+            BracketSlot.objects.bulk_create(batch)
+
+        first_slots = [rows[slot.key] for slot in planned if any(slot.entries)]
+        return _start_slots(tournament, [row.pk for row in first_slots])
+
+
+def _result(slot):
+    """(winner team id, loser team id) of a slot, or (None, None) if undecided."""
+    if slot.is_bye:
+        return slot.team1_id or slot.team2_id, None
+    if slot.match is None or slot.match.status != "Completed" or slot.match.winner_team_id is None:
+        return None, None
+    winner = slot.match.winner_team_id
+    loser = slot.team2_id if winner == slot.team1_id else slot.team1_id
+    return winner, loser
+
+
+def _resolve_slots(slots):
+    """Send the winners and losers of decided slots on; returns the ids of the slots they reach."""
+    placements = {}
+    resolved = []
+    for slot in slots:
+        winner, loser = _result(slot)
+        if winner is None:
+            continue
+        resolved.append(slot.pk)
+
+        # The bracket reset is only played if the winners bracket champion lost
+        if slot.winner_to is not None and slot.winner_to.if_necessary and winner == slot.team1_id:
+            continue
+        for target_id, side, team_id in (
+                (slot.winner_to_id, slot.winner_to_side, winner),
+                (slot.loser_to_id, slot.loser_to_side, loser)):
+            if target_id is not None and team_id is not None:
+                placements.setdefault(target_id, {})[f"team{side}_id"] = team_id
+
+    BracketSlot.objects.filter(pk__in=resolved).update(resolved=True)
+    # Each side is its own column, so two feeders filling one slot at the
+    # same time do not overwrite each other
+    for target_id, fields in placements.items():
+        BracketSlot.objects.filter(pk=target_id).update(**fields)
+    return list(placements)
+
+
+def _plan_slot(slot, participant_ids):
+    entries = [
+        TeamEntry(team_id, participant_ids.get(team_id)) if team_id is not None else None
+        for team_id in (slot.team1_id, slot.team2_id)
+    ]
+    if slot.is_bye:
+        entry = entries[0] or entries[1]
+        return bye_match(entry, slot.round, seed=slot.position, bracket_type=slot.bracket_type)
+    return head_to_head(
+        entries[0], entries[1], slot.round, slot.position, f"Court {slot.position}", bracket_type=slot.bracket_type)
+
+
+def _start_slots(tournament, slot_ids):
+    """Create the matches of the given slots that have all their teams, following byes through."""
+    created = []
+    while slot_ids:
+        # Locked so two results reaching the same slot cannot both start it
+        slots = [
+            slot for slot in BracketSlot.objects.select_for_update(of=('self',)).select_related('winner_to').filter(
+                pk__in=slot_ids, match__isnull=True).order_by('round', 'bracket_type', 'position')
+            if slot.is_ready and (slot.expects_team1 or slot.expects_team2)
+        ]
+        if not slots:
+            break
+
+        team_ids = {team_id for slot in slots for team_id in (slot.team1_id, slot.team2_id) if team_id}
+        participant_ids = first_participant_ids(tournament, team_ids)
+        matches = persist_plan(tournament, [_plan_slot(slot, participant_ids) for slot in slots])
+        for slot, match in zip(slots, matches):
+            slot.match = match
+        BracketSlot.objects.bulk_update(slots, ['match'])
+        created.extend(matches)
+
+        slot_ids = _resolve_slots([slot for slot in slots if slot.is_bye])
+    return created
+
+
+def is_advanced(match):
+    """Whether the teams of match have already been moved on from its slot."""
+    return BracketSlot.objects.filter(match=match, resolved=True).exists()
+
+
+def advance_match(tournament, match):
+    """Move the teams of a completed bracket match on. Returns the matches this starts."""
+    with transaction.atomic():
+        slots = BracketSlot.objects.select_related('match', 'winner_to').filter(match=match, resolved=False)
+        return _start_slots(tournament, _resolve_slots(slots))
+
+
+def advance_bracket(tournament):
+    """Move on every completed match not yet advanced. Returns the matches this starts."""
+    with transaction.atomic():
+        slots = BracketSlot.objects.select_related('match', 'winner_to').filter(
+            tournament=tournament, resolved=False, match__status="Completed").order_by('round')
+        return _start_slots(tournament, _resolve_slots(slots))
+
+
+def bracket_champion(tournament):
+    """The Team that won the bracket, or None while it is still being played."""
+    final, reset = BracketSlot.objects.select_related('match__winner_team').filter(
+        tournament=tournament, bracket_type=CHAMPIONSHIP).order_by('round')
+    if reset.resolved:
+        return reset.match.winner_team
+    if final.resolved and final.match.winner_team_id == final.team1_id:
+        return final.match.winner_team
+    return None
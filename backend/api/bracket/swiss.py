@@ -0,0 +1,176 @@
+"""
+Swiss pairing (Dutch system).
+
+Players are ranked by score and split into score groups. Within a group the
+top half plays the bottom half (1 v n/2+1, 2 v n/2+2, ...); a player who
+cannot be paired in their group floats down to the next one. Rematches are
+avoided by a backtracking search over that preference order, using an
+in-memory adjacency map of who has already played whom, so the only database
+work is loading the standings and the played pairs once per round. If no
+rematch-free pairing exists the search is repeated allowing rematches, which
+are then tried only after every fresh opponent.
+
+Like engine.py, nothing here touches Django.
+"""
+from dataclasses import dataclass
+
+from .engine import bye_match, head_to_head
+
+# Upper bound on search steps before giving up on a rematch-free pairing
+MAX_SEARCH_STEPS = 200000
+
+
+@dataclass(frozen=True)
+class SwissPlayer:
+    entry: object
+    score: float = 0
+    had_bye: bool = False
+
+
+@dataclass(frozen=True)
+class SwissPairing:
+    # (higher ranked, lower ranked) entries
+    pairs: tuple
+    bye: object = None
+    rematches: int = 0
+
+
+def _score_groups(players):
+    groups = []
+    for index, player in enumerate(players):
+        if not groups or players[groups[-1][0]].score != player.score:
+            groups.append([])
+        groups[-1].append(index)
+    return groups
+
+
+class _Search:
+    def __init__(self, players, played, allow_rematches, max_steps):
+        self.players = players
+        self.played = played
+        self.allow_rematches = allow_rematches
+        # Shared by every run, so trying several byes stays within budget
+        self.steps_left = max_steps
+        self.groups = _score_groups(players)
+        self.group_of = {}
+        for group_index, group in enumerate(self.groups):
+            for index in group:
+                self.group_of[index] = group_index
+
+    def has_played(self, a, b):
+        return self.players[b].entry.team_id in self.played.get(self.players[a].entry.team_id, ())
+
+    def candidates(self, top, paired):
+        """Opponents for the highest ranked unpaired player, most preferred first."""
+        group_index = self.group_of[top]
+        members = [index for index in self.groups[group_index] if index != top and not paired[index]]
+        # Top half against bottom half: the first unpaired player meets the
+        # first player of the bottom half, then the rest of the bottom half,
+        # then the top half from the bottom up
+        half = max((len(members) + 1) // 2 - 1, 0)
+        ordered = members[half:] + members[:half][::-1]
+
+        rematches = []
+        for index in ordered:
+            if not self.has_played(top, index):
+                yield index
+            elif self.allow_rematches:
+                rematches.append(index)
+
+        # Float down to the following score groups in rank order
+        for group in self.groups[group_index + 1:]:
+            for index in group:
+                if paired[index]:
+                    continue
+                if not self.has_played(top, index):
+                    yield index
+                elif self.allow_rematches:
+                    rematches.append(index)
+
+        yield from rematches
+
+    def run(self, excluded):
+        """Pairs of player indexes leaving out `excluded`, or None if none is found within the step budget."""
+        count = len(self.players)
+        paired = [False] * count
+        if excluded is not None:
+            paired[excluded] = True
+
+        # Each frame is [top, candidate iterator, current opponent]. Every
+        # player ranked above a frame's top is already paired.
+        stack = []
+        while True:
+            top = stack[-1][0] + 1 if stack else 0
+            while top < count and paired[top]:
+                top += 1
+            if top == count:
+                return [(frame[0], frame[2]) for frame in stack]
+
+            paired[top] = True
+            stack.append([top, self.candidates(top, paired), None])
+
+            # Find an opponent for the newest frame, backtracking into older
+            # frames when a player has no options left
+            while stack:
+                self.steps_left -= 1
+                if self.steps_left < 0:
+                    return None
+                frame = stack[-1]
+                if frame[2] is not None:
+                    paired[frame[2]] = False
+                    frame[2] = None
+                opponent = next(frame[1], None)
+                if opponent is not None:
+                    paired[opponent] = True
+                    frame[2] = opponent
+                    break
+                stack.pop()
+                paired[frame[0]] = False
+            else:
+                return None
+
+
+def _bye_candidates(players):
+    """Indexes eligible for the bye, lowest ranked first; players who already had one come last."""
+    order = list(range(len(players) - 1, -1, -1))
+    return [index for index in order if not players[index].had_bye] + \
+        [index for index in order if players[index].had_bye]
+
+
+def pair_swiss(players, played, max_steps=MAX_SEARCH_STEPS):
+    """
+    Pair SwissPlayer objects ranked best to worst. `played` maps a team id to
+    the set of team ids it has already met. With an odd count the lowest
+    ranked player without a previous bye sits out.
+    """
+    players = list(players)
+    if len(players) < 2:
+        return SwissPairing(pairs=(), bye=players[0].entry if players else None)
+
+    bye_options = _bye_candidates(players) if len(players) % 2 == 1 else [None]
+
+    for allow_rematches in (False, True):
+        search = _Search(players, played, allow_rematches, max_steps)
+        for excluded in bye_options:
+            pairs = search.run(excluded)
+            if pairs is None:
+                continue
+            rematches = sum(1 for a, b in pairs if search.has_played(a, b))
+            return SwissPairing(
+                pairs=tuple((players[a].entry, players[b].entry) for a, b in pairs),
+                bye=players[excluded].entry if excluded is not None else None,
+                rematches=rematches,
+            )
+
+    raise Exception("Could not pair Swiss round.")
+
+
+def plan_swiss_pairing(pairing, round_number):
+    """PlannedMatch objects for a pairing, numbered like plan_swiss_round."""
+    planned = []
+    if pairing.bye is not None:
+        planned.append(bye_match(pairing.bye, round_number, seed=len(pairing.pairs) * 2 + 1, bracket_type="swiss"))
+    for i, (entry1, entry2) in enumerate(pairing.pairs):
+        seed = i + 1
+        planned.append(head_to_head(entry1, entry2, round_number, seed, f"Court {seed}", bracket_type="swiss"))
+    return tuple(planned)
@@ -0,0 +1,123 @@
+"""
+Swiss standings with tiebreaks.
+
+All tiebreaks are computed together from one list of results using NumPy:
+each completed match becomes two rows (team, opponent, points scored against
+that opponent), and every tiebreak is a weighted sum over those rows.
+
+- score: 1 per win, 0.5 per tie, 1 per bye
+- Buchholz: sum of the opponents' scores
+- median Buchholz: Buchholz without the best and worst opponent (3+ games)
+- Sonneborn-Berger: sum of the opponents' scores weighted by the result
+  against each of them
+- OMW%: mean of the opponents' match win percentages, each floored at 1/3
+
+Like engine.py, nothing here touches Django.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+MIN_OPPONENT_WIN_PERCENTAGE = 1 / 3
+
+
+@dataclass(frozen=True)
+class SwissStanding:
+    team_id: int
+    rank: int
+    score: float
+    wins: int
+    losses: int
+    ties: int
+    byes: int
+    buchholz: float
+    median_buchholz: float
+    sonneborn_berger: float
+    opponent_win_percentage: float
+
+
+def compute_swiss_standings(team_ids, results, byes=()):
+    """
+    Ranked SwissStanding objects for team_ids. `results` holds
+    (team1_id, team2_id, score1, score2) tuples of completed matches and
+    `byes` the team id of every bye. Results of unknown teams are ignored.
+    """
+    team_ids = np.asarray(list(team_ids), dtype=np.int64)
+    count = len(team_ids)
+    if count == 0:
+        return []
+    order = np.argsort(team_ids)
+    sorted_ids = team_ids[order]
+
+    def positions(ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        found = np.searchsorted(sorted_ids, ids)
+        found = np.minimum(found, count - 1)
+        known = sorted_ids[found] == ids
+        return order[found], known
+
+    results = np.asarray(list(results), dtype=np.float64).reshape(-1, 4)
+    first, known_first = positions(results[:, 0].astype(np.int64))
+    second, known_second = positions(results[:, 1].astype(np.int64))
+    known = known_first & known_second
+    first, second, results = first[known], second[known], results[known]
+
+    points = np.sign(results[:, 2] - results[:, 3]) * 0.5 + 0.5
+    # One row per team and match: (team, opponent, points against opponent)
+    team = np.concatenate([first, second])
+    opponent = np.concatenate([second, first])
+    earned = np.concatenate([points, 1 - points])
+
+    bye_positions, known_byes = positions(list(byes))
+    bye_counts = np.bincount(bye_positions[known_byes], minlength=count)
+
+    games = np.bincount(team, minlength=count)
+    wins = np.bincount(team, weights=earned == 1, minlength=count)
+    ties = np.bincount(team, weights=earned == 0.5, minlength=count)
+    losses = games - wins - ties
+    score = np.bincount(team, weights=earned, minlength=count) + bye_counts
+
+    opponent_score = score[opponent]
+    buchholz = np.bincount(team, weights=opponent_score, minlength=count)
+    sonneborn_berger = np.bincount(team, weights=opponent_score * earned, minlength=count)
+
+    # Finite bounds to start from (no opponent scores below 0 or above the
+    # top score), so teams without games give no inf - inf
+    best = np.zeros(count)
+    worst = np.full(count, score.max(initial=0.0))
+    np.maximum.at(best, team, opponent_score)
+    np.minimum.at(worst, team, opponent_score)
+    median_buchholz = np.where(games >= 3, buchholz - best - worst, buchholz)
+
+    played = np.maximum(games + bye_counts, 1)
+    win_percentage = np.maximum(score / played, MIN_OPPONENT_WIN_PERCENTAGE)
+    opponent_win_total = np.bincount(team, weights=win_percentage[opponent], minlength=count)
+    opponent_win_percentage = np.divide(
+        opponent_win_total, games, out=np.zeros(count), where=games > 0)
+
+    # Best first; lexsort takes its primary key last
+    ranking = np.lexsort((
+        team_ids,
+        -opponent_win_percentage,
+        -sonneborn_berger,
+        -median_buchholz,
+        -buchholz,
+        -score,
+    ))
+
+    return [
+        SwissStanding(
+            team_id=int(team_ids[i]),
+            rank=rank,
+            score=float(score[i]),
+            wins=int(wins[i]),
+            losses=int(losses[i]),
+            ties=int(ties[i]),
+            byes=int(bye_counts[i]),
+            buchholz=float(buchholz[i]),
+            median_buchholz=float(median_buchholz[i]),
+            sonneborn_berger=float(sonneborn_berger[i]),
+            opponent_win_percentage=float(opponent_win_percentage[i]),
+        )
+        for rank, i in enumerate(ranking.tolist(), start=1)
+    ]
@@ -0,0 +1,84 @@
+"""
+Courts and times for a tournament's matches, using the venue stored on the
+Tournament and the placement in schedule.py.
+"""
+import re
+from datetime import timedelta
+
+from django.utils import timezone
+
+from ..models import Match
+from ..snapshot import bump_bracket_version
+from .schedule import Venue, schedule_matches, schedule_plan
+
+COURT_NUMBER = re.compile(r"^Court (\d+)$")
+
+
+def venue_for(tournament):
+    """The tournament's Venue, or None if it has no courts set."""
+    if not tournament.courts:
+        return None
+    return Venue(
+        courts=tournament.courts,
+        slot_minutes=tournament.slot_minutes,
+        opens=tournament.venue_opens,
+        closes=tournament.venue_closes,
+        rest_slots=tournament.rest_slots,
+    )
+
+
+def schedule_tournament_plan(tournament, plan):
+    """Plan with courts and times assigned from the tournament's start, or unchanged without a venue."""
+    venue = venue_for(tournament)
+    if venue is None:
+        return tuple(plan)
+    # Venue hours are local times
+    return schedule_plan(plan, venue, timezone.localtime(tournament.start_date))
+
+
+def reschedule_matches(tournament, now=None):
+    """
+    Move every match of the tournament that has not started yet to the
+    earliest court and time left, e.g. after a match overran, but never
+    before the tournament starts. Matches that have started keep their court
+    and teams until they end, or until the next slot if they are running
+    late. Returns the moved matches.
+    """
+    venue = venue_for(tournament)
+    if venue is None:
+        raise Exception("Set the number of courts before scheduling matches.")
+    now = timezone.localtime(now or timezone.now())
+    # Nothing is scheduled before the tournament starts
+    start = max(now, timezone.localtime(tournament.start_date))
+
+    matches = list(
+        Match.objects.filter(tournament=tournament).exclude(status__in=["Completed", "Bye"])
+        .prefetch_related('matchparticipant_set').order_by('start_date', 'round', 'seed'))
+
+    team_free_at, court_free_at = {}, {}
+    moving = []
+    for match in matches:
+        team_ids = tuple(side.team_id_id for side in sorted(match.matchparticipant_set.all(), key=lambda side: side.team_number))
+        if match.start_date >= now:
+            moving.append((match, team_ids))
+            continue
+        # A match running late is given until the next slot
+        free_at = match.end_date if match.end_date > now else now + timedelta(seconds=1)
+        for team_id in team_ids:
+            team_free_at[team_id] = max(team_free_at.get(team_id, free_at), free_at)
+        court = COURT_NUMBER.match(match.court)
+        if court:
+            number = int(court.group(1))
+            court_free_at[number] = max(court_free_at.get(number, free_at), free_at)
+
+    slots = schedule_matches([team_ids for _, team_ids in moving], venue, start, team_free_at, court_free_at)
+    moved = []
+    for (match, _), slot in zip(moving, slots):
+        match.court = f"Court {slot.court}"
+        match.start_date = slot.start
+        match.end_date = slot.end
+        moved.append(match)
+    # bulk_update sends no signals
+    Match.objects.bulk_update(moved, ['court', 'start_date', 'end_date'], batch_size=500)
+    bump_bracket_version(tournament.tournament_id)
+    return moved
@@ -0,0 +1,152 @@
+"""
+Live bracket updates for spectators.
+
+Mutations publish small diffs (a rescored match, the matches of a new round,
+a removed team) to a per-tournament channel once their transaction commits.
+The server-sent events view in backend/views.py streams a channel to each
+spectator, so clients apply the diff instead of refetching the whole bracket.
+
+The broker backend is pluggable through settings.BRACKET_EVENTS_BACKEND (a
+dotted path). The default InProcessBackend fans out within one ASGI worker;
+a multi-worker deployment needs a backend backed by a shared pub/sub service
+with the same publish/subscribe interface.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = "api.broadcast.InProcessBackend"
+# Events a slow subscriber may fall behind by before it is told to resync
+SUBSCRIBER_BUFFER = 100
+
+
+def channel_name(tournament_id):
+    return f"tournament:{tournament_id}"
+
+
+class Subscription:
+    """One subscriber's queue, living on the event loop that reads it."""
+
+    def __init__(self, backend, channel, loop):
+        self.backend = backend
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+
+    def deliver(self, message):
+        # Runs on self.loop
+        if self.queue.full():
+            # Too far behind for diffs to be useful, start over from a snapshot
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = {"type": "resync"}
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Next message, or None if timeout seconds pass first."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+def _deliver_all(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.deliver(message)
+
+
+class InProcessBackend:
+    """Fans messages out to the subscribers of this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, asyncio.get_running_loop())
+        with self.lock:
+            self.subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.channel]
+
+    def publish(self, channel, message):
+        """Deliver to every subscriber; safe to call from any thread."""
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+
+        # One wake-up per event loop rather than one per subscriber
+        by_loop = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, subscriptions in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, subscriptions, message)
+            except RuntimeError:
+                # The loop has been closed along with its subscribers
+                for subscription in subscriptions:
+                    self.unsubscribe(subscription)
+        return len(subscribers)
+
+    def subscriber_count(self, channel=None):
+        with self.lock:
+            if channel is not None:
+                return len(self.subscribers.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(getattr(settings, "BRACKET_EVENTS_BACKEND", DEFAULT_BACKEND))()
+    return _backend
+
+
+def publish_bracket_event(tournament_id, event_type, **data):
+    """Publish an event to the tournament's spectators after the current transaction commits."""
+    message = {"type": event_type, "tournament_id": int(tournament_id), **data}
+    transaction.on_commit(lambda: get_backend().publish(channel_name(tournament_id), message))
+
+
+def match_diffs(matches):
+    """The fields of each match spectators need, in the shape bracketSnapshot uses."""
+    matches = list(matches)
+    prefetch_related_objects(matches, 'matchparticipant_set__team_id')
+    return [
+        {
+            "match_id": match.match_id,
+            "round": match.round,
+            "bracket_type": match.bracket_type,
+            "seed": match.seed,
+            "court": match.court,
+            "status": match.status,
+            "score1": match.score1,
+            "score2": match.score2,
+            "verified": match.verified,
+            "winner_team_id": match.winner_team_id,
+            "teams": [
+                {"team_number": side.team_number, "team_id": side.team_id_id, "name": side.team_id.name}
+                for side in sorted(match.matchparticipant_set.all(), key=lambda side: side.team_number)
+            ],
+        }
+        for match in matches
+    ]
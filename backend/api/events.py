@@ -0,0 +1,105 @@
+"""
+In-process domain events.
+
+Mutations emit an event describing what happened (a match was scored) and
+return; handlers react to it on a background worker thread once the
+mutation's transaction has committed. Events are not persisted: if the process
+stops before a handler runs, GenerateNextRound still advances every completed
+match that has not been advanced yet.
+
+With settings.DOMAIN_EVENTS_ASYNC set to False handlers run on commit in the
+emitting thread instead, which is what the tests use.
+"""
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .bracket.slots import advance_match
+from .broadcast import match_diffs, publish_bracket_event
+from .logs import traced
+from .models import Match
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MatchCompleted:
+    tournament_id: int
+    match_id: int
+
+
+_handlers = {}
+
+
+def subscribe(event_type):
+    """Decorator registering a handler for events of event_type."""
+    def register(handler):
+        _handlers.setdefault(event_type, []).append(handler)
+        return handler
+    return register
+
+
+def dispatch(event):
+    for handler in _handlers.get(type(event), ()):
+        with traced(logger, "Event handled", event=type(event).__name__, handler=handler.__name__):
+            handler(event)
+
+
+class EventWorker:
+    """A single daemon thread handling events in the order they were emitted."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, event):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="domain-events", daemon=True)
+                self.thread.start()
+        self.queue.put(event)
+
+    def run(self):
+        while True:
+            event = self.queue.get()
+            close_old_connections()
+            try:
+                dispatch(event)
+            except Exception:
+                # A failed handler must not stop the events after it
+                logger.exception("Error handling %s", event)
+            finally:
+                close_old_connections()
+                self.queue.task_done()
+
+    def join(self):
+        """Wait until every submitted event has been handled."""
+        self.queue.join()
+
+
+worker = EventWorker()
+
+
+def emit(event):
+    """Handle event once the current transaction commits."""
+    if getattr(settings, "DOMAIN_EVENTS_ASYNC", True):
+        transaction.on_commit(lambda: worker.submit(event))
+    else:
+        transaction.on_commit(lambda: dispatch(event))
+
+
+@subscribe(MatchCompleted)
+def advance_bracket_slots(event):
+    """Start the matches waiting on this result, without waiting for the rest of its round."""
+    match = Match.objects.select_related('tournament').filter(pk=event.match_id).first()
+    if match is None:
+        return
+    with transaction.atomic():
+        matches = advance_match(match.tournament, match)
+        if matches:
+            publish_bracket_event(event.tournament_id, "matches_created", matches=match_diffs(matches))
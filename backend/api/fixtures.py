@@ -0,0 +1,247 @@
+"""
+Deterministic fixtures: fully played tournaments for tests and benchmarks.
+
+generate_fixtures creates users, tournaments, teams and participants and plays
+every tournament to the end with bracket/playout.py, then writes the matches,
+their participants, the double elimination slots and the team standings with
+bulk inserts. Every draw and score comes from one random.Random seeded with
+`seed`, and user emails and uuids are derived from the seed, so the same
+arguments always give the same rows and a benchmark or a failing test can be
+reproduced exactly.
+
+Tournaments are written in chunks of about CHUNK_TEAMS teams, each in its own
+transaction, which keeps memory flat however many teams are asked for. Run it
+with `python manage.py generate_fixtures`.
+"""
+import datetime
+import random
+import uuid
+from collections import defaultdict
+from itertools import groupby
+
+from django.db import transaction
+
+from .bracket.engine import TeamEntry, shuffled
+from .bracket.playout import DOUBLE_ELIMINATION, ROUND_ROBIN_TO_DOUBLE_ELIMINATION, play_out
+from .models import BracketSlot, Match, MatchParticipant, Participant, Team, TeamStanding, Tournament, User, score_value
+from .standings import NO_CHANGE, MatchResult
+
+CHUNK_TEAMS = 20000
+BATCH_SIZE = 2000
+# Fixed dates, so the rows do not depend on when they were generated
+START_DATE = datetime.datetime(2025, 1, 4, 9, 0, tzinfo=datetime.timezone.utc)
+# Spread of team strengths around the initial rating, for the score models
+STRENGTH_MEAN = 1500.0
+STRENGTH_DEVIATION = 200.0
+
+
+def _email(prefix, number):
+    return f"{prefix}-{number}@fixtures.example.com"
+
+
+def _user(prefix, number, name):
+    email = _email(prefix, number)
+    return User(
+        name=name,
+        email=email,
+        # Unusable, nobody logs in as a fixture user
+        password="!",
+        uuid=uuid.uuid5(uuid.NAMESPACE_DNS, email),
+        date_joined=START_DATE,
+    )
+
+
+def generate_fixtures(format, tournaments=1, teams=8, seed=0, score_model="strength", team_size=1, rounds=None):
+    """
+    Create `tournaments` fully played tournaments of `format` with `teams`
+    teams of `team_size` users each. rounds limits Swiss tournaments (see
+    playout.play_out). Returns the number of rows created per model name.
+    Raises an Exception if fixtures of this format and seed already exist.
+    """
+    if teams < 2:
+        raise Exception("At least two teams are required to play a tournament.")
+    if team_size < 1:
+        raise Exception("Teams need at least one participant.")
+    prefix = f"fixture-{seed}-{format.lower().replace(' ', '-')}"
+    if User.objects.filter(email=_email(prefix, 0)).exists():
+        raise Exception(f"{format} fixtures for seed {seed} already exist.")
+
+    rng = random.Random(seed)
+    counts = defaultdict(int)
+    organiser = _user(prefix, 0, f"Fixture organiser {seed}")
+    organiser.save()
+    counts["User"] += 1
+
+    per_chunk = max(1, CHUNK_TEAMS // teams)
+    for first in range(0, tournaments, per_chunk):
+        numbers = range(first, min(tournaments, first + per_chunk))
+        # One source per tournament, drawn in order, so a tournament's rows
+        # do not depend on the chunk it falls in
+        sources = [random.Random(rng.getrandbits(64)) for _ in numbers]
+        with transaction.atomic():
+            _create_chunk(
+                format, organiser, prefix, numbers, sources, teams, team_size, score_model, rounds, counts)
+    return dict(counts)
+
+
+def _create_chunk(format, organiser, prefix, numbers, sources, num_teams, team_size, score_model, rounds, counts):
+    tournaments = [
+        Tournament(
+            name=f"Fixture {format} {number + 1}",
+            start_date=START_DATE + datetime.timedelta(days=number),
+            end_date=START_DATE + datetime.timedelta(days=number, hours=10),
+            created_by=organiser,
+            format=format,
+            team_size=team_size,
+            max_teams=num_teams,
+            show_email=False,
+            show_phone=False,
+            is_private=False,
+            # The elimination stage has been generated
+            current_phase=2 if format == ROUND_ROBIN_TO_DOUBLE_ELIMINATION else 1,
+        )
+        for number in numbers
+    ]
+    Tournament.objects.bulk_create(tournaments, batch_size=BATCH_SIZE)
+
+    teams = [
+        Team(
+            name=f"Team {index + 1}",
+            tournament_id=tournament,
+            is_private=False,
+            created_by_uuid=organiser,
+        )
+        for tournament in tournaments
+        for index in range(num_teams)
+    ]
+    Team.objects.bulk_create(teams, batch_size=BATCH_SIZE)
+
+    # Users numbered across the whole run, after the organiser
+    per_tournament = num_teams * team_size
+    users = [
+        _user(prefix, 1 + number * per_tournament + index, f"Player {1 + number * per_tournament + index}")
+        for number in numbers
+        for index in range(per_tournament)
+    ]
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+    participants = [
+        Participant(user_id=user, tournament_id=team.tournament_id, team_id=team)
+        for team, user in zip((team for team in teams for _ in range(team_size)), users)
+    ]
+    Participant.objects.bulk_create(participants, batch_size=BATCH_SIZE)
+
+    matches, sides, slots, standings = [], [], [], []
+    for position, (tournament, rng) in enumerate(zip(tournaments, sources)):
+        tournament_teams = teams[position * num_teams:(position + 1) * num_teams]
+        first_participants = participants[position * num_teams * team_size::team_size][:num_teams]
+        # Engine entries use the team's index in the tournament as its id
+        entries = [TeamEntry(team_id=index, participant_id=index) for index in range(num_teams)]
+        strengths = [rng.gauss(STRENGTH_MEAN, STRENGTH_DEVIATION) for _ in entries]
+        played, played_slots = play_out(format, shuffled(entries, rng), strengths, rng, score_model, rounds)
+
+        rows = _match_rows(tournament, played, tournament_teams)
+        matches.extend(rows)
+        sides.extend(
+            (match, side.team_number, tournament_teams[side.team_id], first_participants[side.participant_id])
+            for match, planned in zip(rows, played)
+            for side in planned.sides
+        )
+        slots.append((tournament, tournament_teams, rows, played_slots))
+        standings.extend(_standings(played, tournament_teams))
+
+    Match.objects.bulk_create(matches, batch_size=BATCH_SIZE)
+    MatchParticipant.objects.bulk_create([
+        MatchParticipant(match_id=match, participant_id=participant, team_number=team_number, team_id=team)
+        for match, team_number, team, participant in sides
+    ], batch_size=BATCH_SIZE)
+    if format in (DOUBLE_ELIMINATION, ROUND_ROBIN_TO_DOUBLE_ELIMINATION):
+        counts["BracketSlot"] += _create_slots(slots)
+    TeamStanding.objects.bulk_create(standings, batch_size=BATCH_SIZE)
+
+    counts["Tournament"] += len(tournaments)
+    counts["Team"] += len(teams)
+    counts["User"] += len(users)
+    counts["Participant"] += len(participants)
+    counts["Match"] += len(matches)
+    counts["MatchParticipant"] += len(sides)
+    counts["TeamStanding"] += len(standings)
+
+
+def _match_rows(tournament, played, teams):
+    rows = []
+    for planned in played:
+        score1, score2 = score_value(planned.score1), score_value(planned.score2)
+        winner = None
+        # bulk_create skips Match.save(), so the result fields are set here
+        if planned.status == "Completed":
+            winner = teams[planned.sides[0 if score1 > score2 else 1].team_id]
+        rows.append(Match(
+            tournament=tournament,
+            start_date=tournament.start_date,
+            end_date=tournament.end_date,
+            status=planned.status,
+            court=planned.court,
+            seed=planned.seed,
+            round=planned.round,
+            score1=planned.score1,
+            score2=planned.score2,
+            score1_value=score1,
+            score2_value=score2,
+            winner_team=winner,
+            bracket_type=planned.bracket_type,
+        ))
+    return rows
+
+
+def _standings(played, teams):
+    totals = {index: NO_CHANGE for index in range(len(teams))}
+    for planned in played:
+        if len(planned.sides) != 2:
+            continue
+        for side, contribution in zip(planned.sides, MatchResult.of(planned).contribution()):
+            totals[side.team_id] = tuple(total + value for total, value in zip(totals[side.team_id], contribution))
+    return [
+        TeamStanding(
+            team=teams[index], wins=wins, losses=losses, ties=ties,
+            points_for=points_for, points_against=points_against)
+        for index, (wins, losses, ties, points_for, points_against) in totals.items()
+    ]
+
+
+def _create_slots(tournament_slots):
+    """BracketSlot rows of played double elimination brackets, as slots.create_bracket_slots lays them out."""
+    rows = {}
+    created = 0
+    # Edges only point at later rounds, so the last round is created first
+    # (see slots.create_bracket_slots); every bracket has the same rounds
+    ordered = sorted(
+        ((tournament, teams, matches, played) for tournament, teams, matches, slots in tournament_slots
+         for played in slots),
+        key=lambda item: -item[3].slot.round)
+    for _, group in groupby(ordered, key=lambda item: item[3].slot.round):
+        batch = []
+        for tournament, teams, matches, played in group:
+            slot = played.slot
+            row = BracketSlot(
+                tournament=tournament,
+                bracket_type=slot.bracket_type,
+                round=slot.round,
+                position=slot.position,
+                team1=teams[played.entry1.team_id] if played.entry1 else None,
+                team2=teams[played.entry2.team_id] if played.entry2 else None,
+                expects_team1=slot.expects[0],
+                expects_team2=slot.expects[1],
+                winner_to=rows[tournament.pk, slot.winner_to[0]] if slot.winner_to else None,
+                winner_to_side=slot.winner_to[1] if slot.winner_to else None,
+                loser_to=rows[tournament.pk, slot.loser_to[0]] if slot.loser_to else None,
+                loser_to_side=slot.loser_to[1] if slot.loser_to else None,
+                if_necessary=slot.if_necessary,
+                match=matches[played.match] if played.match is not None else None,
+                resolved=played.match is not None,
+            )
+            rows[tournament.pk, slot.key] = row
+            batch.append(row)
+        BracketSlot.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        created += len(batch)
+    return created
@@ -1,9 +1,18 @@
-import random
 import graphene
+from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
-from ..models import User, Tournament, Participant, Team, Match, MatchParticipant
+from ..models import User, Tournament, Participant, Team, Match, MatchParticipant, BracketSlot
 from django.core.exceptions import ObjectDoesNotExist
 from .types import *
+from ..bracket.engine import plan_round_robin, plan_seeded_elimination, plan_swiss_round, random_source, shuffled
+from ..bracket.persistence import persist_plan
+from ..bracket.queries import first_participant_ids, team_entries, teams_with_first_participant
+from ..bracket.slots import create_bracket_slots
+from ..bracket.timetable import schedule_tournament_plan
+from ..jobs import enqueue_bracket_generation
+from ..ratings import rank_by_rating, remove_tournament_ratings
+from ..snapshot import bump_bracket_version
+from ..standings import reset_tournament_standings
 
 
 class CreateUser(graphene.Mutation):
@@ -201,94 +210,40 @@ class CreateMatchParticipant(graphene.Mutation):
 class GenerateMatches(graphene.Mutation):
     class Arguments:
         tournament_id = graphene.ID(required=True)
+        # Seed the bracket by the users' ratings instead of drawing at random
+        seed_by_rating = graphene.Boolean(required=False)
+        # Seeds the random draw, so the same seed gives the same bracket
+        random_seed = graphene.Int(required=False)
 
     matches = graphene.List(MatchNode)
     message = graphene.String()
 
-    def mutate(self, info, tournament_id):
+    def mutate(self, info, tournament_id, seed_by_rating=False, random_seed=None, rng=None):
         try:
             tournament = Tournament.objects.get(pk=tournament_id)
         except Tournament.DoesNotExist:
             raise Exception(
                 f"Tournament with ID {tournament_id} does not exist.")
 
-        teams = list(Team.objects.filter(tournament_id=tournament))
+        teams = list(teams_with_first_participant(tournament))
         if len(teams) < 2:
             raise Exception(
                 "At least two teams are required to generate matches.")
 
         # Filter teams that have participants
-        teams_with_participants = [team for team in teams if Participant.objects.filter(team_id=team).exists()]
-        if len(teams_with_participants) < 2:
+        entries = team_entries(teams)
+        if len(entries) < 2:
             return GenerateMatches(matches=[], message="At least two teams must have participants.")
 
-        random.shuffle(teams_with_participants)  # Randomize team order for fairness
-        matches = []
-        round_number = 1  # First round
-
-        # Ensure fair bye distribution across rounds
-        bye_team = None
-        if len(teams_with_participants) % 2 == 1:
-            bye_team = teams_with_participants.pop(0)  # Assign the first team a bye
-
-            bye_match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Bye",
-                court="Bye",
-                seed=1,
-                round=round_number,
-                score1="N/A",
-                score2="N/A",
-                bracket_type="winners"
-            )
-
-            MatchParticipant.objects.create(
-                match_id=bye_match,
-                participant_id=Participant.objects.filter(team_id=bye_team).first(),
-                team_number=1,
-                team_id=bye_team
-            )
-
-            matches.append(bye_match)
-
-        # Generate matches for the remaining teams
-        match_seed = 2  # Start from 2 since bye is seed 1
-        for i in range(0, len(teams_with_participants), 2):
-            team1, team2 = teams_with_participants[i], teams_with_participants[i + 1]
-
-            match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Scheduled",
-                court=f"Court {match_seed}",
-                seed=match_seed,
-                round=round_number,
-                score1="0",
-                score2="0",
-                bracket_type="winners"
-            )
-
-            for participant in Participant.objects.filter(team_id=team1)[:1]:
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=participant,
-                    team_number=1,
-                    team_id=team1
-                )
-
-            for participant in Participant.objects.filter(team_id=team2)[:1]:
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=participant,
-                    team_number=2,
-                    team_id=team2
-                )
-
-            matches.append(match)
-            match_seed += 1
+        # Teams are placed on standard bracket positions, which gives every
+        # bye in the first round; the seeds are drawn at random unless
+        # seeding by rating
+        if seed_by_rating:
+            entries = rank_by_rating(entries)
+        else:
+            # Randomize team order for fairness
+            entries = shuffled(entries, rng or random_source(random_seed))
+        matches = persist_plan(tournament, plan_seeded_elimination(entries, round_number=1))
 
         return GenerateMatches(matches=matches, message="Matches successfully generated.")
 
@@ -296,100 +251,48 @@ class GenerateMatches(graphene.Mutation):
 class GenerateRoundRobinMatches(graphene.Mutation):
     class Arguments:
         tournament_id = graphene.ID(required=True)
+        # Venue to schedule the matches on; stored on the tournament
+        courts = graphene.Int(required=False)
+        slot_minutes = graphene.Int(required=False)
+        venue_opens = graphene.Time(required=False)
+        venue_closes = graphene.Time(required=False)
+        rest_slots = graphene.Int(required=False)
+        # Seeds the random draw, so the same seed gives the same schedule
+        random_seed = graphene.Int(required=False)
 
     matches = graphene.List(MatchNode)
     message = graphene.String()
 
-    def mutate(self, info, tournament_id):
+    def mutate(self, info, tournament_id, random_seed=None, rng=None, **venue):
         try:
             tournament = Tournament.objects.get(pk=tournament_id)
         except Tournament.DoesNotExist:
             raise Exception(
                 f"Tournament with ID {tournament_id} does not exist.")
 
-        teams = list(Team.objects.filter(tournament_id=tournament))
+        # The venue is only stored once the matches have been scheduled on it
+        venue = {field: value for field, value in venue.items() if value is not None}
+        for field, value in venue.items():
+            setattr(tournament, field, value)
+
+        teams = list(teams_with_first_participant(tournament))
         if len(teams) < 2:
             raise Exception(
                 "At least two teams are required to generate matches.")
 
         # Filter teams that have participants
-        teams_with_participants = [team for team in teams if Participant.objects.filter(team_id=team).exists()]
-        if len(teams_with_participants) < 2:
+        entries = team_entries(teams)
+        if len(entries) < 2:
             return GenerateRoundRobinMatches(matches=[], message="At least two teams must have participants.")
 
         # Randomly shuffle the teams to get random initial pairings
-        random.shuffle(teams_with_participants)
-
-        matches = []
-        
-        # Organize round robin schedule into proper rounds
-        # For n teams, we need (n-1) rounds with n/2 matches per round
-        n = len(teams_with_participants)
-        
-        # If odd number of teams, add a "BYE" placeholder
-        if n % 2 == 1:
-            n += 1
-            has_bye = True
-        else:
-            has_bye = False
-        
-        # Create a list of team indices (with a BYE placeholder if needed)
-        team_indices = list(range(n))
-        if has_bye:
-            team_indices[-1] = None  # Mark the last team as BYE
-            
-        # Number of rounds needed
-        rounds_needed = n - 1
-        
-        seed_counter = 1
-        
-        for round_number in range(1, rounds_needed + 1):
-            # For each round, create the matches
-            for i in range(n // 2):
-                team1_idx = team_indices[i]
-                team2_idx = team_indices[n - 1 - i]
-                
-                # Skip if one of the teams is a BYE
-                if team1_idx is None or team2_idx is None:
-                    continue
-                
-                team1 = teams_with_participants[team1_idx]
-                team2 = teams_with_participants[team2_idx]
-
-                match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Scheduled",
-                    court=f"Court {seed_counter}",
-                    seed=seed_counter,
-                    round=round_number,  # Use the round number, not the match counter
-                    score1="0",
-                    score2="0"
-                )
-
-                for participant in Participant.objects.filter(team_id=team1)[:1]:
-                    MatchParticipant.objects.create(
-                        match_id=match,
-                        participant_id=participant,
-                        team_number=1,
-                        team_id=team1
-                    )
-
-                for participant in Participant.objects.filter(team_id=team2)[:1]:
-                    MatchParticipant.objects.create(
-                        match_id=match,
-                        participant_id=participant,
-                        team_number=2,
-                        team_id=team2
-                    )
-
-                matches.append(match)
-                seed_counter += 1
-            
-            # Rotate the array (keep the first team fixed, rotate the rest)
-            # This is a standard algorithm for round robin scheduling
-            team_indices = [team_indices[0]] + [team_indices[-1]] + team_indices[1:-1]
+        entries = shuffled(entries, rng or random_source(random_seed))
+        # Scheduling raises on an unusable venue, before anything is saved
+        plan = schedule_tournament_plan(tournament, plan_round_robin(entries))
+        with transaction.atomic():
+            if venue:
+                tournament.save(update_fields=list(venue))
+            matches = persist_plan(tournament, plan)
 
         return GenerateRoundRobinMatches(matches=matches, message="Round-robin matches successfully generated.")
 
@@ -397,106 +300,43 @@ class GenerateRoundRobinMatches(graphene.Mutation):
 class GenerateDoubleEliminationMatches(graphene.Mutation):
     class Arguments:
         tournament_id = graphene.ID(required=True)
+        # Seed the bracket by the users' ratings instead of drawing at random
+        seed_by_rating = graphene.Boolean(required=False)
+        # Seeds the random draw, so the same seed gives the same bracket
+        random_seed = graphene.Int(required=False)
 
     matches = graphene.List(MatchNode)
     message = graphene.String()
 
-    def mutate(self, info, tournament_id):
+    def mutate(self, info, tournament_id, seed_by_rating=False, random_seed=None, rng=None):
         try:
             tournament = Tournament.objects.get(pk=tournament_id)
         except Tournament.DoesNotExist:
             raise Exception(
                 f"Tournament with ID {tournament_id} does not exist.")
 
-        teams = list(Team.objects.filter(tournament_id=tournament))
+        teams = list(teams_with_first_participant(tournament))
         if len(teams) < 2:
             raise Exception(
                 "At least two teams are required to generate matches.")
 
         # Filter teams that have participants
-        teams_with_participants = [team for team in teams if Participant.objects.filter(team_id=team).exists()]
-        if len(teams_with_participants) < 2:
+        entries = team_entries(teams)
+        if len(entries) < 2:
             return GenerateDoubleEliminationMatches(
                 matches=[], 
                 message="At least two teams must have participants."
             )
 
-        # Randomize teams
-        random.shuffle(teams_with_participants)
-        
-        matches = []
-        round_number = 1  # First round
-
-        # Ensure fair bye distribution across rounds for winners bracket
-        bye_team = None
-        if len(teams_with_participants) % 2 == 1:
-            bye_team = teams_with_participants.pop(0)  # Assign the first team a bye
-
-            bye_match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Bye",
-                court="Bye",
-                seed=1,
-                round=round_number,
-                score1="N/A",
-                score2="N/A",
-                bracket_type="winners"
-            )
-
-            MatchParticipant.objects.create(
-                match_id=bye_match,
-                participant_id=Participant.objects.filter(team_id=bye_team).first(),
-                team_number=1,
-                team_id=bye_team
-            )
-
-            matches.append(bye_match)
-
-        # Generate matches for the winners bracket (initial round)
-        match_seed = 2  # Start from 2 since bye is seed 1
-        for i in range(0, len(teams_with_participants), 2):
-            if i + 1 >= len(teams_with_participants):
-                break  # Should not happen with bye handling
-
-            team1, team2 = teams_with_participants[i], teams_with_participants[i + 1]
-
-            match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Scheduled",
-                court=f"Court {match_seed-1}",
-                seed=match_seed,
-                round=round_number,
-                score1="0",
-                score2="0",
-                bracket_type="winners"  # Explicitly mark as winners bracket
-            )
-
-            for participant in Participant.objects.filter(team_id=team1)[:1]:
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=participant,
-                    team_number=1,
-                    team_id=team1
-                )
-
-            for participant in Participant.objects.filter(team_id=team2)[:1]:
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=participant,
-                    team_number=2,
-                    team_id=team2
-                )
+        # Randomize teams unless seeding by rating. The whole bracket is laid
+        # out up front and losers bracket matches are started as teams drop
+        # into it.
+        if seed_by_rating:
+            entries = rank_by_rating(entries)
+        else:
+            entries = shuffled(entries, rng or random_source(random_seed))
+        matches = create_bracket_slots(tournament, entries)
 
-            matches.append(match)
-            match_seed += 1
-            
-        # We don't create losers bracket matches initially
-        # They will be created as teams lose in the winners bracket
-        
         return GenerateDoubleEliminationMatches(
             matches=matches, 
             message="Double elimination tournament initial matches successfully generated."
@@ -512,8 +352,12 @@ class DeleteMatches(graphene.Mutation):
 
     def mutate(self, info, tournament_id):
         try:
-            matches = Match.objects.filter(tournament_id=tournament_id)
-            matches.delete()
+            with transaction.atomic():
+                remove_tournament_ratings(tournament_id)
+                matches = Match.objects.filter(tournament_id=tournament_id)
+                matches.delete()
+                BracketSlot.objects.filter(tournament_id=tournament_id).delete()
+                reset_tournament_standings(tournament_id)
             return DeleteMatches(success=True, message="Matches deleted successfully.")
         except Exception as e:
             return DeleteMatches(success=False, message=str(e))
@@ -522,97 +366,68 @@ class DeleteMatches(graphene.Mutation):
 class GenerateSwissMatches(graphene.Mutation):
     class Arguments:
         tournament_id = graphene.ID(required=True)
+        # Pair the top half against the bottom half by the users' ratings
+        seed_by_rating = graphene.Boolean(required=False)
+        # Seeds the random draw, so the same seed gives the same bracket
+        random_seed = graphene.Int(required=False)
 
     matches = graphene.List(MatchNode)
     message = graphene.String()
 
-    def mutate(self, info, tournament_id):
+    def mutate(self, info, tournament_id, seed_by_rating=False, random_seed=None, rng=None):
         try:
             tournament = Tournament.objects.get(pk=tournament_id)
         except Tournament.DoesNotExist:
             raise Exception(f"Tournament with ID {tournament_id} does not exist.")
 
-        teams = list(Team.objects.filter(tournament_id=tournament))
+        teams = list(teams_with_first_participant(tournament))
         if len(teams) < 2:
             raise Exception("At least two teams are required to generate matches.")
 
         # Filter teams that have participants
-        teams_with_participants = [team for team in teams if Participant.objects.filter(team_id=team).exists()]
-        if len(teams_with_participants) < 2:
+        entries = team_entries(teams)
+        if len(entries) < 2:
             return GenerateSwissMatches(matches=[], message="At least two teams must have participants.")
 
-        # Randomize teams for initial round
-        random.shuffle(teams_with_participants)
-        matches = []
-        round_number = 1
-
-        # Handle bye for odd number of teams
-        if len(teams_with_participants) % 2 == 1:
-            bye_team = teams_with_participants.pop()  # Take random team for bye since list is shuffled
-            bye_match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Bye",
-                court="Bye",
-                seed=len(teams_with_participants) + 1,
-                round=round_number,
-                score1="N/A",
-                score2="N/A",
-                bracket_type="swiss"  # Mark as Swiss format
-            )
+        # Adjacent teams in the list are paired and the last one gets the bye
+        if seed_by_rating:
+            # 1 v N/2+1, 2 v N/2+2, ... with the lowest rated on the bye
+            ranked = rank_by_rating(entries)
+            half = len(ranked) // 2
+            entries = [entry for pair in zip(ranked[:half], ranked[half:2 * half]) for entry in pair] + ranked[2 * half:]
+            pairing = "rating seeded"
+        else:
+            # Randomize teams for initial round
+            entries = shuffled(entries, rng or random_source(random_seed))
+            pairing = "random"
+        matches = persist_plan(tournament, plan_swiss_round(entries))
 
-            MatchParticipant.objects.create(
-                match_id=bye_match,
-                participant_id=Participant.objects.filter(team_id=bye_team).first(),
-                team_number=1,
-                team_id=bye_team
-            )
-            matches.append(bye_match)
-
-        # Generate first round matches with random pairings
-        # Simply pair adjacent teams in our shuffled list
-        for i in range(0, len(teams_with_participants), 2):
-            if i + 1 >= len(teams_with_participants):
-                break
-
-            team1 = teams_with_participants[i]
-            team2 = teams_with_participants[i + 1]
-
-            match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Scheduled",
-                court=f"Court {i//2 + 1}",
-                seed=i//2 + 1,
-                round=round_number,
-                score1="0",
-                score2="0",
-                bracket_type="swiss"  # Mark as Swiss format
-            )
+        return GenerateSwissMatches(
+            matches=matches, message=f"Swiss tournament initial round generated successfully with {pairing} pairings.")
 
-            # Add first team
-            for participant in Participant.objects.filter(team_id=team1)[:1]:
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=participant,
-                    team_number=1,
-                    team_id=team1
-                )
 
-            # Add second team
-            for participant in Participant.objects.filter(team_id=team2)[:1]:
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=participant,
-                    team_number=2,
-                    team_id=team2
-                )
+class EnqueueBracketGeneration(graphene.Mutation):
+    class Arguments:
+        tournament_id = graphene.ID(required=True)
+        format = graphene.String(required=True)
 
-            matches.append(match)
+    success = graphene.Boolean()
+    message = graphene.String()
+    job_id = graphene.ID()
 
-        return GenerateSwissMatches(matches=matches, message="Swiss tournament initial round generated successfully with random pairings.")
+    def mutate(self, info, tournament_id, format):
+        try:
+            tournament = Tournament.objects.get(pk=tournament_id)
+        except Tournament.DoesNotExist:
+            return EnqueueBracketGeneration(success=False, message=f"Tournament with ID {tournament_id} does not exist.")
+
+        try:
+            job = enqueue_bracket_generation(tournament, format)
+        except Exception as e:
+            return EnqueueBracketGeneration(success=False, message=str(e))
+
+        return EnqueueBracketGeneration(
+            success=True, message="Bracket generation queued.", job_id=job.job_id)
 
 
 class GenerateRoundRobinToSingleElimination(graphene.Mutation):
@@ -647,12 +462,12 @@ class GenerateRoundRobinToSingleElimination(graphene.Mutation):
         # If no matches exist yet, generate round robin matches (Phase 1)
         if not existing_matches.exists():
             try:
-                round_robin_generator = GenerateRoundRobinMatches()
-                result = round_robin_generator.mutate(info, tournament_id)
-                # Ensure all matches are marked as round 1
-                for match in Match.objects.filter(tournament=tournament):
-                    match.round = 1
-                    match.save()
+                with transaction.atomic():
+                    round_robin_generator = GenerateRoundRobinMatches()
+                    result = round_robin_generator.mutate(info, tournament_id)
+                    # Ensure all matches are marked as round 1
+                    Match.objects.filter(tournament=tournament).update(round=1)
+                    bump_bracket_version(tournament.tournament_id)
                 
                 return GenerateRoundRobinToSingleElimination(
                     success=True,
@@ -685,8 +500,9 @@ class GenerateRoundRobinToSingleElimination(graphene.Mutation):
         
         # Calculate team standings based on round robin results
         team_stats = {}
-        for match in existing_matches.filter(round=1):
-            match_participants = MatchParticipant.objects.filter(match_id=match)
+        for match in existing_matches.filter(round=1).prefetch_related('matchparticipant_set__team_id'):
+            # score1 belongs to team_number 1, score2 to team_number 2
+            match_participants = sorted(match.matchparticipant_set.all(), key=lambda mp: mp.team_number)
             if len(match_participants) != 2:
                 continue
                 
@@ -698,9 +514,11 @@ class GenerateRoundRobinToSingleElimination(graphene.Mutation):
             if team2.team_id not in team_stats:
                 team_stats[team2.team_id] = {"team": team2, "wins": 0, "losses": 0, "points": 0}
             
-            score1 = int(match.score1) if match.score1.isdigit() else 0
-            score2 = int(match.score2) if match.score2.isdigit() else 0
-            
+            score1, score2 = match.score1_value, match.score2_value
+            # A match without a score has no result yet
+            if score1 is None or score2 is None:
+                continue
+
             if score1 > score2:
                 team_stats[team1.team_id]["wins"] += 1
                 team_stats[team1.team_id]["points"] += 3
@@ -730,121 +548,11 @@ class GenerateRoundRobinToSingleElimination(graphene.Mutation):
                 matches=[]
             )
             
-        # Create matches for single elimination (Phase 2)
-        matches = []
-        round_number = 2  # Start from round 2 (round 1 was round robin)
-        
-        # Find the next power of 2 to ensure proper bracket structure
-        num_teams = len(qualified_teams)
-        next_power_of_2 = 1
-        while next_power_of_2 < num_teams:
-            next_power_of_2 *= 2
-            
-        # Ensure we have a complete bracket by adding byes if needed
-        num_byes = next_power_of_2 - num_teams
-        
-        # Create the seeded pairs for the first round
-        # Standard tournament seeding pairs highest with lowest (1v8, 2v7, 3v6, 4v5, etc.)
-        for i in range(next_power_of_2 // 2):
-            # Standard seeding pattern: match highest with lowest
-            high_seed = i
-            low_seed = next_power_of_2 - 1 - i
-            
-            # Check if either position is a bye
-            high_is_bye = high_seed >= num_teams
-            low_is_bye = low_seed >= num_teams
-            
-            # Skip if both positions would be byes
-            if high_is_bye and low_is_bye:
-                continue
-                
-            # If one position is a bye, the other team automatically advances
-            if high_is_bye:
-                team = qualified_teams[low_seed]
-                
-                bye_match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Bye",
-                    court="Bye",
-                    seed=i+1,
-                    round=round_number,
-                    score1="N/A",
-                    score2="N/A"
-                )
-                
-                matches.append(bye_match)
-                participant = Participant.objects.filter(team_id=team).first()
-                if participant:
-                    MatchParticipant.objects.create(
-                        match_id=bye_match,
-                        participant_id=participant,
-                        team_number=1,
-                        team_id=team
-                    )
-            elif low_is_bye:
-                team = qualified_teams[high_seed]
-                
-                bye_match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Bye",
-                    court="Bye",
-                    seed=i+1,
-                    round=round_number,
-                    score1="N/A",
-                    score2="N/A"
-                )
-                
-                matches.append(bye_match)
-                participant = Participant.objects.filter(team_id=team).first()
-                if participant:
-                    MatchParticipant.objects.create(
-                        match_id=bye_match,
-                        participant_id=participant,
-                        team_number=1,
-                        team_id=team
-                    )
-            else:
-                # Create a match between the two teams
-                team1 = qualified_teams[high_seed]
-                team2 = qualified_teams[low_seed]
-                
-                match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Scheduled",
-                    court=f"Court {i+1}",
-                    seed=i+1,
-                    round=round_number,
-                    score1="0",
-                    score2="0"
-                )
-                
-                matches.append(match)
-                
-                # Find participants for these teams
-                participant1 = Participant.objects.filter(team_id=team1).first()
-                participant2 = Participant.objects.filter(team_id=team2).first()
-                
-                if participant1:
-                    MatchParticipant.objects.create(
-                        match_id=match,
-                        participant_id=participant1,
-                        team_number=1,
-                        team_id=team1
-                    )
-                    
-                if participant2:
-                    MatchParticipant.objects.create(
-                        match_id=match,
-                        participant_id=participant2,
-                        team_number=2,
-                        team_id=team2
-                    )
+        # Create matches for single elimination (Phase 2), starting from round 2
+        # (round 1 was round robin). Standard seeding pairs highest with lowest
+        # (1v8, 2v7, 3v6, 4v5, etc.) with byes inserted if necessary.
+        entries = team_entries(qualified_teams, first_participant_ids(tournament), require_participant=False)
+        matches = persist_plan(tournament, plan_seeded_elimination(entries, round_number=2))
         
         return GenerateRoundRobinToSingleElimination(
             success=True,
@@ -885,13 +593,12 @@ class GenerateRoundRobinToDoubleElimination(graphene.Mutation):
         # If no matches exist yet, generate round robin matches (Phase 1)
         if not existing_matches.exists():
             try:
-                round_robin_generator = GenerateRoundRobinMatches()
-                result = round_robin_generator.mutate(info, tournament_id)
-                # Ensure all matches are marked as round 1
-                for match in Match.objects.filter(tournament=tournament):
-                    match.round = 1
-                    match.bracket_type = "round_robin"
-                    match.save()
+                with transaction.atomic():
+                    round_robin_generator = GenerateRoundRobinMatches()
+                    result = round_robin_generator.mutate(info, tournament_id)
+                    # Ensure all matches are marked as round 1
+                    Match.objects.filter(tournament=tournament).update(round=1, bracket_type="round_robin")
+                    bump_bracket_version(tournament.tournament_id)
                 
                 return GenerateRoundRobinToDoubleElimination(
                     success=True,
@@ -924,8 +631,9 @@ class GenerateRoundRobinToDoubleElimination(graphene.Mutation):
         
         # Calculate team standings based on round robin results
         team_stats = {}
-        for match in existing_matches.filter(round=1):
-            match_participants = MatchParticipant.objects.filter(match_id=match)
+        for match in existing_matches.filter(round=1).prefetch_related('matchparticipant_set__team_id'):
+            # score1 belongs to team_number 1, score2 to team_number 2
+            match_participants = sorted(match.matchparticipant_set.all(), key=lambda mp: mp.team_number)
             if len(match_participants) != 2:
                 continue
                 
@@ -937,9 +645,11 @@ class GenerateRoundRobinToDoubleElimination(graphene.Mutation):
             if team2.team_id not in team_stats:
                 team_stats[team2.team_id] = {"team": team2, "wins": 0, "losses": 0, "points": 0}
             
-            score1 = int(match.score1) if match.score1.isdigit() else 0
-            score2 = int(match.score2) if match.score2.isdigit() else 0
-            
+            score1, score2 = match.score1_value, match.score2_value
+            # A match without a score has no result yet
+            if score1 is None or score2 is None:
+                continue
+
             if score1 > score2:
                 team_stats[team1.team_id]["wins"] += 1
                 team_stats[team1.team_id]["points"] += 3
@@ -969,129 +679,18 @@ class GenerateRoundRobinToDoubleElimination(graphene.Mutation):
                 matches=[]
             )
             
-        # --- Transition to Phase 2: Elimination stage ---
-        tournament.current_phase = 2
-        tournament.save()
-        
-        # Create matches for the double elimination winners bracket.
-        # Use standard seeding (highest vs lowest) with byes inserted if necessary.
-        matches_elim = []
-        round_number = 2  # Round 2 is the first elimination round.
-        
-        num_teams = len(qualified_teams)
-        next_power_of_2 = 1
-        while next_power_of_2 < num_teams:
-            next_power_of_2 *= 2
-            
-        # Ensure we have a complete bracket by adding byes if needed
-        num_byes = next_power_of_2 - num_teams
-        
-        # Create the seeded pairs for the first round of winners bracket
-        # Standard tournament seeding pairs highest with lowest (1v8, 2v7, 3v6, 4v5, etc.)
-        for i in range(next_power_of_2 // 2):
-            # Standard seeding pattern: match highest with lowest
-            high_seed = i
-            low_seed = next_power_of_2 - 1 - i
-            
-            # Check if either position is a bye
-            high_is_bye = high_seed >= num_teams
-            low_is_bye = low_seed >= num_teams
-            
-            # Skip if both positions would be byes
-            if high_is_bye and low_is_bye:
-                continue
-                
-            # If one position is a bye, the other team automatically advances
-            if high_is_bye:
-                team = qualified_teams[low_seed]
-                
-                bye_match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Bye",
-                    court="Bye",
-                    seed=i+1,
-                    round=round_number,
-                    score1="N/A",
-                    score2="N/A",
-                    bracket_type="winners"  # Mark as winners bracket
-                )
-                matches_elim.append(bye_match)
-                participant = Participant.objects.filter(team_id=team).first()
-                if participant:
-                    MatchParticipant.objects.create(
-                        match_id=bye_match,
-                        participant_id=participant,
-                        team_number=1,
-                        team_id=team
-                    )
-            elif low_is_bye:
-                team = qualified_teams[high_seed]
-                
-                bye_match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Bye",
-                    court="Bye",
-                    seed=i+1,
-                    round=round_number,
-                    score1="N/A",
-                    score2="N/A",
-                    bracket_type="winners"  # Mark as winners bracket
-                )
-                matches_elim.append(bye_match)
-                participant = Participant.objects.filter(team_id=team).first()
-                if participant:
-                    MatchParticipant.objects.create(
-                        match_id=bye_match,
-                        participant_id=participant,
-                        team_number=1,
-                        team_id=team
-                    )
-            else:
-                # Create a match between the two teams
-                team1 = qualified_teams[high_seed]
-                team2 = qualified_teams[low_seed]
-                
-                match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Scheduled",
-                    court=f"Court {i+1}",
-                    seed=i+1,
-                    round=round_number,
-                    score1="0",
-                    score2="0",
-                    bracket_type="winners"  # Mark as winners bracket
-                )
-                matches_elim.append(match)
-                
-                # Find participants for these teams
-                participant1 = Participant.objects.filter(team_id=team1).first()
-                participant2 = Participant.objects.filter(team_id=team2).first()
-                
-                if participant1:
-                    MatchParticipant.objects.create(
-                        match_id=match,
-                        participant_id=participant1,
-                        team_number=1,
-                        team_id=team1
-                    )
-                    
-                if participant2:
-                    MatchParticipant.objects.create(
-                        match_id=match,
-                        participant_id=participant2,
-                        team_number=2,
-                        team_id=team2
-                    )
-        
-        # We don't create losers bracket matches initially
-        # They will be created as teams lose in the winners bracket
-        
+        entries = team_entries(qualified_teams, first_participant_ids(tournament), require_participant=False)
+
+        with transaction.atomic():
+            # --- Transition to Phase 2: Elimination stage ---
+            tournament.current_phase = 2
+            tournament.save()
+
+            # Lay out the double elimination bracket with standard seeding
+            # (seed 1 and seed 2 can only meet in the final), byes going to
+            # the top seeds. Round 2 is the first elimination round.
+            matches_elim = create_bracket_slots(tournament, entries, first_round=2)
+
         return GenerateRoundRobinToDoubleElimination(
             success=True,
             message=f"Successfully generated double elimination stage with {len(qualified_teams)} teams using standard seeding.",
@@ -3,7 +3,10 @@ import graphene
 from ..models import User, Tournament, Participant, Team, Match, MatchParticipant
 from graphql_jwt.decorators import login_required
 from django.contrib.auth import authenticate
+from django.db import transaction
 from .types import *
+from ..broadcast import publish_bracket_event
+from ..standings import MatchResult, apply_result_change
 
 
 class DeleteUser(graphene.Mutation):
@@ -93,7 +96,11 @@ class DeleteMatch(graphene.Mutation):
     def mutate(root, info, match_id):
         try:
             match = Match.objects.get(pk=match_id)
-            match.delete()
+            team_ids = dict(match.matchparticipant_set.values_list('team_number', 'team_id'))
+            with transaction.atomic():
+                # Take the match's result back out of its teams' standings
+                apply_result_change(MatchResult.of(match), None, team_ids.get(1), team_ids.get(2))
+                match.delete()
             return DeleteMatch(success=True)
         except Match.DoesNotExist:
             raise Exception("Match not found.")
@@ -150,6 +157,7 @@ class KickTeam(graphene.Mutation):
             
             # Delete the team
             team.delete()
+            publish_bracket_event(tournament.tournament_id, "team_removed", team_id=int(team_id))
             
             return KickTeam(success=True, message="Team was successfully kicked from the tournament")
         
@@ -19,7 +19,9 @@ class Mutation(graphene.ObjectType):
     generate_round_robin_to_single_elimination = GenerateRoundRobinToSingleElimination.Field()
     generate_round_robin_to_double_elimination = GenerateRoundRobinToDoubleElimination.Field()
     generate_swiss_matches = GenerateSwissMatches.Field()
+    enqueue_bracket_generation = EnqueueBracketGeneration.Field()
     generate_next_round = GenerateNextRound.Field()
+    reschedule_matches = RescheduleMatches.Field()
     update_user = UpdateUser.Field()
     update_tournament = UpdateTournament.Field()
     update_team = UpdateTeam.Field()
@@ -0,0 +1,79 @@
+"""
+Keyset pagination for the per-tournament connections.
+
+A page is ordered on a fixed tuple of columns ending in the primary key, and
+its cursors encode those columns' values for each row instead of an offset.
+The next page asks for the rows after the cursor's values with a row
+comparison, which an index starting with the tournament and then the same
+columns answers directly, however deep the page is. Rows inserted or removed
+before the cursor do not shift later pages.
+
+Only forward pagination (first/after) is supported, at most MAX_PAGE_SIZE
+rows per page.
+"""
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from graphene.relay import PageInfo
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, size):
+    """The values encoded in cursor; raises an Exception unless it holds `size` integers."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        values = None
+    if not isinstance(values, list) or len(values) != size or not all(type(value) is int for value in values):
+        raise Exception("Invalid cursor.")
+    return values
+
+
+def _after(ordering, values):
+    """Q for rows after values in ordering: (a, b, c) > (x, y, z) spelled out for the ORM."""
+    condition = Q(**{f"{ordering[-1]}__gt": values[-1]})
+    for column, value in zip(reversed(ordering[:-1]), reversed(values[:-1])):
+        condition = Q(**{f"{column}__gt": value}) | (Q(**{column: value}) & condition)
+    # The OR chain alone makes the index scan start at the tournament's first
+    # row; a plain bound on the leading column starts it at the cursor
+    return Q(**{f"{ordering[0]}__gte": values[0]}) & condition
+
+
+def keyset_page(queryset, ordering, connection_type, first=None, after=None):
+    """
+    One page of queryset as a connection_type instance, ordered by the
+    integer columns in ordering (the last one unique) and starting after the
+    cursor `after`.
+    """
+    first = DEFAULT_PAGE_SIZE if first is None else first
+    if first < 0 or first > MAX_PAGE_SIZE:
+        raise Exception(f"first must be between 0 and {MAX_PAGE_SIZE}.")
+    if after:
+        queryset = queryset.filter(_after(ordering, decode_cursor(after, len(ordering))))
+
+    # One row more than asked for tells whether there is a next page
+    rows = list(queryset.order_by(*ordering)[:first + 1])
+    has_next_page = len(rows) > first
+    rows = rows[:first]
+
+    edges = [
+        connection_type.Edge(node=row, cursor=encode_cursor([getattr(row, column) for column in ordering]))
+        for row in rows
+    ]
+    return connection_type(
+        edges=edges,
+        page_info=PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=bool(after),
+            has_next_page=has_next_page,
+        ),
+    )
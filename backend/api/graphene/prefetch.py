@@ -0,0 +1,92 @@
+"""
+Selection-set aware prefetching for list resolvers.
+
+optimize_queryset() reads the fields a query selects below a list field and
+adds select_related() for the forward relations and prefetch_related() (with
+nested querysets) for the reverse ones, so the rows the query will walk are
+fetched up front in a fixed number of statements. Relations that are not
+selected are not joined.
+"""
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode, get_named_type
+
+from ..loaders import relation_field
+
+
+def _selected_fields(field_nodes, info):
+    """Map of response field name to the FieldNodes selecting it under field_nodes, fragments included."""
+    selected = {}
+
+    def collect(selection_set):
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                selected.setdefault(selection.name.value, []).append(selection)
+            elif isinstance(selection, InlineFragmentNode):
+                collect(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = info.fragments.get(selection.name.value)
+                if fragment is not None:
+                    collect(fragment.selection_set)
+
+    for node in field_nodes:
+        collect(node.selection_set)
+    return selected
+
+
+def _unwrap(graphql_type, field_nodes, info):
+    """Object type and selections of a field's rows, looking through connection edges and nodes."""
+    graphql_type = get_named_type(graphql_type)
+    fields = getattr(graphql_type, 'fields', None)
+    if fields is None:
+        return None, []
+    if 'edges' in fields and 'pageInfo' in fields:
+        edges = _selected_fields(field_nodes, info).get('edges', [])
+        edge_type = get_named_type(fields['edges'].type)
+        nodes = _selected_fields(edges, info).get('node', [])
+        return get_named_type(edge_type.fields['node'].type), nodes
+    return graphql_type, field_nodes
+
+
+def _plan(model, graphql_type, field_nodes, info, prefix, selects, prefetches):
+    for name, nodes in _selected_fields(field_nodes, info).items():
+        field_def = graphql_type.fields.get(name)
+        if field_def is None:
+            continue
+        try:
+            field = relation_field(model, to_snake_case(name))
+        except LookupError:
+            continue
+
+        child_type, child_nodes = _unwrap(field_def.type, nodes, info)
+        if child_type is None or not child_nodes:
+            continue
+
+        if field.many_to_one or field.one_to_one:
+            path = prefix + (field.name if field.concrete else field.get_accessor_name())
+            selects.append(path)
+            _plan(field.related_model, child_type, child_nodes, info, path + '__', selects, prefetches)
+        else:
+            accessor = field.name if field.concrete else field.get_accessor_name()
+            queryset = _optimize(field.related_model._default_manager.all(), child_type, child_nodes, info)
+            prefetches.append(Prefetch(prefix + accessor, queryset=queryset))
+
+
+def _optimize(queryset, graphql_type, field_nodes, info):
+    selects, prefetches = [], []
+    _plan(queryset.model, graphql_type, field_nodes, info, '', selects, prefetches)
+    if selects:
+        queryset = queryset.select_related(*selects)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset
+
+
+def optimize_queryset(queryset, info):
+    """queryset with the joins and prefetches needed by the fields selected below the current field."""
+    graphql_type, field_nodes = _unwrap(info.return_type, info.field_nodes, info)
+    if graphql_type is None:
+        return queryset
+    return _optimize(queryset, graphql_type, field_nodes, info)
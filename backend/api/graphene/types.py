@@ -1,72 +1,104 @@
 import graphene
 from graphene_django import DjangoObjectType
 
-from ..models import User, Tournament, Participant, Team, Match, MatchParticipant
+from ..loaders import relation_resolver
+from ..models import User, Tournament, Participant, Team, Match, MatchParticipant, BracketJob
 
 
-class UserType(DjangoObjectType):
+class LoaderObjectType(DjangoObjectType):
+    """
+    DjangoObjectType whose model relation fields resolve through the request's
+    loaders (see api/loaders.py), so a relation costs one query per nesting
+    level instead of one per object. Explicit resolve_<field> methods win.
+    """
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, model=None, **options):
+        super().__init_subclass_with_meta__(model=model, **options)
+        for field in model._meta.get_fields():
+            if not field.is_relation:
+                continue
+            name = field.name if field.concrete else field.get_accessor_name()
+            if name in cls._meta.fields and not hasattr(cls, f"resolve_{name}"):
+                setattr(cls, f"resolve_{name}", staticmethod(relation_resolver(name)))
+
+
+class UserType(LoaderObjectType):
     class Meta:
         model = User
         fields = "__all__"
 
 
-class TournamentType(DjangoObjectType):
+class TournamentType(LoaderObjectType):
     class Meta:
         model = Tournament
         fields = "__all__"
 
 
-class ParticipantType(DjangoObjectType):
+class ParticipantType(LoaderObjectType):
     class Meta:
         model = Participant
         fields = "__all__"
 
 
-class TeamType(DjangoObjectType):
+class TeamType(LoaderObjectType):
     class Meta:
         model = Team
         fields = "__all__"
 
 
-class MatchType(DjangoObjectType):
+class MatchType(LoaderObjectType):
     class Meta:
         model = Match
         fields = "__all__"
 
 
-class MatchParticipantType(DjangoObjectType):
+class MatchParticipantType(LoaderObjectType):
     class Meta:
         model = MatchParticipant
         fields = "__all__"
 
 
-class UserNode(DjangoObjectType):
+class UserNode(LoaderObjectType):
     class Meta:
         model = User
         filter_fields = "__all__"
         interfaces = (graphene.relay.Node, )
 
 
-class TournamentNode(DjangoObjectType):
+class TournamentNode(LoaderObjectType):
     class Meta:
         model = Tournament
-        filter_fields = "__all__"
+        # Only indexed columns, so no filter scans the table
+        filter_fields = {
+            "created_by": ["exact"],
+            "invite_link": ["exact"],
+        }
         interfaces = (graphene.relay.Node, )
 
 
-class TeamNode(DjangoObjectType):
+class TeamNode(LoaderObjectType):
     class Meta:
         model = Team
-        filter_fields = "__all__"
+        filter_fields = {
+            "tournament_id": ["exact"],
+            "invite_link": ["exact"],
+        }
         interfaces = (graphene.relay.Node, )
 
 
-class ParticipantNode(DjangoObjectType):
+class ParticipantNode(LoaderObjectType):
     teamNumber = graphene.Int()
     
     class Meta:
         model = Participant
-        filter_fields = "__all__"
+        filter_fields = {
+            "user_id": ["exact"],
+            "tournament_id": ["exact"],
+            "team_id": ["exact"],
+        }
         interfaces = (graphene.relay.Node, )
     
     def resolve_teamNumber(self, info):
@@ -74,7 +106,7 @@ class ParticipantNode(DjangoObjectType):
         # The actual teamNumber will come from MatchParticipantNode
         return None
 
-class MatchNode(DjangoObjectType):
+class MatchNode(LoaderObjectType):
     tournamentId = graphene.String()
 
     class Meta:
@@ -85,9 +117,9 @@ class MatchNode(DjangoObjectType):
         interfaces = (graphene.relay.Node,)
 
     def resolve_tournamentId(self, info):
-        return str(self.tournament.tournament_id)
+        return str(self.tournament_id)
 
-class MatchParticipantNode(DjangoObjectType):
+class MatchParticipantNode(LoaderObjectType):
     teamNumber = graphene.Int()
     
     class Meta:
@@ -98,3 +130,75 @@ class MatchParticipantNode(DjangoObjectType):
     # Resolver to convert snake_case field to camelCase for GraphQL
     def resolve_teamNumber(self, info):
         return self.team_number
+
+
+# Compact bracket structure served by the bracketSnapshot query (see api/snapshot.py)
+class SnapshotTeamType(graphene.ObjectType):
+    team_number = graphene.Int()
+    team_id = graphene.Int()
+    name = graphene.String()
+
+
+class SnapshotMatchType(graphene.ObjectType):
+    match_id = graphene.Int()
+    seed = graphene.Int()
+    court = graphene.String()
+    status = graphene.String()
+    score1 = graphene.String()
+    score2 = graphene.String()
+    verified = graphene.Int()
+    winner_team_id = graphene.Int()
+    teams = graphene.List(SnapshotTeamType)
+
+
+class SnapshotBracketType(graphene.ObjectType):
+    bracket_type = graphene.String()
+    matches = graphene.List(SnapshotMatchType)
+
+
+class SnapshotRoundType(graphene.ObjectType):
+    round = graphene.Int()
+    brackets = graphene.List(SnapshotBracketType)
+
+
+class BracketSnapshotType(graphene.ObjectType):
+    tournament_id = graphene.Int()
+    version = graphene.Int()
+    rounds = graphene.List(SnapshotRoundType)
+
+
+class SwissStandingType(graphene.ObjectType):
+    team_id = graphene.Int()
+    rank = graphene.Int()
+    score = graphene.Float()
+    wins = graphene.Int()
+    losses = graphene.Int()
+    ties = graphene.Int()
+    byes = graphene.Int()
+    buchholz = graphene.Float()
+    median_buchholz = graphene.Float()
+    sonneborn_berger = graphene.Float()
+    opponent_win_percentage = graphene.Float()
+
+
+class AdvanceProbabilityType(graphene.ObjectType):
+    team_id = graphene.Int()
+    team_name = graphene.String()
+    win_probability = graphene.Float()
+    top_two_probability = graphene.Float()
+    top_four_probability = graphene.Float()
+    expected_place = graphene.Float()
+
+
+class BracketJobType(LoaderObjectType):
+    class Meta:
+        model = BracketJob
+        # The checkpoint is the worker's own state
+        exclude = ("checkpoint",)
+
+    percent_complete = graphene.Float()
+
+    def resolve_percent_complete(self, info):
+        if not self.total:
+            return 100.0 if self.status == "Completed" else 0.0
+        return round(100.0 * self.progress / self.total, 1)
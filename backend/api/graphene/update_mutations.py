@@ -1,11 +1,44 @@
 import graphene
+import logging
 import random
 
+from django.db import transaction
+
 from ..models import User, Tournament, Participant, Team, Match, MatchParticipant
 from .types import *
+from ..bracket.engine import PlannedMatch, PlannedSide, TeamEntry, bye_match, head_to_head
+from ..bracket.persistence import persist_plan
+from ..bracket.queries import first_participant_ids, played_opponents, swiss_standings
+from ..bracket.slots import advance_bracket, bracket_champion, is_advanced
+from ..bracket.timetable import reschedule_matches
+from ..bracket.swiss import SwissPlayer, pair_swiss, plan_swiss_pairing
+from ..broadcast import match_diffs, publish_bracket_event
+from ..events import MatchCompleted, emit
+from ..logs import lazy
+from ..ratings import apply_match_rating
+from ..standings import MatchResult, apply_result_change
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password, check_password
 
+logger = logging.getLogger(__name__)
+
+
+def team_names(teams):
+    """Names of the team dicts passed between the bracket helpers, for log messages."""
+    return ", ".join(getattr(team['team'], 'name', "Unknown") for team in teams)
+
+
+def participant_teams(participants):
+    """team=team_number of each MatchParticipant, for log messages."""
+    return ", ".join(
+        f"{participant.team_id.name}={participant.team_number}"
+        for participant in participants.select_related('team_id') if participant.team_id)
+
+
+def team_entry(team, participant_ids):
+    """Engine record for a team, using the map returned by first_participant_ids."""
+    return TeamEntry(team_id=team.team_id, participant_id=participant_ids.get(team.team_id))
+
 
 class UpdateUser(graphene.Mutation):
     class Arguments:
@@ -210,27 +243,47 @@ class UpdateMatch(graphene.Mutation):
         court=None,
         seed=None,
     ):
-        try:
-            match = Match.objects.get(pk=match_id)
-        except Match.DoesNotExist:
-            raise Exception("Match with the given ID does not exist.")
-
-        if start_date:
-            match.start_date = start_date
-        if end_date:
-            match.end_date = end_date
-        if score1:
-            match.score1 = score1
-        if score2:
-            match.score2 = score2
-        if status:
-            match.status = status
-        if court:
-            match.court = court
-        if seed:
-            match.seed = seed
-
-        match.save()
+        with transaction.atomic():
+            # Lock the match so the result we move the standings away from is
+            # the one actually stored, as UpdateMatchScore does
+            try:
+                match = Match.objects.select_for_update().get(pk=match_id)
+            except Match.DoesNotExist:
+                raise Exception("Match with the given ID does not exist.")
+            previous_result = MatchResult.of(match)
+            previous_winner = match.winner_team_id
+
+            if start_date:
+                match.start_date = start_date
+            if end_date:
+                match.end_date = end_date
+            if score1:
+                match.score1 = score1
+            if score2:
+                match.score2 = score2
+            if status:
+                match.status = status
+            if court:
+                match.court = court
+            if seed:
+                match.seed = seed
+
+            match.save()
+            # As in UpdateMatchScore, the bracket is not re-routed
+            if match.winner_team_id != previous_winner and is_advanced(match):
+                raise Exception("The winner of this match has already advanced, its result can no longer change.")
+
+            # Scores and status edited here count towards standings as well
+            result = MatchResult.of(match)
+            team_ids = dict(match.matchparticipant_set.values_list('team_number', 'team_id'))
+            apply_result_change(previous_result, result, team_ids.get(1), team_ids.get(2))
+            apply_match_rating(match, team_ids.get(1), team_ids.get(2))
+
+            # A result entered here moves the bracket on like one from UpdateMatchScore
+            if result != previous_result:
+                publish_bracket_event(match.tournament_id, "match_updated", match=match_diffs([match])[0])
+                if match.status == "Completed":
+                    emit(MatchCompleted(tournament_id=match.tournament_id, match_id=match.match_id))
 
         return UpdateMatch(match=match)
 
@@ -246,109 +299,68 @@ class UpdateMatchScore(graphene.Mutation):
     match = graphene.Field(MatchType)
 
     def mutate(self, info, match_id, score1, score2, verified=None):
-        try:
-            match = Match.objects.get(pk=match_id)
-        except Match.DoesNotExist:
-            raise Exception("Match not found.")
-
-        # Add debug information about the teams and scores
-        match_participants = MatchParticipant.objects.filter(match_id=match)
-        team1 = match_participants.filter(team_number=1).first()
-        team2 = match_participants.filter(team_number=2).first()
-        
-        if team1 and team2:
-            print(f"DEBUG - Updating match {match_id} scores:")
-            print(f"  Team {team1.team_id.name} (team_number=1) will have score {score1}")
-            print(f"  Team {team2.team_id.name} (team_number=2) will have score {score2}")
-            # Convert scores to integers for proper comparison
+        with transaction.atomic():
+            # Lock the match so the result we move the standings away from is
+            # the one actually stored
             try:
-                score1_int = int(score1) if score1 and score1 != 'N/A' else 0
-                score2_int = int(score2) if score2 and score2 != 'N/A' else 0
-                if score1_int > score2_int:
-                    print(f"  Team {team1.team_id.name} (team_number=1) will be the winner")
-                elif score2_int > score1_int:
-                    print(f"  Team {team2.team_id.name} (team_number=2) will be the winner")
-                else:
-                    print("  The match will be a tie")
-            except (ValueError, TypeError):
-                print("  Invalid scores - cannot determine winner")
+                match = Match.objects.select_for_update().get(pk=match_id)
+            except Match.DoesNotExist:
+                raise Exception("Match not found.")
+            previous_result = MatchResult.of(match)
+            previous_winner = match.winner_team_id
+
+            team_ids = dict(MatchParticipant.objects.filter(match_id=match).values_list('team_number', 'team_id'))
+            logger.debug(
+                "Updating match %s scores to %s-%s", match_id, score1, score2,
+                extra={'fields': {'team1': team_ids.get(1), 'team2': team_ids.get(2)}})
+
+            # Update match scores
+            match.score1 = score1
+            match.score2 = score2
+            match.status = "Completed"  # Mark match as completed
+            if verified is not None:
+                match.verified = verified
+            match.save()
+            # The teams have already been routed on by the old winner, and
+            # the bracket is not re-routed; the transaction rolls back
+            if match.winner_team_id != previous_winner and is_advanced(match):
+                raise Exception("The winner of this match has already advanced, its result can no longer change.")
+
+            # Move both teams' standings by this match's change in result
+            if 1 in team_ids and 2 in team_ids:
+                apply_result_change(previous_result, MatchResult.of(match), team_ids[1], team_ids[2])
+                apply_match_rating(match, team_ids[1], team_ids[2])
+
+            publish_bracket_event(match.tournament_id, "match_updated", match=match_diffs([match])[0])
+            # Matches waiting on this result are started by the event worker
+            emit(MatchCompleted(tournament_id=match.tournament_id, match_id=match.match_id))
 
-        # Update match scores
-        match.score1 = score1
-        match.score2 = score2
-        match.status = "Completed"  # Mark match as completed
-        if verified is not None:
-            match.verified = verified
-        match.save()
+        return UpdateMatchScore(success=True, match=match)
 
-        # Update team records based on match results
-        if team1 and team2:
-            UpdateMatchScore.update_team_records(team1.team_id, team2.team_id, match)
 
-        return UpdateMatchScore(success=True, match=match)
-    
-    @staticmethod
-    def update_team_records(team1, team2, match):
-        """Update the records of both teams based on match results"""
+class RescheduleMatches(graphene.Mutation):
+    class Arguments:
+        tournament_id = graphene.ID(required=True)
+        # Defaults to the current time
+        now = graphene.DateTime(required=False)
+
+    success = graphene.Boolean()
+    message = graphene.String()
+    matches = graphene.List(MatchType)
+
+    def mutate(self, info, tournament_id, now=None):
         try:
-            score1 = int(match.score1) if match.score1 and match.score1 != 'N/A' else 0
-            score2 = int(match.score2) if match.score2 and match.score2 != 'N/A' else 0
-        except (ValueError, TypeError):
-            print("Error parsing scores while updating team records")
-            return
-        
-        # Calculate team records for both teams
-        for team in [team1, team2]:
-            if team is None:
-                print("Warning: Trying to update record for None team - skipping")
-                continue
-                
-            # Get all completed matches for this team
-            team_matches = MatchParticipant.objects.filter(
-                team_id=team,
-                match_id__status="Completed"
-            ).select_related('match_id')
-            
-            # Count wins and losses
-            wins = 0
-            losses = 0
-            ties = 0
-            
-            for participant in team_matches:
-                match = participant.match_id
-                team_num = participant.team_number
-                
-                try:
-                    match_score1 = int(match.score1) if match.score1 and match.score1 != 'N/A' else 0
-                    match_score2 = int(match.score2) if match.score2 and match.score2 != 'N/A' else 0
-                except (ValueError, TypeError):
-                    continue
-                
-                if team_num == 1:
-                    if match_score1 > match_score2:
-                        wins += 1
-                    elif match_score1 < match_score2:
-                        losses += 1
-                    else:
-                        ties += 1
-                else:  # team_num == 2
-                    if match_score2 > match_score1:
-                        wins += 1
-                    elif match_score2 < match_score1:
-                        losses += 1
-                    else:
-                        ties += 1
-            
-            # Update team record
-            record_str = f"{wins}-{losses}"
-            if ties > 0:
-                record_str += f"-{ties}"
-            
-            team.record = record_str
-            team.save()
-            
-            team_name = getattr(team, 'name', 'Unknown')
-            print(f"Updated team {team_name} record to {record_str}")
+            tournament = Tournament.objects.get(pk=tournament_id)
+        except Tournament.DoesNotExist:
+            return RescheduleMatches(success=False, message=f"Tournament with ID {tournament_id} does not exist.", matches=[])
+
+        try:
+            with transaction.atomic():
+                matches = reschedule_matches(tournament, now)
+        except Exception as e:
+            return RescheduleMatches(success=False, message=str(e), matches=[])
+
+        return RescheduleMatches(success=True, message=f"Rescheduled {len(matches)} matches.", matches=matches)
 
 
 class GenerateNextRound(graphene.Mutation):
@@ -362,6 +374,11 @@ class GenerateNextRound(graphene.Mutation):
         try:
             tournament = Tournament.objects.get(pk=tournament_id)
 
+            # Double elimination brackets laid out as slots advance along
+            # their edges instead of being worked out round by round below
+            if tournament.bracket_slots.exists():
+                return GenerateNextRound.advance_bracket_slots(tournament)
+
             # Check if this is a double elimination tournament or phase 2 of Round Robin to Double Elimination
             is_double_elimination = tournament.format == "Double Elimination"
             
@@ -408,8 +425,7 @@ class GenerateNextRound(graphene.Mutation):
                 
                 # Get scores with proper handling of invalid scores
                 try:
-                    score1 = int(last_championship.score1) if last_championship.score1 and last_championship.score1 != 'N/A' else 0
-                    score2 = int(last_championship.score2) if last_championship.score2 and last_championship.score2 != 'N/A' else 0
+                    score1, score2 = last_championship.int_scores()
                 except (ValueError, TypeError):
                     return GenerateNextRound(success=False, message="Invalid scores in championship match")
                 
@@ -423,16 +439,16 @@ class GenerateNextRound(graphene.Mutation):
                     if score1 >= 10 and score2 == 0:
                         is_team1_winner = True
                         team1_name = getattr(team1, 'name', "Unknown") if team1 else "Unknown"
-                        print(f"Championship match: Team 1 ({team1_name}) won with score {score1}-{score2}")
+                        logger.debug("Championship match: Team 1 (%s) won with score %s-%s", team1_name, score1, score2)
                     else:
                         is_team2_winner = True
                         team2_name = getattr(team2, 'name', "Unknown") if team2 else "Unknown"
-                        print(f"Championship match: Team 2 ({team2_name}) won with score {score2}-{score1}")
+                        logger.debug("Championship match: Team 2 (%s) won with score %s-%s", team2_name, score2, score1)
                 else:
                     # Regular score comparison
                     is_team1_winner = score1 > score2
                     is_team2_winner = score2 > score1
-                    print(f"Championship match: Winner determined by score comparison {score1}-{score2}")
+                    logger.debug("Championship match: Winner determined by score comparison %s-%s", score1, score2)
                 
                 # We need to determine if this is the first championship match or the true final
                 # Count how many championship matches we have before this one
@@ -490,8 +506,8 @@ class GenerateNextRound(graphene.Mutation):
                     wb_champion_won = (team1_is_wb_champion and is_team1_winner) or (team2_is_wb_champion and is_team2_winner)
                     lb_champion_won = (not team1_is_wb_champion and is_team1_winner) or (not team2_is_wb_champion and is_team2_winner)
                     
-                    print(f"Winners bracket champion won: {wb_champion_won}")
-                    print(f"Losers bracket champion won: {lb_champion_won}")
+                    logger.debug("Winners bracket champion won: %s", wb_champion_won)
+                    logger.debug("Losers bracket champion won: %s", lb_champion_won)
                     
                     # Get the wb and lb champions
                     wb_champion = team1 if team1_is_wb_champion else team2
@@ -503,7 +519,7 @@ class GenerateNextRound(graphene.Mutation):
                         winning_team = wb_champion
                         winning_team_name = getattr(winning_team, 'name', "Unknown") if winning_team else "Unknown" 
                         tournament_name = getattr(tournament, 'name', "Unknown") if tournament else "Unknown"
-                        print(f"Tournament complete: Winners bracket champion {winning_team_name} won")
+                        logger.debug("Tournament complete: Winners bracket champion %s won", winning_team_name)
                         try:
                             return GenerateNextRound(success=True, message=f"Tournament {tournament_name} has a winner: {winning_team_name}")
                         except AttributeError:
@@ -513,36 +529,22 @@ class GenerateNextRound(graphene.Mutation):
                     if lb_champion_won:
                         # Create a true final (bracket reset) match
                         next_round = last_championship.round + 1
-                        true_final = Match.objects.create(
-                            tournament=tournament,
-                            start_date=tournament.start_date,
-                            end_date=tournament.end_date,
-                            status="Scheduled",
-                            court="True Final Court",
-                            seed=1,
-                            round=next_round,
-                            score1="0",
-                            score2="0",
-                            verified=0,
-                            bracket_type="championship"
-                        )
-                        
                         # Both teams keep the same position in the true final
-                        for participant in MatchParticipant.objects.filter(match_id=last_championship, team_number=1):
-                            MatchParticipant.objects.create(
-                                match_id=true_final,
-                                participant_id=participant.participant_id,
-                                team_number=1,
-                                team_id=participant.team_id
-                            )
-                        
-                        for participant in MatchParticipant.objects.filter(match_id=last_championship, team_number=2):
-                            MatchParticipant.objects.create(
-                                match_id=true_final,
-                                participant_id=participant.participant_id,
-                                team_number=2,
-                                team_id=participant.team_id
+                        sides = tuple(
+                            PlannedSide(
+                                team_number=participant.team_number,
+                                team_id=participant.team_id_id,
+                                participant_id=participant.participant_id_id
                             )
+                            for participant in champ_participants.order_by('team_number')
+                        )
+                        persist_plan(tournament, [PlannedMatch(
+                            round=next_round,
+                            seed=1,
+                            court="True Final Court",
+                            bracket_type="championship",
+                            sides=sides
+                        )])
                         
                         return GenerateNextRound(success=True, message=f"Created true final match for Round {next_round}")
                 else:
@@ -593,26 +595,48 @@ class GenerateNextRound(graphene.Mutation):
                 return GenerateNextRound(success=False, message="Not all matches in the current round are completed yet.")
 
 
-            # Now that all matches are completed, generate the next round
-            if is_double_elimination or is_rr_to_de_phase2:
-                success, message = GenerateNextRound.create_next_round_double_elimination(
-                    tournament, last_round_number)
-            elif tournament.format == "Swiss System":
-                success, message = GenerateNextRound.create_next_round_swiss(
-                    tournament, last_round_number)
-            else:
-                success, message = GenerateNextRound.create_next_round_matches(
-                    tournament, last_round_number)
-                
+            # Now that all matches are completed, generate the next round.
+            # A round is written as a whole or not at all.
+            with transaction.atomic():
+                if is_double_elimination or is_rr_to_de_phase2:
+                    success, message = GenerateNextRound.create_next_round_double_elimination(
+                        tournament, last_round_number)
+                elif tournament.format == "Swiss System":
+                    success, message = GenerateNextRound.create_next_round_swiss(
+                        tournament, last_round_number)
+                else:
+                    success, message = GenerateNextRound.create_next_round_matches(
+                        tournament, last_round_number)
+
+                new_matches = Match.objects.filter(tournament=tournament, round__gt=last_round_number)
+                if success and new_matches.exists():
+                    publish_bracket_event(
+                        tournament.tournament_id, "matches_created", matches=match_diffs(new_matches))
+
             return GenerateNextRound(success=success, message=message)
 
         except Exception as e:
             return GenerateNextRound(success=False, message=f"Error: {str(e)}")
 
+    @staticmethod
+    def advance_bracket_slots(tournament):
+        with transaction.atomic():
+            matches = advance_bracket(tournament)
+            if matches:
+                publish_bracket_event(tournament.tournament_id, "matches_created", matches=match_diffs(matches))
+
+        champion = bracket_champion(tournament)
+        if champion is not None:
+            return GenerateNextRound(success=True, message=f"Tournament {tournament.name} has a winner: {champion.name}")
+        if not matches:
+            return GenerateNextRound(success=False, message="No completed matches are waiting to advance.")
+        return GenerateNextRound(success=True, message=f"Created {len(matches)} matches in Double Elimination tournament")
+
     @staticmethod
     def create_next_round_double_elimination(tournament, current_round):
         """
         Generate the next round of matches for a double elimination tournament.
+        Only used for brackets generated before they were laid out as slots.
         Handles both winners bracket and losers bracket progression.
         """
         # Get matches from the current round, separated by bracket type
@@ -631,7 +655,7 @@ class GenerateNextRound(graphene.Mutation):
         ).order_by('seed')
 
         # Debug output to track what's happening in each round
-        print(f"Round {current_round}: Processing {winners_matches.count()} winners matches and {losers_matches.count()} losers matches")
+        logger.debug("Round %s: Processing %s winners matches and %s losers matches", current_round, lazy(winners_matches.count), lazy(losers_matches.count))
 
         # Check if we have reached the championship point - need exactly one winners finalist team
         # and at least one losers bracket match that we can treat as the losers bracket final
@@ -713,8 +737,7 @@ class GenerateNextRound(graphene.Mutation):
                         team2 = participants.filter(team_number=2).first().team_id
                         
                         try:
-                            score1 = int(last_match.score1) if last_match.score1 and last_match.score1 != 'N/A' else 0
-                            score2 = int(last_match.score2) if last_match.score2 and last_match.score2 != 'N/A' else 0
+                            score1, score2 = last_match.int_scores()
                             
                             if score1 > score2:
                                 winners_bracket_champion = team1
@@ -750,7 +773,7 @@ class GenerateNextRound(graphene.Mutation):
                 losers_final = losers_matches.first()
                 if losers_final.status == "Completed" or losers_final.status == "Bye":
                     # Debug logging to understand the logic flow
-                    print(f"Creating championship match. Winners final: {winners_matches.first().match_id}, Losers final: {losers_final.match_id}")
+                    logger.debug("Creating championship match. Winners final: %s, Losers final: %s", lazy(lambda: winners_matches.first().match_id), losers_final.match_id)
                     
                 return GenerateNextRound.create_championship_match(
                     tournament,
@@ -781,8 +804,7 @@ class GenerateNextRound(graphene.Mutation):
             
             # Get scores with proper handling of invalid scores
             try:
-                score1 = int(winners_final_match.score1) if winners_final_match.score1 and winners_final_match.score1 != 'N/A' else 0
-                score2 = int(winners_final_match.score2) if winners_final_match.score2 and winners_final_match.score2 != 'N/A' else 0
+                score1, score2 = winners_final_match.int_scores()
             except (ValueError, TypeError):
                 return False, "Invalid scores in winners final"
             
@@ -820,8 +842,7 @@ class GenerateNextRound(graphene.Mutation):
                     
                     # Get scores with proper handling of invalid scores
                     try:
-                        score1 = int(losers_match.score1) if losers_match.score1 and losers_match.score1 != 'N/A' else 0
-                        score2 = int(losers_match.score2) if losers_match.score2 and losers_match.score2 != 'N/A' else 0
+                        score1, score2 = losers_match.int_scores()
                     except (ValueError, TypeError):
                         return False, "Invalid scores in losers match"
                     
@@ -838,42 +859,19 @@ class GenerateNextRound(graphene.Mutation):
             
             # Create losers final match between winners loser and losers winner
             next_round = current_round + 1
-            losers_final = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Scheduled",
-                court="Losers Final Court",
-                seed=1,
-                round=next_round,
-                score1="0",
-                score2="0",
-                bracket_type="losers"
-            )
-            
-            # Add winner from losers bracket match as team 1
-            losers_winner_participants = Participant.objects.filter(team_id=losers_winner)
-            if losers_winner_participants.exists():
-                MatchParticipant.objects.create(
-                    match_id=losers_final,
-                    participant_id=losers_winner_participants.first(),
-                    team_number=1,
-                    team_id=losers_winner
-                )
-            else:
+
+            # Winner from losers bracket match is team 1, loser from winners final is team 2
+            participant_ids = first_participant_ids(tournament)
+            losers_winner_entry = team_entry(losers_winner, participant_ids)
+            if losers_winner_entry.participant_id is None:
                 return False, "Cannot find participants for losers bracket winner"
-            
-            # Add loser from winners final as team 2
-            winners_loser_participants = Participant.objects.filter(team_id=winners_loser)
-            if winners_loser_participants.exists():
-                MatchParticipant.objects.create(
-                    match_id=losers_final,
-                    participant_id=winners_loser_participants.first(),
-                    team_number=2,
-                    team_id=winners_loser
-                )
-            else:
+
+            winners_loser_entry = team_entry(winners_loser, participant_ids)
+            if winners_loser_entry.participant_id is None:
                 return False, "Cannot find participants for winners bracket loser"
+
+            persist_plan(tournament, [head_to_head(
+                losers_winner_entry, winners_loser_entry, next_round, 1, "Losers Final Court", bracket_type="losers")])
             
             return True, f"Created losers final match for Round {next_round}"
         
@@ -898,7 +896,7 @@ class GenerateNextRound(graphene.Mutation):
                 # Regular match - determine winner and loser
                     participants = MatchParticipant.objects.filter(match_id=match)
                     if participants.count() < 2:
-                        print(f"Skipping match {match.match_id} - not enough participants")
+                        logger.debug("Skipping match %s - not enough participants", match.match_id)
                         continue  # Skip invalid matches
                     
                     # Get team IDs for the two teams
@@ -906,36 +904,35 @@ class GenerateNextRound(graphene.Mutation):
                     team2_data = participants.filter(team_number=2).first()
                     
                     if not team1_data or not team2_data:
-                        print(f"Skipping match {match.match_id} - missing team data")
+                        logger.debug("Skipping match %s - missing team data", match.match_id)
                         continue  # Skip if missing team data
                         
                     team1 = team1_data.team_id
                     team2 = team2_data.team_id
                     
-                    print(f"Processing winners match between {team1.name} and {team2.name}")
+                    logger.debug("Processing winners match between %s and %s", team1.name, team2.name)
                     
                 # Get scores with proper handling of invalid scores
                     try:
-                        score1 = int(match.score1) if match.score1 and match.score1 != 'N/A' else 0
-                        score2 = int(match.score2) if match.score2 and match.score2 != 'N/A' else 0
-                        print(f"Scores: {team1.name}={score1}, {team2.name}={score2}")
+                        score1, score2 = match.int_scores()
+                        logger.debug("Scores: %s=%s, %s=%s", team1.name, score1, team2.name, score2)
                     except (ValueError, TypeError):
                         # If scores can't be converted to integers, treat as incomplete
-                        print(f"Invalid scores for match {match.match_id}: {match.score1}-{match.score2}")
+                        logger.debug("Invalid scores for match %s: %s-%s", match.match_id, match.score1, match.score2)
                         continue
                     
                 # Only advance if there's a clear winner (no ties)
                     if score1 > score2:
                         winner_team = team1
                         loser_team = team2
-                        print(f"{team1.name} won, {team2.name} to losers bracket")
+                        logger.debug("%s won, %s to losers bracket", team1.name, team2.name)
                     elif score2 > score1:
                         winner_team = team2
                         loser_team = team1
-                        print(f"{team2.name} won, {team1.name} to losers bracket")
+                        logger.debug("%s won, %s to losers bracket", team2.name, team1.name)
                     else:
                     # Tie or incomplete match - skip this match
-                        print(f"Skipping match {match.match_id} due to tie")
+                        logger.debug("Skipping match %s due to tie", match.match_id)
                         continue
                     
                 # Winner advances in winners bracket
@@ -953,7 +950,7 @@ class GenerateNextRound(graphene.Mutation):
                         'round_eliminated': current_round
                     })
 
-        print(f"Winners advancing: {len(advancing_winners)}, New losers: {len(new_losers)}")
+        logger.debug("Winners advancing: %s, New losers: %s", len(advancing_winners), len(new_losers))
 
         # Process losers bracket matches
         for match in losers_matches:
@@ -962,7 +959,7 @@ class GenerateNextRound(graphene.Mutation):
                 bye_participant = MatchParticipant.objects.filter(match_id=match).first()
                 if bye_participant and bye_participant.team_id:
                     team_name = getattr(bye_participant.team_id, 'name', "Unknown") if bye_participant.team_id else "Unknown"
-                    print(f"{team_name} advances in losers bracket with a bye")
+                    logger.debug("%s advances in losers bracket with a bye", team_name)
                     advancing_losers.append({
                         'team': bye_participant.team_id,
                         'source_seed': match.seed,
@@ -972,7 +969,7 @@ class GenerateNextRound(graphene.Mutation):
                 # Regular match - only winner advances, loser is eliminated
                 participants = MatchParticipant.objects.filter(match_id=match)
                 if participants.count() < 2:
-                    print(f"Skipping losers match {match.match_id} - not enough participants")
+                    logger.debug("Skipping losers match %s - not enough participants", match.match_id)
                     continue  # Skip invalid matches
 
                 # Get team IDs for the two teams
@@ -980,34 +977,33 @@ class GenerateNextRound(graphene.Mutation):
                 team2_data = participants.filter(team_number=2).first()
                 
                 if not team1_data or not team2_data:
-                    print(f"Skipping losers match {match.match_id} - missing team data")
+                    logger.debug("Skipping losers match %s - missing team data", match.match_id)
                     continue  # Skip if missing team data
                     
                 team1 = team1_data.team_id
                 team2 = team2_data.team_id
                 
-                print(f"Processing losers match between {team1.name} and {team2.name}")
+                logger.debug("Processing losers match between %s and %s", team1.name, team2.name)
                 
                 # Get scores with proper handling of invalid scores
                 try:
-                    score1 = int(match.score1) if match.score1 and match.score1 != 'N/A' else 0
-                    score2 = int(match.score2) if match.score2 and match.score2 != 'N/A' else 0
-                    print(f"Scores: {team1.name}={score1}, {team2.name}={score2}")
+                    score1, score2 = match.int_scores()
+                    logger.debug("Scores: %s=%s, %s=%s", team1.name, score1, team2.name, score2)
                 except (ValueError, TypeError):
                     # If scores can't be converted to integers, treat as incomplete
-                    print(f"Invalid scores for losers match {match.match_id}: {match.score1}-{match.score2}")
+                    logger.debug("Invalid scores for losers match %s: %s-%s", match.match_id, match.score1, match.score2)
                     continue
                 
                 # Only advance if there's a clear winner (no ties)
                 if score1 > score2:
                     winner_team = team1
-                    print(f"{team1.name} advances in losers bracket, {team2.name} eliminated")
+                    logger.debug("%s advances in losers bracket, %s eliminated", team1.name, team2.name)
                 elif score2 > score1:
                     winner_team = team2
-                    print(f"{team2.name} advances in losers bracket, {team1.name} eliminated")
+                    logger.debug("%s advances in losers bracket, %s eliminated", team2.name, team1.name)
                 else:
                     # Tie or incomplete match - skip this match
-                    print(f"Skipping losers match {match.match_id} due to tie")
+                    logger.debug("Skipping losers match %s due to tie", match.match_id)
                     continue
                 
                 # Winner advances in losers bracket
@@ -1017,7 +1013,7 @@ class GenerateNextRound(graphene.Mutation):
                     'is_bye_winner': False
                 })
 
-        print(f"Losers advancing: {len(advancing_losers)}")
+        logger.debug("Losers advancing: %s", len(advancing_losers))
         
         # Verify we have valid teams advancing
         if not advancing_winners and not advancing_losers and not new_losers:
@@ -1032,7 +1028,7 @@ class GenerateNextRound(graphene.Mutation):
                 
                 if winners_final:
                     # We have a winners champion and a losers champion ready for championship
-                    print(f"Creating championship match with winners final from round {winners_final.round} and losers final from round {current_round}")
+                    logger.debug("Creating championship match with winners final from round %s and losers final from round %s", winners_final.round, current_round)
                     return GenerateNextRound.create_championship_match(
                         tournament,
                         current_round,
@@ -1056,7 +1052,7 @@ class GenerateNextRound(graphene.Mutation):
             
             if winners_final:
                 # Both bracket finals are complete - create championship match
-                print(f"Creating championship match from final check with winners final from round {winners_final.round}")
+                logger.debug("Creating championship match from final check with winners final from round %s", winners_final.round)
                 return GenerateNextRound.create_championship_match(
                     tournament,
                     current_round,
@@ -1070,11 +1066,11 @@ class GenerateNextRound(graphene.Mutation):
             # If winners bracket has concluded but losers bracket hasn't, don't create more winners bracket matches
             if winners_bracket_concluded and winners_bracket_champion:
                 champion_name = getattr(winners_bracket_champion, 'name', "Unknown") if winners_bracket_champion else "Unknown"
-                print(f"Winners bracket has concluded with champion {champion_name} - waiting for losers bracket")
+                logger.debug("Winners bracket has concluded with champion %s - waiting for losers bracket", champion_name)
                 # Don't create any new bye matches for the winners bracket champion
                 # Just let the losers bracket continue
             else:
-                print(f"Creating winners bracket for round {next_round} with {len(advancing_winners)} teams")
+                logger.debug("Creating winners bracket for round %s with %s teams", next_round, len(advancing_winners))
                 # Create the next round of matches in the winners bracket
                 matches_created += GenerateNextRound.create_bracket_matches(
                     tournament,
@@ -1124,11 +1120,9 @@ class GenerateNextRound(graphene.Mutation):
                         # they enter round 2n-1 of losers bracket
                         all_losers = new_losers + advancing_losers
                 
-                    print(f"Creating losers bracket for round {next_round} with {len(all_losers)} teams (mixed)")
-                    for team in all_losers:
-                        team_name = team['team'].name if hasattr(team['team'], 'name') else "Unknown"
-                        is_new = team.get('is_new_loser', False)
-                        print(f"  Team {team_name} {'(new loser)' if is_new else '(advancing)'}")
+                    logger.debug(
+                        "Creating losers bracket for round %s with %s teams (mixed), new losers: %s, advancing: %s",
+                        next_round, len(all_losers), lazy(team_names, new_losers), lazy(team_names, advancing_losers))
                 
                     matches_created += GenerateNextRound.create_bracket_matches(
                         tournament,
@@ -1139,9 +1133,9 @@ class GenerateNextRound(graphene.Mutation):
                     )
                 else:
                     # If only new losers, pair them against each other
-                    print(f"Creating losers bracket for round {next_round} with {len(new_losers)} teams (new losers only)")
-                    for team in new_losers:
-                        print(f"  Team {team['team'].name} (new loser)")
+                    logger.debug(
+                        "Creating losers bracket for round %s with %s teams (new losers only): %s",
+                        next_round, len(new_losers), lazy(team_names, new_losers))
                     
                     matches_created += GenerateNextRound.create_bracket_matches(
                         tournament,
@@ -1152,9 +1146,9 @@ class GenerateNextRound(graphene.Mutation):
                     )
             elif advancing_losers:
                 # If only advancing losers, pair them against each other
-                print(f"Creating losers bracket for round {next_round} with {len(advancing_losers)} teams (advancing losers only)")
-                for team in advancing_losers:
-                    print(f"  Team {team['team'].name} (advancing in losers bracket)")
+                logger.debug(
+                    "Creating losers bracket for round %s with %s teams (advancing losers only): %s",
+                    next_round, len(advancing_losers), lazy(team_names, advancing_losers))
                 
                 matches_created += GenerateNextRound.create_bracket_matches(
                     tournament,
@@ -1164,7 +1158,7 @@ class GenerateNextRound(graphene.Mutation):
                     start_seed=len(advancing_winners) + 1
                 )
         else:
-            print("No teams available for losers bracket")
+            logger.debug("No teams available for losers bracket")
         
         # Check if both winners and losers brackets have concluded but no championship match was created
         if matches_created == 0 and winners_bracket_concluded:
@@ -1199,8 +1193,7 @@ class GenerateNextRound(graphene.Mutation):
                         team2 = participants.filter(team_number=2).first().team_id
                         
                         try:
-                            score1 = int(last_match.score1) if last_match.score1 and last_match.score1 != 'N/A' else 0
-                            score2 = int(last_match.score2) if last_match.score2 and last_match.score2 != 'N/A' else 0
+                            score1, score2 = last_match.int_scores()
                             
                             if score1 > score2:
                                 losers_bracket_champion = team1
@@ -1213,41 +1206,19 @@ class GenerateNextRound(graphene.Mutation):
             if losers_bracket_concluded and losers_bracket_champion and winners_bracket_champion:
                 winners_name = getattr(winners_bracket_champion, 'name', "Unknown") if winners_bracket_champion else "Unknown"
                 losers_name = getattr(losers_bracket_champion, 'name', "Unknown") if losers_bracket_champion else "Unknown"
-                print(f"Both brackets concluded. Creating championship match between {winners_name} and {losers_name}")
+                logger.debug("Both brackets concluded. Creating championship match between %s and %s", winners_name, losers_name)
                 
-                # Create the championship match
-                championship_match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Scheduled",
-                    court="Championship Court",
-                    seed=1,
-                    round=current_round + 1,
-                    score1="0",
-                    score2="0",
+                # Create the championship match: winners bracket champion as team 1,
+                # losers bracket champion as team 2
+                participant_ids = first_participant_ids(tournament)
+                persist_plan(tournament, [head_to_head(
+                    team_entry(winners_bracket_champion, participant_ids),
+                    team_entry(losers_bracket_champion, participant_ids),
+                    current_round + 1,
+                    1,
+                    "Championship Court",
                     bracket_type="championship"
-                )
-                
-                # Add winners bracket champion as team 1
-                wb_participants = Participant.objects.filter(team_id=winners_bracket_champion)
-                if wb_participants.exists():
-                    MatchParticipant.objects.create(
-                        match_id=championship_match,
-                        participant_id=wb_participants.first(),
-                        team_number=1,
-                        team_id=winners_bracket_champion
-                    )
-                
-                # Add losers bracket champion as team 2
-                lb_participants = Participant.objects.filter(team_id=losers_bracket_champion)
-                if lb_participants.exists():
-                    MatchParticipant.objects.create(
-                        match_id=championship_match,
-                        participant_id=lb_participants.first(),
-                        team_number=2,
-                        team_id=losers_bracket_champion
-                    )
+                )])
                 
                 return True, f"Created championship match between {winners_name} and {losers_name}"
             else:
@@ -1278,10 +1249,9 @@ class GenerateNextRound(graphene.Mutation):
             # Only process if the last championship match is complete
             if last_championship.status == "Completed":
                 # Additional debug info about the championship match
-                print(f"DEBUG - Championship Match {last_championship.match_id}, Score: {last_championship.score1}-{last_championship.score2}")
+                logger.debug("Championship Match %s, Score: %s-%s", last_championship.match_id, last_championship.score1, last_championship.score2)
                 champ_participants = MatchParticipant.objects.filter(match_id=last_championship)
-                for p in champ_participants:
-                    print(f"DEBUG - Participant Team {p.team_id.name} has team_number={p.team_number}")
+                logger.debug("Championship participants: %s", lazy(participant_teams, champ_participants))
                 
                 # Get the losers bracket champion
                 losers_participants = MatchParticipant.objects.filter(match_id=losers_bracket_final)
@@ -1293,7 +1263,7 @@ class GenerateNextRound(graphene.Mutation):
                 if losers_bracket_final.status == "Bye":
                     lb_champion = losers_participants.first().team_id
                     lb_champion_name = getattr(lb_champion, 'name', "Unknown") if lb_champion else "Unknown"
-                    print(f"DEBUG - Losers bracket champion is {lb_champion_name} (bye)")
+                    logger.debug("Losers bracket champion is %s (bye)", lb_champion_name)
                 else:
                     # Get team IDs for the two teams in losers final
                     team1_data = losers_participants.filter(team_number=1).first()
@@ -1307,8 +1277,7 @@ class GenerateNextRound(graphene.Mutation):
                     
                     # Get scores with proper handling of invalid scores
                     try:
-                        score1 = int(losers_bracket_final.score1) if losers_bracket_final.score1 and losers_bracket_final.score1 != 'N/A' else 0
-                        score2 = int(losers_bracket_final.score2) if losers_bracket_final.score2 and losers_bracket_final.score2 != 'N/A' else 0
+                        score1, score2 = losers_bracket_final.int_scores()
                     except (ValueError, TypeError):
                         return False, "Invalid scores in losers bracket final"
                     
@@ -1316,16 +1285,16 @@ class GenerateNextRound(graphene.Mutation):
                     # Determine losers bracket champion (no ties allowed)
                     team1_name = getattr(team1, 'name', "Unknown") if team1 else "Unknown"
                     team2_name = getattr(team2, 'name', "Unknown") if team2 else "Unknown"
-                    print(f"DEBUG - Determining losers champion: Team {team1_name} (team_number=1, score={score1}) vs Team {team2_name} (team_number=2, score={score2})")
+                    logger.debug("Determining losers champion: Team %s (team_number=1, score=%s) vs Team %s (team_number=2, score=%s)", team1_name, score1, team2_name, score2)
                     
                     if score1 > score2:
                         # Team with team_number=1 won
                         lb_champion = team1
-                        print(f"DEBUG - Losers bracket champion is {team1_name} (team_number=1) with score {score1}-{score2}")
+                        logger.debug("Losers bracket champion is %s (team_number=1) with score %s-%s", team1_name, score1, score2)
                     elif score2 > score1:
                         # Team with team_number=2 won
                         lb_champion = team2
-                        print(f"DEBUG - Losers bracket champion is {team2_name} (team_number=2) with score {score1}-{score2}")
+                        logger.debug("Losers bracket champion is %s (team_number=2) with score %s-%s", team2_name, score1, score2)
                     else:
                         # If there's a tie, we can't determine a winner
                         return False, "Cannot determine losers bracket champion due to tied score"
@@ -1336,42 +1305,20 @@ class GenerateNextRound(graphene.Mutation):
                 
                 # Create the championship match (winners bracket champion vs losers bracket champion)
                 next_round = current_round + 1
-                championship_match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Scheduled",
-                    court="Championship Court",
-                    seed=1,
-                    round=next_round,
-                    score1="0",
-                    score2="0",
-                    bracket_type="championship"
-                )
-                
+                participant_ids = first_participant_ids(tournament)
+
                 # Winners bracket champion is always team 1
-                wb_participants = Participant.objects.filter(team_id=winners_bracket_final.team_id)
-                if wb_participants.exists():
-                    MatchParticipant.objects.create(
-                        match_id=championship_match,
-                        participant_id=wb_participants.first(),
-                        team_number=1,
-                        team_id=winners_bracket_final.team_id
-                    )
-                else:
+                wb_entry = team_entry(winners_bracket_final.team_id, participant_ids)
+                if wb_entry.participant_id is None:
                     return False, "Cannot find participants for winners bracket champion"
-                
+
                 # Losers bracket champion is always team 2
-                lb_participants = Participant.objects.filter(team_id=lb_champion)
-                if lb_participants.exists():
-                    MatchParticipant.objects.create(
-                        match_id=championship_match,
-                        participant_id=lb_participants.first(),
-                        team_number=2,
-                        team_id=lb_champion
-                    )
-                else:
+                lb_entry = team_entry(lb_champion, participant_ids)
+                if lb_entry.participant_id is None:
                     return False, "Cannot find participants for losers bracket champion"
+
+                persist_plan(tournament, [head_to_head(
+                    wb_entry, lb_entry, next_round, 1, "Championship Court", bracket_type="championship")])
                 
                 return True, f"Created championship match for Round {next_round}"
             else:
@@ -1380,12 +1327,9 @@ class GenerateNextRound(graphene.Mutation):
         # If we're here, we're creating the first championship match
         
         # Additional debug info about the winners bracket match
-        print(f"DEBUG - Winners Bracket Final {winners_bracket_final.match_id}, Score: {winners_bracket_final.score1}-{winners_bracket_final.score2}")
+        logger.debug("Winners Bracket Final %s, Score: %s-%s", winners_bracket_final.match_id, winners_bracket_final.score1, winners_bracket_final.score2)
         winners_participants = MatchParticipant.objects.filter(match_id=winners_bracket_final)
-        for p in winners_participants:
-            if p and p.team_id:
-                team_name = getattr(p.team_id, 'name', "Unknown")
-                print(f"DEBUG - Participant Team {team_name} has team_number={p.team_number}")
+        logger.debug("Winners final participants: %s", lazy(participant_teams, winners_participants))
             
         # Get the winners bracket champion
         if winners_participants.count() < 2:
@@ -1403,8 +1347,7 @@ class GenerateNextRound(graphene.Mutation):
         
         # Get scores with proper handling of invalid scores
         try:
-            score1 = int(winners_bracket_final.score1) if winners_bracket_final.score1 and winners_bracket_final.score1 != 'N/A' else 0
-            score2 = int(winners_bracket_final.score2) if winners_bracket_final.score2 and winners_bracket_final.score2 != 'N/A' else 0
+            score1, score2 = winners_bracket_final.int_scores()
         except (ValueError, TypeError):
             return False, "Invalid scores in winners bracket final"
         
@@ -1413,22 +1356,19 @@ class GenerateNextRound(graphene.Mutation):
         if score1 > score2:
             # Team with team_number=1 won
             wb_champion = team1
-            print(f"DEBUG - Winners bracket champion is {team1.name} (team_number=1) with score {score1}-{score2}")
+            logger.debug("Winners bracket champion is %s (team_number=1) with score %s-%s", team1.name, score1, score2)
         elif score2 > score1:
             # Team with team_number=2 won
             wb_champion = team2
-            print(f"DEBUG - Winners bracket champion is {team2.name} (team_number=2) with score {score1}-{score2}")
+            logger.debug("Winners bracket champion is %s (team_number=2) with score %s-%s", team2.name, score1, score2)
         else:
             # If there's a tie, we can't determine a winner
             return False, "Cannot determine winners bracket champion due to tied score"
         
         # Additional debug info about the losers bracket match
-        print(f"DEBUG - Losers Bracket Final {losers_bracket_final.match_id}, Score: {losers_bracket_final.score1}-{losers_bracket_final.score2}")
+        logger.debug("Losers Bracket Final %s, Score: %s-%s", losers_bracket_final.match_id, losers_bracket_final.score1, losers_bracket_final.score2)
         losers_participants = MatchParticipant.objects.filter(match_id=losers_bracket_final)
-        for p in losers_participants:
-            if p and p.team_id:
-                team_name = getattr(p.team_id, 'name', "Unknown")
-                print(f"DEBUG - Participant Team {team_name} has team_number={p.team_number}")
+        logger.debug("Losers final participants: %s", lazy(participant_teams, losers_participants))
             
         # Get the losers bracket champion
         if losers_participants.count() < 2 and losers_bracket_final.status != "Bye":
@@ -1438,7 +1378,7 @@ class GenerateNextRound(graphene.Mutation):
         if losers_bracket_final.status == "Bye":
             lb_champion = losers_participants.first().team_id
             lb_champion_name = getattr(lb_champion, 'name', "Unknown") if lb_champion else "Unknown"
-            print(f"DEBUG - Losers bracket champion is {lb_champion_name} (bye)")
+            logger.debug("Losers bracket champion is %s (bye)", lb_champion_name)
         else:
             # Get team IDs for the two teams in losers final
             team1_data = losers_participants.filter(team_number=1).first()
@@ -1452,8 +1392,7 @@ class GenerateNextRound(graphene.Mutation):
             
             # Get scores with proper handling of invalid scores
             try:
-                score1 = int(losers_bracket_final.score1) if losers_bracket_final.score1 and losers_bracket_final.score1 != 'N/A' else 0
-                score2 = int(losers_bracket_final.score2) if losers_bracket_final.score2 and losers_bracket_final.score2 != 'N/A' else 0
+                score1, score2 = losers_bracket_final.int_scores()
             except (ValueError, TypeError):
                 return False, "Invalid scores in losers bracket final"
             
@@ -1461,16 +1400,16 @@ class GenerateNextRound(graphene.Mutation):
             # Determine losers bracket champion (no ties allowed)
             team1_name = getattr(team1, 'name', "Unknown") if team1 else "Unknown"
             team2_name = getattr(team2, 'name', "Unknown") if team2 else "Unknown"
-            print(f"DEBUG - Determining losers champion: Team {team1_name} (team_number=1, score={score1}) vs Team {team2_name} (team_number=2, score={score2})")
+            logger.debug("Determining losers champion: Team %s (team_number=1, score=%s) vs Team %s (team_number=2, score=%s)", team1_name, score1, team2_name, score2)
             
             if score1 > score2:
                 # Team with team_number=1 won
                 lb_champion = team1
-                print(f"DEBUG - Losers bracket champion is {team1_name} (team_number=1) with score {score1}-{score2}")
+                logger.debug("Losers bracket champion is %s (team_number=1) with score %s-%s", team1_name, score1, score2)
             elif score2 > score1:
                 # Team with team_number=2 won
                 lb_champion = team2
-                print(f"DEBUG - Losers bracket champion is {team2_name} (team_number=2) with score {score1}-{score2}")
+                logger.debug("Losers bracket champion is %s (team_number=2) with score %s-%s", team2_name, score1, score2)
             else:
                 # If there's a tie, we can't determine a winner
                 return False, "Cannot determine losers bracket champion due to tied score"
@@ -1481,42 +1420,20 @@ class GenerateNextRound(graphene.Mutation):
         
         # Create the championship match (winners bracket champion vs losers bracket champion)
         next_round = current_round + 1
-        championship_match = Match.objects.create(
-            tournament=tournament,
-            start_date=tournament.start_date,
-            end_date=tournament.end_date,
-            status="Scheduled",
-            court="Championship Court",
-            seed=1,
-            round=next_round,
-            score1="0",
-            score2="0",
-            bracket_type="championship"
-        )
-        
+        participant_ids = first_participant_ids(tournament)
+
         # Winners bracket champion is always team 1
-        wb_participants = Participant.objects.filter(team_id=wb_champion)
-        if wb_participants.exists():
-            MatchParticipant.objects.create(
-                match_id=championship_match,
-                participant_id=wb_participants.first(),
-                team_number=1,
-                team_id=wb_champion
-            )
-        else:
+        wb_entry = team_entry(wb_champion, participant_ids)
+        if wb_entry.participant_id is None:
             return False, "Cannot find participants for winners bracket champion"
-        
+
         # Losers bracket champion is always team 2
-        lb_participants = Participant.objects.filter(team_id=lb_champion)
-        if lb_participants.exists():
-            MatchParticipant.objects.create(
-                match_id=championship_match,
-                participant_id=lb_participants.first(),
-                team_number=2,
-                team_id=lb_champion
-            )
-        else:
+        lb_entry = team_entry(lb_champion, participant_ids)
+        if lb_entry.participant_id is None:
             return False, "Cannot find participants for losers bracket champion"
+
+        persist_plan(tournament, [head_to_head(
+            wb_entry, lb_entry, next_round, 1, "Championship Court", bracket_type="championship")])
         
         return True, f"Created championship match for Round {next_round}"
 
@@ -1528,7 +1445,7 @@ class GenerateNextRound(graphene.Mutation):
         For losers bracket, the pairing follows the standard double elimination pattern.
         """
         if len(teams) < 1:
-            print(f"No teams provided for {bracket_type} bracket in round {round_number}")
+            logger.debug("No teams provided for %s bracket in round %s", bracket_type, round_number)
             return 0  # No teams, no matches to create
         
         # Special case: In losers bracket, if there's only one team and it's the final losers round,
@@ -1549,17 +1466,20 @@ class GenerateNextRound(graphene.Mutation):
                 ).count() > 0
                 
                 if winners_final_exists:
-                    print(f"Single team in losers bracket with winners final complete - ready for championship")
+                    logger.debug("Single team in losers bracket with winners final complete - ready for championship")
                     # Don't create a bye match, as this team should go to the championship match
                     # which will be created separately by the create_championship_match method
                     return 0
         
         matches_created = 0
         paired_teams = []
+        planned = []
+        # One lookup covers every team placed in this round
+        participant_ids = first_participant_ids(tournament)
         
         # For losers bracket, we need to follow the standard double elimination pattern
         if bracket_type == "losers":
-            print(f"Creating losers bracket matches for round {round_number} with {len(teams)} teams")
+            logger.debug("Creating losers bracket matches for round %s with %s teams", round_number, len(teams))
             
             # Check if we have teams coming from winners bracket (new losers)
             new_losers = [t for t in teams if t.get('is_new_loser', False) or t.get('round_eliminated')]
@@ -1575,21 +1495,22 @@ class GenerateNextRound(graphene.Mutation):
                     match_id__round__in=[round_number - 1, round_number - 2]  # Check last two rounds
                 ).values_list('team_id__team_id', flat=True).distinct())
                 
-                print(f"In create_next_round_double_elimination: Found {len(teams_with_recent_byes_ids)} teams with recent byes")
+                logger.debug("In create_next_round_double_elimination: Found %s teams with recent byes", len(teams_with_recent_byes_ids))
                 
-                # Print team IDs with recent byes for debugging
+                # Log team IDs with recent byes for debugging
                 if teams_with_recent_byes_ids:
-                    print(f"Team IDs with recent byes: {teams_with_recent_byes_ids}")
+                    logger.debug("Team IDs with recent byes: %s", teams_with_recent_byes_ids)
                 
                 # Tag teams with previous byes for special handling
                 for team in advancing_losers:
                     if team['team'].team_id in teams_with_recent_byes_ids:
                         team['had_recent_bye'] = True
-                        print(f"Team {getattr(team['team'], 'name', 'Unknown')} (ID: {team['team'].team_id}) had a recent bye")
+                        logger.debug(
+                            "Team %s (ID: %s) had a recent bye", getattr(team['team'], 'name', 'Unknown'), team['team'].team_id)
                     else:
                         team['had_recent_bye'] = False
             
-            print(f"  New losers: {len(new_losers)}, Advancing losers: {len(advancing_losers)}")
+            logger.debug("New losers: %s, Advancing losers: %s", len(new_losers), len(advancing_losers))
             
             # Case 1: Both new losers and advancing losers - standard double elimination pattern
             if new_losers and advancing_losers:
@@ -1633,7 +1554,7 @@ class GenerateNextRound(graphene.Mutation):
             
             # Case 2: Only new losers from winners bracket
             elif new_losers and not advancing_losers:
-                print("  Pairing only new losers from winners bracket")
+                logger.debug("Pairing only new losers from winners bracket")
                 new_losers.sort(key=lambda x: x.get('source_seed', 999))
                 
                 # In standard double elimination, for first round losers
@@ -1650,7 +1571,7 @@ class GenerateNextRound(graphene.Mutation):
             
             # Case 3: Only teams advancing in losers bracket
             elif advancing_losers and not new_losers:
-                print("  Pairing only teams advancing in losers bracket")
+                logger.debug("Pairing only teams advancing in losers bracket")
                 advancing_losers.sort(key=lambda x: x.get('source_seed', 999))
                 
                 for i in range(0, len(advancing_losers), 2):
@@ -1659,7 +1580,7 @@ class GenerateNextRound(graphene.Mutation):
         
         # For winners bracket and other bracket types, use standard pairing
         elif bracket_type == "winners":
-            print(f"Creating winners bracket matches for round {round_number} with {len(teams)} teams")
+            logger.debug("Creating winners bracket matches for round %s with %s teams", round_number, len(teams))
             
             # For winners bracket, sort teams based on the seed of the match they won
             # This ensures correct progression (Winner of Match 1 vs Winner of Match 2)
@@ -1667,20 +1588,20 @@ class GenerateNextRound(graphene.Mutation):
             
             # Apply seed-based pairing (High vs Low) ONLY for the first round
             if round_number == 1:
-                print(f"Applying High vs Low seed pairing for Round 1 Winners Bracket")
+                logger.debug("Applying High vs Low seed pairing for Round 1 Winners Bracket")
                 half = len(teams) // 2
                 for i in range(half):
                     paired_teams.append([teams[i], teams[len(teams) - 1 - i]])
             else:
                 # For subsequent rounds (Round 2+), use sequential pairing (Winner 1v2, Winner 3v4)
-                print(f"Applying sequential pairing for Round {round_number} Winners Bracket")
+                logger.debug("Applying sequential pairing for Round %s Winners Bracket", round_number)
                 for i in range(0, len(teams), 2):
                     if i + 1 < len(teams):
                         paired_teams.append([teams[i], teams[i+1]])
         
         # For other bracket types (e.g., swiss)
         else:
-            print(f"Creating {bracket_type} bracket matches for round {round_number} with {len(teams)} teams")
+            logger.debug("Creating %s bracket matches for round %s with %s teams", bracket_type, round_number, len(teams))
             # Group teams into pairs for matches (1 vs 2, 3 vs 4, etc.)
             for i in range(0, len(teams), 2):
                 if i + 1 < len(teams):
@@ -1696,7 +1617,7 @@ class GenerateNextRound(graphene.Mutation):
         unpaired_teams = [t for t in teams if t['team'] not in paired_team_objects]
         
         if unpaired_teams:
-            print(f"Need to assign {len(unpaired_teams)} byes")
+            logger.debug("Need to assign %s byes", len(unpaired_teams))
             
             # Get history of which teams have already had byes
             teams_with_byes = MatchParticipant.objects.filter(
@@ -1705,7 +1626,7 @@ class GenerateNextRound(graphene.Mutation):
                 match_id__bracket_type=bracket_type
             ).values_list('team_id', flat=True).distinct()
             
-            print(f"Teams that have previously had byes: {len(teams_with_byes)}")
+            logger.debug("Teams that have previously had byes: %s", len(teams_with_byes))
             
             # For the losers bracket, we need to be more strict about byes - avoid consecutive byes
             # Check if any teams got a bye in the last round or two rounds ago
@@ -1717,7 +1638,7 @@ class GenerateNextRound(graphene.Mutation):
                     match_id__bracket_type=bracket_type,
                     match_id__round__in=[round_number - 1, round_number - 2]  # Check last two rounds
                 ).values_list('team_id', flat=True).distinct()
-                print(f"Teams with recent byes in last two rounds: {len(teams_with_recent_byes)}")
+                logger.debug("Teams with recent byes in last two rounds: %s", len(teams_with_recent_byes))
                 
                 # ABSOLUTELY forbid consecutive byes - these teams must be paired
                 if teams_with_recent_byes:
@@ -1730,7 +1651,7 @@ class GenerateNextRound(graphene.Mutation):
                                 teams_with_byes_objects.append(team)
                                 break
                     
-                    print(f"Found {len(teams_with_byes_objects)} teams with recent byes that need pairing")
+                    logger.debug("Found %s teams with recent byes that need pairing", len(teams_with_byes_objects))
                     
                     # Force pairing of teams with recent byes if possible
                     if len(teams_with_byes_objects) >= 2:
@@ -1740,7 +1661,7 @@ class GenerateNextRound(graphene.Mutation):
                         # Pair them (as many as possible)
                         for i in range(0, len(teams_with_byes_objects) - 1, 2):
                             paired_teams.append([teams_with_byes_objects[i], teams_with_byes_objects[i+1]])
-                            print(f"Forced pairing to avoid consecutive byes: {getattr(teams_with_byes_objects[i]['team'], 'name', 'Unknown')} vs {getattr(teams_with_byes_objects[i+1]['team'], 'name', 'Unknown')}")
+                            logger.debug("Forced pairing to avoid consecutive byes: %s vs %s", getattr(teams_with_byes_objects[i]['team'], 'name', 'Unknown'), getattr(teams_with_byes_objects[i+1]['team'], 'name', 'Unknown'))
                         
                         # Remove these teams from unpaired_teams
                         for team in teams_with_byes_objects[:len(teams_with_byes_objects) - len(teams_with_byes_objects) % 2]:
@@ -1754,7 +1675,7 @@ class GenerateNextRound(graphene.Mutation):
                             for team in unpaired_teams:
                                 if team['team'].team_id not in teams_with_recent_byes:
                                     paired_teams.append([remaining_team, team])
-                                    print(f"Paired remaining team with bye: {getattr(remaining_team['team'], 'name', 'Unknown')} vs {getattr(team['team'], 'name', 'Unknown')}")
+                                    logger.debug("Paired remaining team with bye: %s vs %s", getattr(remaining_team['team'], 'name', 'Unknown'), getattr(team['team'], 'name', 'Unknown'))
                                     unpaired_teams.remove(team)
                                     if remaining_team in unpaired_teams:
                                         unpaired_teams.remove(remaining_team)
@@ -1765,7 +1686,7 @@ class GenerateNextRound(graphene.Mutation):
                         for team in unpaired_teams:
                             if team != bye_team:
                                 paired_teams.append([bye_team, team])
-                                print(f"Paired single team with bye: {getattr(bye_team['team'], 'name', 'Unknown')} vs {getattr(team['team'], 'name', 'Unknown')}")
+                                logger.debug("Paired single team with bye: %s vs %s", getattr(bye_team['team'], 'name', 'Unknown'), getattr(team['team'], 'name', 'Unknown'))
                                 unpaired_teams.remove(team)
                                 if bye_team in unpaired_teams:
                                     unpaired_teams.remove(bye_team)
@@ -1784,7 +1705,7 @@ class GenerateNextRound(graphene.Mutation):
                 # If all teams have had recent byes, we'll need to use a different method
                 all_had_recent_byes = all(t['team'].team_id in teams_with_recent_byes for t in unpaired_teams)
                 if all_had_recent_byes:
-                    print("All teams have had recent byes - pairing based on matching strengths")
+                    logger.debug("All teams have had recent byes - pairing based on matching strengths")
                     # In this case, we can pair the teams with similar strengths (source seeds)
                     unpaired_teams.sort(key=lambda x: x.get('source_seed', 999))
                     
@@ -1831,23 +1752,14 @@ class GenerateNextRound(graphene.Mutation):
             for team in unpaired_teams:
                 # Skip if team['team'] is None
                 if team.get('team') is None:
-                    print("Warning: Skipping None team that needs a bye")
+                    logger.warning("Skipping None team that needs a bye")
                     continue
                 
                 # For losers bracket, check if this team had a bye in previous rounds - if so, try to swap with another team
                 if bracket_type == "losers" and team['team'].team_id in teams_with_recent_byes:
-                    print(f"⚠️ WARNING: Team {getattr(team['team'], 'name', 'Unknown')} (ID: {team['team'].team_id}) would get a consecutive bye")
-                    print(f"  Had recent bye according to ID check: {team['team'].team_id in teams_with_recent_byes}")
-                    
-                    recent_bye_count = MatchParticipant.objects.filter(
-                        match_id__tournament=tournament,
-                        match_id__status='Bye',
-                        match_id__bracket_type='losers',
-                        match_id__round__in=[round_number - 1, round_number - 2],
-                        team_id=team['team']
-                    ).count()
-                    
-                    print(f"  Recent byes found in database: {recent_bye_count}")
+                    logger.warning(
+                        "Team %s (ID: %s) would get a consecutive bye",
+                        getattr(team['team'], 'name', 'Unknown'), team['team'].team_id)
                     
                     # Try to find another team that hasn't had a recent bye to give the bye to instead
                     swap_candidate = None
@@ -1862,7 +1774,7 @@ class GenerateNextRound(graphene.Mutation):
                                 
                                 # Make this team take the place of the swap candidate in the pair
                                 paired_teams[pair_idx][other_team_idx] = team
-                                print(f"🔄 Swapped team {getattr(team['team'], 'name', 'Unknown')} with {getattr(swap_candidate['team'], 'name', 'Unknown')} to avoid consecutive byes")
+                                logger.debug("Swapped team %s with %s to avoid consecutive byes", getattr(team['team'], 'name', 'Unknown'), getattr(swap_candidate['team'], 'name', 'Unknown'))
                                 
                                 # Now give the bye to the swap candidate
                                 team = swap_candidate
@@ -1871,36 +1783,20 @@ class GenerateNextRound(graphene.Mutation):
                             break
                     
                     if not swap_candidate:
-                        print("⚠️ Could not find a swap candidate - this team will get a consecutive bye")
-                
-                # If we got here, create the bye match
-                bye_match = Match.objects.create(
-                    tournament=tournament,
-                    start_date=tournament.start_date,
-                    end_date=tournament.end_date,
-                    status="Bye",
-                    court="Bye",
-                    seed=start_seed + len(paired_teams),  # Put bye matches at the end
-                    round=round_number,
-                    score1="N/A",
-                    score2="N/A",
-                    bracket_type=bracket_type
-                )
+                        logger.warning("Could not find a swap candidate - this team will get a consecutive bye")
                 
-                # Add the team with a bye
-                bye_team_participants = Participant.objects.filter(team_id=team['team'])
-                if bye_team_participants.exists():
-                    MatchParticipant.objects.create(
-                        match_id=bye_match,
-                        participant_id=bye_team_participants.first(),
-                        team_number=1,
-                        team_id=team['team']
-                    )
+                # If we got here, plan the bye match (put bye matches at the end)
+                planned.append(bye_match(
+                    team_entry(team['team'], participant_ids),
+                    round_number,
+                    start_seed + len(paired_teams),
+                    bracket_type
+                ))
                 
                 team_name = "Unknown"
                 if team['team'] is not None:
                     team_name = getattr(team['team'], 'name', "Unknown")
-                print(f"  Created bye match for {team_name}")
+                logger.debug("Created bye match for %s", team_name)
                 matches_created += 1
         
         # Create matches for paired teams
@@ -1910,48 +1806,24 @@ class GenerateNextRound(graphene.Mutation):
             
             # Skip if either team is None
             if team1.get('team') is None or team2.get('team') is None:
-                print("Warning: Skipping match with None team")
+                logger.warning("Skipping match with None team")
                 continue
                 
             team1_name = getattr(team1['team'], 'name', "Unknown") if team1['team'] else "Unknown"
             team2_name = getattr(team2['team'], 'name', "Unknown") if team2['team'] else "Unknown"
-            print(f"  Creating match: {team1_name} vs {team2_name}")
-            
-            # Create the match
-            match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Scheduled",
-                court=f"{bracket_type.capitalize()} Court {start_seed + i}",
-                seed=start_seed + i,
-                round=round_number,
-                score1="0",
-                score2="0",
+            logger.debug("Creating match: %s vs %s", team1_name, team2_name)
+            
+            planned.append(head_to_head(
+                team_entry(team1['team'], participant_ids),
+                team_entry(team2['team'], participant_ids),
+                round_number,
+                start_seed + i,
+                f"{bracket_type.capitalize()} Court {start_seed + i}",
                 bracket_type=bracket_type
-            )
-
-            # Add first team
-            team1_participants = Participant.objects.filter(team_id=team1['team'])
-            if team1_participants.exists():
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=team1_participants.first(),
-                    team_number=1,
-                    team_id=team1['team']
-                )
-
-            # Add second team
-            team2_participants = Participant.objects.filter(team_id=team2['team'])
-            if team2_participants.exists():
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=team2_participants.first(),
-                    team_number=2,
-                    team_id=team2['team']
-                )
-
+            ))
             matches_created += 1
+
+        persist_plan(tournament, planned)
         
         return matches_created
 
@@ -1979,48 +1851,19 @@ class GenerateNextRound(graphene.Mutation):
         advancing_teams = []
 
         # Process bye matches first - these teams automatically advance
-        for bye_match in bye_matches:
-            bye_participant = MatchParticipant.objects.filter(match_id=bye_match).first()
+        for bye in bye_matches:
+            bye_participant = MatchParticipant.objects.filter(match_id=bye).first()
             if bye_participant:
                 advancing_teams.append({
                     'team': bye_participant.team_id,
-                    'source_seed': bye_match.seed,  # Keep track of original seed
+                    'source_seed': bye.seed,  # Keep track of original seed
                     'is_bye_winner': True
                 })
 
-        # Process winners from completed matches
-        for match in completed_matches:
-            match_participants = MatchParticipant.objects.filter(match_id=match)
-
-            if match_participants.count() < 2:
-                continue  # Skip invalid matches
-
-            # Get team IDs for the two teams
-            team1_data = match_participants.filter(team_number=1).first()
-            team2_data = match_participants.filter(team_number=2).first()
-            
-            if not team1_data or not team2_data:
-                continue  # Skip if missing team data
-                
-            team1 = team1_data.team_id
-            team2 = team2_data.team_id
-            
-            # Get scores with proper handling of invalid scores
-            try:
-                score1 = int(match.score1) if match.score1 and match.score1 != 'N/A' else 0
-                score2 = int(match.score2) if match.score2 and match.score2 != 'N/A' else 0
-            except (ValueError, TypeError):
-                # If scores can't be converted to integers, treat as incomplete
-                continue
-            
-            # Only advance if there's a clear winner (no ties)
-            if score1 > score2:
-                winner_team = team1
-            elif score2 > score1:
-                winner_team = team2
-            else:
-                # Tie or incomplete match - skip this match
-                continue
+        # Process winners from completed matches. winner_team is only set for
+        # completed matches with a clear winner (no ties)
+        for match in completed_matches.filter(winner_team__isnull=False).select_related('winner_team'):
+            winner_team = match.winner_team
 
             # Add winner to advancing teams with original seed
             advancing_teams.append({
@@ -2033,6 +1876,20 @@ class GenerateNextRound(graphene.Mutation):
         if not advancing_teams:
             return False, "No teams advancing to next round. Ensure matches have clear winners."
 
+        # If we have only one team advancing, they're the champion; checked
+        # first so the final is not followed by a bye
+        if len(advancing_teams) == 1:
+            champion = advancing_teams[0]['team']
+            # Check if champion is None or doesn't have name attribute
+            if champion is None:
+                return True, "Tournament has a winner but champion data is incomplete"
+
+            try:
+                champion_name = getattr(champion, 'name', "Unknown")
+                return True, f"Tournament {tournament.name} has a winner: {champion_name}"
+            except AttributeError:
+                return True, "Tournament has a winner"
+
         # Calculate the next round
         next_round = current_round + 1
 
@@ -2047,21 +1904,7 @@ class GenerateNextRound(graphene.Mutation):
         
         if matches_created > 0:
             return True, f"Generated {matches_created} matches for Round {next_round}"
-        else:
-            # If we have only one team advancing, they're the champion
-            if len(advancing_teams) == 1:
-                champion = advancing_teams[0]['team']
-                # Check if champion is None or doesn't have name attribute
-                if champion is None:
-                    return True, "Tournament has a winner but champion data is incomplete"
-                
-                try:
-                    champion_name = getattr(champion, 'name', "Unknown")
-                    return True, f"Tournament {tournament.name} has a winner: {champion_name}"
-                except AttributeError:
-                    return True, "Tournament has a winner"
-            else:
-                return False, "Failed to create matches for the next round"
+        return False, "Failed to create matches for the next round"
 
     @staticmethod
     def create_next_round_swiss(tournament, current_round):
@@ -2069,169 +1912,36 @@ class GenerateNextRound(graphene.Mutation):
         Generate the next round of Swiss format matches.
         Teams are paired based on their current records.
         """
-        # Get all teams in the tournament with their current records
-        teams = Team.objects.filter(tournament_id=tournament)
-        team_records = {}
-        
-        # Calculate current records for each team
-        for team in teams:
-            wins = 0
-            losses = 0
-            
-            # Get all matches this team has played
-            team_matches = MatchParticipant.objects.filter(
-                team_id=team,
-                match_id__tournament=tournament,
-                match_id__round__lte=current_round,
-                match_id__status="Completed"
-            ).select_related('match_id')
-            
-            for match_participant in team_matches:
-                match = match_participant.match_id
-                team_number = match_participant.team_number
-                
-                try:
-                    score1 = int(match.score1) if match.score1 and match.score1 != 'N/A' else 0
-                    score2 = int(match.score2) if match.score2 and match.score2 != 'N/A' else 0
-                except (ValueError, TypeError):
-                    continue
-                
-                if team_number == 1:
-                    if score1 > score2:
-                        wins += 1
-                    elif score2 > score1:
-                        losses += 1
-                else:  # team_number == 2
-                    if score2 > score1:
-                        wins += 1
-                    elif score1 > score2:
-                        losses += 1
-            
-            team_records[team] = {
-                'wins': wins,
-                'losses': losses,
-                'points': wins  # Could be modified to include draws or other scoring
-            }
-        
-        # Sort teams by record (wins first, then points if needed)
-        sorted_teams = sorted(
-            team_records.keys(),
-            key=lambda t: (team_records[t]['wins'], team_records[t]['points']),
-            reverse=True
-        )
-        
+        # Rank teams by score and tiebreaks (Buchholz, Sonneborn-Berger, ...)
+        standings = swiss_standings(tournament, up_to_round=current_round)
+
         # Filter out teams without participants
-        teams_with_participants = [
-            team for team in sorted_teams 
-            if Participant.objects.filter(team_id=team).exists()
-        ]
-        
-        if len(teams_with_participants) < 2:
+        participant_ids = first_participant_ids(tournament)
+        ranked = [standing for standing in standings if standing.team_id in participant_ids]
+
+        if len(ranked) < 2:
             return False, "Not enough teams with participants for next round"
-        
-        matches = []
-        next_round = current_round + 1
-        
-        # Handle bye for odd number of teams
-        if len(teams_with_participants) % 2 == 1:
-            bye_team = teams_with_participants.pop()  # Give bye to lowest ranked team
-            bye_match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Bye",
-                court="Bye",
-                seed=len(teams_with_participants) + 1,
-                round=next_round,
-                score1="N/A",
-                score2="N/A",
-                bracket_type="swiss"
-            )
-            
-            MatchParticipant.objects.create(
-                match_id=bye_match,
-                participant_id=Participant.objects.filter(team_id=bye_team).first(),
-                team_number=1,
-                team_id=bye_team
-            )
-            matches.append(bye_match)
-        
-        # Create matches pairing teams with similar records
-        # Teams should not play each other more than once if possible
-        used_teams = set()
-        for i in range(0, len(teams_with_participants), 2):
-            if i + 1 >= len(teams_with_participants):
-                break
-                
-            team1 = teams_with_participants[i]
-            
-            # Find the next available team that hasn't played team1
-            team2 = None
-            for potential_team in teams_with_participants[i+1:]:
-                if potential_team in used_teams:
-                    continue
-                    
-                # Check if these teams have played each other
-                previous_match = MatchParticipant.objects.filter(
-                    team_id=team1,
-                    match_id__tournament=tournament,
-                    match_id__round__lte=current_round
-                ).filter(
-                    match_id__matchparticipant__team_id=potential_team
-                ).exists()
-                
-                if not previous_match:
-                    team2 = potential_team
-                    break
-            
-            # If no suitable team found, take the next available team
-            if team2 is None:
-                for potential_team in teams_with_participants[i+1:]:
-                    if potential_team not in used_teams:
-                        team2 = potential_team
-                        break
-            
-            if team2 is None:
-                continue  # No available opponent found
-            
-            # Create the match
-            match = Match.objects.create(
-                tournament=tournament,
-                start_date=tournament.start_date,
-                end_date=tournament.end_date,
-                status="Scheduled",
-                court=f"Court {i//2 + 1}",
-                seed=i//2 + 1,
-                round=next_round,
-                score1="0",
-                score2="0",
-                bracket_type="swiss"
-            )
-            
-            # Add first team
-            for participant in Participant.objects.filter(team_id=team1)[:1]:
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=participant,
-                    team_number=1,
-                    team_id=team1
-                )
-            
-            # Add second team
-            for participant in Participant.objects.filter(team_id=team2)[:1]:
-                MatchParticipant.objects.create(
-                    match_id=match,
-                    participant_id=participant,
-                    team_number=2,
-                    team_id=team2
+
+        # Pair teams with similar scores, avoiding rematches, from the
+        # opponents each team has already met (loaded once)
+        pairing = pair_swiss(
+            [
+                SwissPlayer(
+                    entry=TeamEntry(team_id=standing.team_id, participant_id=participant_ids[standing.team_id]),
+                    score=standing.score,
+                    had_bye=standing.byes > 0,
                 )
-            
-            matches.append(match)
-            used_teams.add(team1)
-            used_teams.add(team2)
+                for standing in ranked
+            ],
+            played_opponents(tournament),
+        )
+        next_round = current_round + 1
+        matches = plan_swiss_pairing(pairing, next_round)
         
         if not matches:
             return False, "No matches could be created for next round"
+
+        persist_plan(tournament, matches)
             
         return True, f"Generated {len(matches)} matches for Swiss format Round {next_round}"
 
@@ -0,0 +1,199 @@
+"""
+Background bracket generation.
+
+Generating a round robin for a large field writes tens of thousands of rows,
+too much for a GraphQL request. enqueueBracketGeneration stores a BracketJob
+instead, and the worker started with `python manage.py run_bracket_jobs`
+claims queued jobs from that table, so nothing beyond the database is needed.
+
+A round robin is written one round at a time. Each round is saved in the same
+transaction as the job's checkpoint (the shuffled entry order and the next
+round to write), so after a crash the job carries on from the last committed
+round without writing any match twice. Running jobs touch heartbeat_at as
+they go; one whose worker died is picked up again once it goes stale.
+"""
+import logging
+import time
+from dataclasses import replace
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .bracket.engine import TeamEntry, plan_round_robin, shuffled
+from .bracket.persistence import persist_plan
+from .bracket.queries import team_entries, teams_with_first_participant
+from .bracket.timetable import schedule_tournament_plan
+from .logs import traced
+from .models import BracketJob, Match
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "Queued"
+RUNNING = "Running"
+COMPLETED = "Completed"
+FAILED = "Failed"
+
+ROUND_ROBIN = "Round Robin"
+ROUND_ROBIN_TO_SINGLE_ELIMINATION = "Round Robin to Single Elimination"
+ROUND_ROBIN_TO_DOUBLE_ELIMINATION = "Round Robin to Double Elimination"
+JOB_FORMATS = (ROUND_ROBIN, ROUND_ROBIN_TO_SINGLE_ELIMINATION, ROUND_ROBIN_TO_DOUBLE_ELIMINATION)
+
+# A running job not heard from for this long is assumed to have crashed
+STALE_AFTER = timedelta(minutes=5)
+MAX_ATTEMPTS = 3
+
+
+class LeaseLost(Exception):
+    """Another worker has taken the job over."""
+
+
+def enqueue_bracket_generation(tournament, format):
+    """Queue a bracket generation job for the tournament and return it."""
+    if format not in JOB_FORMATS:
+        raise Exception(f"Generating {format} brackets in the background is not supported.")
+    if format != ROUND_ROBIN and tournament.format != format:
+        raise Exception(f"This tournament is not set up as a {format}.")
+    if tournament.bracket_jobs.filter(status__in=[QUEUED, RUNNING]).exists():
+        raise Exception("A bracket generation job is already queued for this tournament.")
+    return BracketJob.objects.create(tournament=tournament, format=format)
+
+
+def claim_next_job():
+    """Mark the oldest queued or stale job as running and return it, or None if there is none."""
+    stale = timezone.now() - STALE_AFTER
+    while True:
+        with transaction.atomic():
+            job = BracketJob.objects.select_for_update(skip_locked=True).select_related('tournament').filter(
+                Q(status=QUEUED) | Q(status=RUNNING, heartbeat_at__lt=stale)).order_by('job_id').first()
+            if job is None:
+                return None
+            if job.attempts >= MAX_ATTEMPTS:
+                _finish(job, FAILED, f"Gave up after {job.attempts} attempts.")
+                continue
+            job.status = RUNNING
+            # Claiming bumps attempts, which is how a worker that lost the
+            # job to another one finds out (see _checkpoint)
+            job.attempts += 1
+            job.heartbeat_at = timezone.now()
+            job.save(update_fields=['status', 'attempts', 'heartbeat_at'])
+            return job
+
+
+def run_job(job, rng=None):
+    """Run a claimed job to the end, continuing from its checkpoint; rng shuffles the entries."""
+    try:
+        with traced(logger, "Bracket job ran", job=job.pk, format=job.format):
+            if not job.checkpoint:
+                _plan_job(job, rng)
+            if job.checkpoint["stage"] == "round_robin":
+                _run_round_robin(job)
+            else:
+                _run_elimination(job)
+    except LeaseLost:
+        pass
+    except Exception as e:
+        _finish(job, FAILED, str(e))
+
+
+def run_pending_jobs(once=False, poll_interval=1.0):
+    """Work through the queue; with once, return as soon as it is empty."""
+    while True:
+        job = claim_next_job()
+        if job is not None:
+            run_job(job)
+        elif once:
+            return
+        else:
+            time.sleep(poll_interval)
+
+
+def _plan_job(job, rng=None):
+    tournament = job.tournament
+    if job.format != ROUND_ROBIN and Match.objects.filter(tournament=tournament).exists():
+        # Round robin already played, generate the elimination stage
+        _checkpoint(job, {"stage": "elimination"}, total=1)
+        return
+
+    teams = list(teams_with_first_participant(tournament))
+    if len(teams) < 2:
+        raise Exception("At least two teams are required to generate matches.")
+    entries = team_entries(teams)
+    if len(entries) < 2:
+        raise Exception("At least two teams must have participants.")
+
+    # Shuffled once and stored, so a resumed job plans the same schedule
+    entries = shuffled(entries, rng)
+    rounds = len(entries) - 1 if len(entries) % 2 == 0 else len(entries)
+    _checkpoint(job, {
+        "stage": "round_robin",
+        "entries": [[entry.team_id, entry.participant_id] for entry in entries],
+        "next_round": 1,
+    }, total=rounds)
+
+
+def _stage_match(format, planned):
+    # The round robin stage of a two stage tournament is all round 1
+    if format == ROUND_ROBIN_TO_SINGLE_ELIMINATION:
+        return replace(planned, round=1)
+    if format == ROUND_ROBIN_TO_DOUBLE_ELIMINATION:
+        return replace(planned, round=1, bracket_type="round_robin")
+    return planned
+
+
+def _run_round_robin(job):
+    entries = [TeamEntry(team_id, participant_id) for team_id, participant_id in job.checkpoint["entries"]]
+    by_round = {}
+    for planned in schedule_tournament_plan(job.tournament, plan_round_robin(entries)):
+        by_round.setdefault(planned.round, []).append(_stage_match(job.format, planned))
+
+    for round_number in range(job.checkpoint["next_round"], job.total + 1):
+        with transaction.atomic():
+            persist_plan(job.tournament, by_round.get(round_number, []))
+            _checkpoint(job, {**job.checkpoint, "next_round": round_number + 1}, progress=round_number)
+
+    if job.format == ROUND_ROBIN:
+        message = "Round-robin matches successfully generated."
+    elif job.format == ROUND_ROBIN_TO_SINGLE_ELIMINATION:
+        message = "Round robin stage matches generated. Complete these matches before proceeding to elimination stage."
+    else:
+        message = ("Round robin stage matches generated. "
+                   "Complete these matches before proceeding to double elimination stage.")
+    _finish(job, COMPLETED, message)
+
+
+def _run_elimination(job):
+    # Imported here since the mutations module imports this one
+    from .graphene.create_mutations import (
+        GenerateRoundRobinToDoubleElimination, GenerateRoundRobinToSingleElimination)
+
+    if job.format == ROUND_ROBIN_TO_SINGLE_ELIMINATION:
+        result = GenerateRoundRobinToSingleElimination.mutate(None, None, job.tournament_id)
+    else:
+        result = GenerateRoundRobinToDoubleElimination.mutate(None, None, job.tournament_id)
+    _finish(job, COMPLETED if result.success else FAILED, result.message, progress=job.total)
+
+
+def _checkpoint(job, checkpoint, total=None, progress=None):
+    """Save the job's progress, raising LeaseLost if another worker has claimed it since."""
+    with transaction.atomic():
+        attempts = BracketJob.objects.select_for_update().filter(pk=job.pk).values_list('attempts', flat=True).get()
+        if attempts != job.attempts:
+            raise LeaseLost()
+        job.checkpoint = checkpoint
+        if total is not None:
+            job.total = total
+        if progress is not None:
+            job.progress = progress
+        job.heartbeat_at = timezone.now()
+        job.save(update_fields=['checkpoint', 'total', 'progress', 'heartbeat_at'])
+
+
+def _finish(job, status, message, progress=None):
+    job.status = status
+    job.message = message
+    if progress is not None:
+        job.progress = progress
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'message', 'progress', 'finished_at'])
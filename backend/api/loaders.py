@@ -0,0 +1,180 @@
+"""
+Per-request batching for GraphQL relation fields.
+
+Resolving a relation such as `match.tournament` or `match.matchparticipant_set`
+one object at a time costs a query per object. Instead, every list of model
+instances a resolver returns is registered as a group of siblings, and the
+first time a relation is needed on any member of a group it is loaded for the
+whole group with one query. Rows loaded by primary key (or another unique
+field) are remembered for the rest of the request, so the same row is never
+fetched twice and each nesting level of a query costs a single query.
+"""
+from functools import lru_cache
+
+from django.db.models import Model, QuerySet, prefetch_related_objects
+
+
+@lru_cache(maxsize=None)
+def relation_field(model, name):
+    """The relation of model exposed under attribute name (reverse relations by accessor name)."""
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        if field.concrete and field.name == name:
+            return field
+        if not field.concrete and field.get_accessor_name() == name:
+            return field
+    raise LookupError(f"{model.__name__} has no relation {name}")
+
+
+class LoadedQuerySet(QuerySet):
+    """
+    Queryset whose rows were already batch loaded. all() keeps those rows, so
+    connection fields can count and slice them without going back to the
+    database; filtering still builds a fresh query.
+    """
+
+    def all(self):
+        if self._result_cache is not None:
+            return self
+        return super().all()
+
+
+class ModelLoader:
+    """Rows of one model keyed by a unique field, fetched in bulk on demand."""
+
+    def __init__(self, model, field_name):
+        self.model = model
+        self.field_name = field_name
+        self.rows = {}
+
+    def prime(self, instance):
+        self.rows.setdefault(getattr(instance, self.field_name), instance)
+
+    def load_many(self, keys):
+        missing = [key for key in keys if key not in self.rows]
+        if missing:
+            self.rows.update(self.model._default_manager.in_bulk(missing, field_name=self.field_name))
+            # Remember keys without a row so they are not requested again
+            for key in missing:
+                self.rows.setdefault(key, None)
+        return {key: self.rows[key] for key in keys}
+
+
+class LoaderRegistry:
+    def __init__(self):
+        self.loaders = {}
+        # id() of an instance -> the list of siblings it was loaded with
+        self.groups = {}
+        # (id() of a group, relation name) pairs already loaded for the group
+        self.loaded_sets = set()
+
+    def loader(self, model, field_name=None):
+        field_name = field_name or model._meta.pk.name
+        key = (model, field_name)
+        if key not in self.loaders:
+            self.loaders[key] = ModelLoader(model, field_name)
+        return self.loaders[key]
+
+    def register(self, instances):
+        """Record instances as siblings. An instance keeps the first group it was seen in."""
+        group = [instance for instance in instances if isinstance(instance, Model)]
+        for instance in group:
+            self.groups.setdefault(id(instance), group)
+            self.loader(type(instance)).prime(instance)
+        return group
+
+    def register_result(self, result):
+        """Register the instances in whatever a resolver returned, evaluating querysets."""
+        if isinstance(result, LoadedQuerySet):
+            return result
+        if isinstance(result, QuerySet):
+            result = list(result)
+        if isinstance(result, list):
+            self.register(result)
+        elif hasattr(result, 'edges') and isinstance(result.edges, list):
+            self.register([edge.node for edge in result.edges])
+        return result
+
+    def _siblings(self, instance):
+        group = self.groups.get(id(instance))
+        if group is None:
+            return [instance]
+        return group
+
+    def related(self, instance, name):
+        """Value of a relation field on instance, loading it for all of its siblings at once."""
+        field = relation_field(type(instance), name)
+        if field.many_to_one or (field.one_to_one and field.concrete):
+            return self._related_object(instance, field)
+        return self._related_set(instance, field, name)
+
+    def _related_object(self, instance, field):
+        if field.is_cached(instance):
+            return field.get_cached_value(instance)
+
+        pending = [
+            sibling for sibling in self._siblings(instance)
+            if type(sibling) is type(instance) and not field.is_cached(sibling)
+        ]
+        if not any(sibling is instance for sibling in pending):
+            pending.append(instance)
+
+        loader = self.loader(field.related_model, field.target_field.name)
+        rows = loader.load_many({getattr(sibling, field.attname) for sibling in pending} - {None})
+        for sibling in pending:
+            field.set_cached_value(sibling, rows.get(getattr(sibling, field.attname)))
+        self.register({id(row): row for row in rows.values() if row is not None}.values())
+
+        return field.get_cached_value(instance)
+
+    def _related_set(self, instance, field, name):
+        group = self._siblings(instance)
+        key = (id(group), name)
+        if key not in self.loaded_sets:
+            siblings = [sibling for sibling in group if type(sibling) is type(instance)]
+            if not any(sibling is instance for sibling in siblings):
+                siblings.append(instance)
+            prefetch_related_objects(siblings, name)
+            if len(group) > 1:
+                self.loaded_sets.add(key)
+                children = []
+                for sibling in siblings:
+                    children.extend(getattr(sibling, name).all())
+                self.register(children)
+
+        if field.one_to_one:
+            # Reverse one-to-one, cached on the instance by the prefetch
+            return getattr(instance, name, None)
+
+        queryset = getattr(instance, name).all()
+        loaded = LoadedQuerySet(model=queryset.model, query=queryset.query, using=queryset._db, hints=queryset._hints)
+        loaded._result_cache = list(queryset)
+        loaded._prefetch_done = True
+        return loaded
+
+
+def get_loaders(info):
+    """The LoaderRegistry of the current request, created on first use."""
+    context = info.context
+    if context is None:
+        return LoaderRegistry()
+    registry = getattr(context, 'graphql_loaders', None)
+    if registry is None:
+        registry = LoaderRegistry()
+        context.graphql_loaders = registry
+    return registry
+
+
+class LoaderMiddleware:
+    """Graphene middleware registering every resolved list as a group of siblings."""
+
+    def resolve(self, next, root, info, **args):
+        return get_loaders(info).register_result(next(root, info, **args))
+
+
+def relation_resolver(name):
+    """Resolver for a model relation field that goes through the request's loaders."""
+    def resolve(root, info, **kwargs):
+        return get_loaders(info).related(root, name)
+    return resolve
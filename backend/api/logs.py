@@ -0,0 +1,88 @@
+"""
+Logging helpers.
+
+Mutations log through logging.getLogger(__name__) with %-style arguments, so
+a message is only formatted when a handler actually emits it. An argument
+that would itself cost something to compute (a team name behind a foreign
+key, a queryset count) is wrapped in lazy(), which defers the call until the
+message is formatted; with the logger's level disabled no query is made.
+
+settings.LOGGING sets the levels per module and sends everything through
+SampleFilter, which keeps every warning and error but only a share of the
+debug and info records, and KeyValueFormatter, which writes one
+`key=value` line per record for log collectors to parse.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+
+class lazy:
+    """A log argument computed by calling function(*args) when the message is formatted."""
+
+    __slots__ = ('function', 'args')
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def __str__(self):
+        return str(self.function(*self.args))
+
+    def __repr__(self):
+        return repr(self.function(*self.args))
+
+
+class SampleFilter(logging.Filter):
+    """Passes every record at WARNING or above and a `rate` share of the rest."""
+
+    def __init__(self, rate=1.0, name=''):
+        super().__init__(name)
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+def _quoted(value):
+    text = str(value)
+    if not text or any(c in text for c in ' ="\n'):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+    return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    One line per record: time, level, logger and message, followed by the
+    fields passed as extra={"fields": {...}} and the exception, if any.
+    """
+
+    def format(self, record):
+        pairs = [
+            ('time', self.formatTime(record)),
+            ('level', record.levelname),
+            ('logger', record.name),
+            ('message', record.getMessage()),
+        ]
+        pairs.extend(getattr(record, 'fields', {}).items())
+        line = ' '.join(f"{key}={_quoted(value)}" for key, value in pairs)
+        if record.exc_info:
+            line += ' exception=' + _quoted(self.formatException(record.exc_info))
+        return line
+
+
+@contextmanager
+def traced(logger, name, **fields):
+    """Log how long the block took at DEBUG as `name`, with fields."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        fields['ms'] = round((time.perf_counter() - start) * 1000, 3)
+        logger.debug(name, extra={'fields': fields})
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.bracket.playout import FORMATS, SCORE_MODELS
+from api.fixtures import generate_fixtures
+from api.ratings import replay_ratings
+
+
+class Command(BaseCommand):
+    help = "Create fully played tournaments, the same ones for the same seed (see api/fixtures.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default="Single Elimination")
+        parser.add_argument("--tournaments", type=int, default=1)
+        parser.add_argument("--teams", type=int, default=8, help="Teams per tournament.")
+        parser.add_argument("--team-size", type=int, default=1, help="Participants per team.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--score-model", choices=SCORE_MODELS, default="strength",
+                            help="How match results are drawn from the teams' strengths.")
+        parser.add_argument("--rounds", type=int, help="Swiss rounds to play; enough for one unbeaten team by default.")
+        parser.add_argument("--rate", action="store_true", help="Replay every rating afterwards.")
+
+    def handle(self, *args, **options):
+        try:
+            counts = generate_fixtures(
+                options["format"], options["tournaments"], options["teams"], options["seed"],
+                options["score_model"], options["team_size"], options["rounds"])
+        except Exception as e:
+            raise CommandError(str(e))
+        self.stdout.write(", ".join(f"{count} {model}" for model, count in counts.items()))
+        if options["rate"]:
+            self.stdout.write(f"Rated {replay_ratings()} matches.")
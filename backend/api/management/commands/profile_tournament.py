@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Tournament
+from api.profiling import FORMATS, start_session, stop_sessions
+
+
+class Command(BaseCommand):
+    help = "Sample the GraphQL operations on one tournament into PROFILE_DIR (see api/profiling.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tournament_id", type=int)
+        parser.add_argument("--operation", default="",
+                            help="Only profile this operation name, e.g. GenerateNextRound.")
+        parser.add_argument("--format", choices=FORMATS, default="collapsed")
+        parser.add_argument("--count", type=int, default=10, help="Operations to profile.")
+        parser.add_argument("--minutes", type=float, default=30, help="Stop profiling after this long.")
+        parser.add_argument("--stop", action="store_true", help="End the tournament's profiling sessions.")
+
+    def handle(self, *args, **options):
+        tournament_id = options["tournament_id"]
+        if not Tournament.objects.filter(pk=tournament_id).exists():
+            raise CommandError(f"Tournament {tournament_id} not found.")
+        if options["stop"]:
+            stopped = stop_sessions(tournament_id)
+            self.stdout.write(f"Stopped {stopped} profiling sessions.")
+            return
+        session = start_session(
+            tournament_id, options["operation"], options["format"], options["count"], options["minutes"])
+        self.stdout.write(
+            f"Profiling the next {session.remaining} operations on tournament {tournament_id} "
+            f"until {session.expires_at:%H:%M}. Servers pick this up within a few seconds.")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.ratings import replay_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute every team and user rating from the completed matches (see api/ratings.py)."
+
+    def handle(self, *args, **options):
+        count = replay_ratings()
+        self.stdout.write(f"Rated {count} matches.")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued bracket generation jobs (see api/jobs.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Seconds to wait between checks of an empty queue.")
+
+    def handle(self, *args, **options):
+        run_pending_jobs(once=options["once"], poll_interval=options["poll_interval"])
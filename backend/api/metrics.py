@@ -0,0 +1,183 @@
+"""
+Per-request GraphQL metrics.
+
+MetricsGraphQLView (backend/views.py) runs every operation with a
+RequestMetrics installed as a database execute wrapper, so it counts each SQL
+statement, adds up the time spent in the database and keeps the slowest
+statements. MetricsMiddleware, in settings.GRAPHENE["MIDDLEWARE"], adds the
+wall time of every resolver call, keyed by `ParentType.field`.
+
+A request sent with the METRICS_HEADER header gets the metrics back in the
+response's `extensions` (only with settings.DEBUG on or for a staff user, as
+they include SQL). Every request is also recorded in a rolling in-process
+histogram per operation, read with histogram_snapshot(), and passed to the
+functions in `listeners`.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Header asking for the metrics in the response extensions
+METRICS_HEADER = "X-Debug-Metrics"
+# Statements and resolvers listed in the extensions
+SLOWEST_STATEMENTS = 5
+SLOWEST_RESOLVERS = 10
+# Requests per operation the histogram keeps
+HISTOGRAM_WINDOW = 1000
+# Operation names come from clients, so only this many get their own
+# histograms; the rest share OTHER_OPERATIONS
+MAX_OPERATIONS = 200
+OTHER_OPERATIONS = "other"
+# Upper bucket bounds; the last bucket is everything above the last bound
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+
+class RequestMetrics:
+    """Queries and resolver timings of one GraphQL operation."""
+
+    def __init__(self, operation=None):
+        self.operation = operation or "anonymous"
+        self.started = time.perf_counter()
+        self.duration_ms = None
+        self.queries = 0
+        self.db_ms = 0.0
+        # (ms, order, sql) min-heap of the slowest statements
+        self.slowest = []
+        # "ParentType.field" -> [calls, total ms]
+        self.resolvers = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper (connection.execute_wrapper)."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.db_ms += ms
+            entry = (ms, self.queries, sql)
+            if len(self.slowest) < SLOWEST_STATEMENTS:
+                heapq.heappush(self.slowest, entry)
+            elif ms > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def add_resolver(self, name, ms):
+        timing = self.resolvers.get(name)
+        if timing is None:
+            self.resolvers[name] = [1, ms]
+        else:
+            timing[0] += 1
+            timing[1] += ms
+
+    def finish(self):
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+
+    def as_extension(self):
+        resolvers = sorted(self.resolvers.items(), key=lambda item: -item[1][1])[:SLOWEST_RESOLVERS]
+        return {
+            "operation": self.operation,
+            "durationMs": round(self.duration_ms or 0.0, 3),
+            "queries": self.queries,
+            "dbMs": round(self.db_ms, 3),
+            "resolvers": [
+                {"field": name, "calls": calls, "ms": round(ms, 3)} for name, (calls, ms) in resolvers
+            ],
+            "slowestQueries": [
+                {"sql": sql, "ms": round(ms, 3)} for ms, _, sql in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+def get_metrics(info):
+    """The RequestMetrics of the current request, or None outside MetricsGraphQLView."""
+    return getattr(info.context, 'graphql_metrics', None)
+
+
+class MetricsMiddleware:
+    """Graphene middleware adding every resolver call's wall time to the request's metrics."""
+
+    def resolve(self, next, root, info, **args):
+        metrics = get_metrics(info)
+        if metrics is None:
+            return next(root, info, **args)
+        start = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            metrics.add_resolver(
+                f"{info.parent_type.name}.{info.field_name}", (time.perf_counter() - start) * 1000)
+
+
+class RollingHistogram:
+    """Bucket counts over the last `window` values recorded."""
+
+    def __init__(self, bounds, window=HISTOGRAM_WINDOW):
+        self.bounds = tuple(bounds)
+        self.values = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, value):
+        with self.lock:
+            self.values.append(value)
+
+    def snapshot(self):
+        with self.lock:
+            values = sorted(self.values)
+        counts = [0] * (len(self.bounds) + 1)
+        for value in values:
+            counts[bisect_left(self.bounds, value)] += 1
+        return {
+            "count": len(values),
+            "buckets": [[bound, count] for bound, count in zip(self.bounds + (None,), counts)],
+            "p50": values[len(values) // 2] if values else None,
+            "p95": values[min(len(values) - 1, len(values) * 95 // 100)] if values else None,
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+# Callables given every finished RequestMetrics, e.g. by benchmarks/load.py
+listeners = []
+
+
+def _operation_histograms(operation):
+    histograms = _histograms.get(operation)
+    if histograms is None:
+        with _histograms_lock:
+            if operation not in _histograms and len(_histograms) >= MAX_OPERATIONS:
+                operation = OTHER_OPERATIONS
+            histograms = _histograms.setdefault(operation, {
+                "durationMs": RollingHistogram(DURATION_BUCKETS_MS),
+                "dbMs": RollingHistogram(DURATION_BUCKETS_MS),
+                "queries": RollingHistogram(QUERY_BUCKETS),
+            })
+    return histograms
+
+
+def record(metrics):
+    """Add a finished request to its operation's histograms."""
+    histograms = _operation_histograms(metrics.operation)
+    histograms["durationMs"].record(metrics.duration_ms)
+    histograms["dbMs"].record(metrics.db_ms)
+    histograms["queries"].record(metrics.queries)
+    for listener in listeners:
+        listener(metrics)
+
+
+def histogram_snapshot():
+    """operation -> metric -> bucket counts and percentiles over the recent requests."""
+    with _histograms_lock:
+        operations = list(_histograms.items())
+    return {
+        operation: {name: histogram.snapshot() for name, histogram in histograms.items()}
+        for operation, histograms in operations
+    }
+
+
+def reset_histograms():
+    with _histograms_lock:
+        _histograms.clear()
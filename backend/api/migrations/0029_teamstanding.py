@@ -0,0 +1,64 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _score(value):
+    # As models.score_value: a match without a score has no result yet
+    if not value or value == 'N/A':
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def backfill_standings(apps, schema_editor):
+    """Build standings from every completed match scored so far."""
+    MatchParticipant = apps.get_model('api', 'MatchParticipant')
+    TeamStanding = apps.get_model('api', 'TeamStanding')
+
+    totals = {}
+    rows = MatchParticipant.objects.filter(match_id__status="Completed").values_list(
+        'team_id', 'team_number', 'match_id__score1', 'match_id__score2')
+    for team_id, team_number, score1, score2 in rows.iterator():
+        score1, score2 = _score(score1), _score(score2)
+        if score1 is None or score2 is None:
+            continue
+        own, other = (score1, score2) if team_number == 1 else (score2, score1)
+
+        standing = totals.setdefault(team_id, TeamStanding(team_id=team_id))
+        if own > other:
+            standing.wins += 1
+        elif own < other:
+            standing.losses += 1
+        else:
+            standing.ties += 1
+        standing.points_for += own
+        standing.points_against += other
+
+    TeamStanding.objects.bulk_create(totals.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_tournament_current_phase'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStanding',
+            fields=[
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='standing', serialize=False, to='api.team')),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('losses', models.PositiveIntegerField(default=0)),
+                ('ties', models.PositiveIntegerField(default=0)),
+                ('points_for', models.IntegerField(default=0)),
+                ('points_against', models.IntegerField(default=0)),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_standings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _score(value):
+    if not value or value == 'N/A':
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def backfill_results(apps, schema_editor):
+    """Fill the integer scores and winner of existing matches from their score strings."""
+    Match = apps.get_model('api', 'Match')
+    MatchParticipant = apps.get_model('api', 'MatchParticipant')
+
+    sides = {}
+    for match_id, team_number, team_id in MatchParticipant.objects.values_list(
+            'match_id', 'team_number', 'team_id').iterator():
+        sides[(match_id, team_number)] = team_id
+
+    batch = []
+    for match in Match.objects.only('match_id', 'status', 'score1', 'score2').iterator():
+        match.score1_value = _score(match.score1)
+        match.score2_value = _score(match.score2)
+        if match.status == "Completed" and None not in (match.score1_value, match.score2_value) \
+                and match.score1_value != match.score2_value:
+            winning_number = 1 if match.score1_value > match.score2_value else 2
+            match.winner_team_id = sides.get((match.match_id, winning_number))
+        batch.append(match)
+        if len(batch) >= 500:
+            Match.objects.bulk_update(batch, ['score1_value', 'score2_value', 'winner_team'])
+            batch = []
+    Match.objects.bulk_update(batch, ['score1_value', 'score2_value', 'winner_team'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_teamstanding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='score1_value',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='score2_value',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='winner_team',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='won_matches', to='api.team'),
+        ),
+        migrations.RunPython(backfill_results, migrations.RunPython.noop),
+    ]
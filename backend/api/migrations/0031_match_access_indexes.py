@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_match_result_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', 'round', 'seed'], name='match_tournament_round_seed'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', 'bracket_type', 'status', 'round'], name='match_bracket_status_round'),
+        ),
+        migrations.AddIndex(
+            model_name='matchparticipant',
+            index=models.Index(fields=['match_id', 'team_number'], name='matchpart_match_team_number'),
+        ),
+        migrations.AddIndex(
+            model_name='matchparticipant',
+            index=models.Index(fields=['team_id', 'match_id'], name='matchpart_team_match'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_match_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BracketSlot',
+            fields=[
+                ('slot_id', models.AutoField(primary_key=True, serialize=False)),
+                ('bracket_type', models.CharField(max_length=20)),
+                ('round', models.PositiveIntegerField()),
+                ('position', models.PositiveIntegerField()),
+                ('expects_team1', models.BooleanField(default=True)),
+                ('expects_team2', models.BooleanField(default=True)),
+                ('winner_to_side', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('loser_to_side', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('if_necessary', models.BooleanField(default=False)),
+                ('resolved', models.BooleanField(default=False)),
+                ('loser_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.bracketslot')),
+                ('match', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bracket_slot', to='api.match')),
+                ('team1', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.team')),
+                ('team2', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.team')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bracket_slots', to='api.tournament')),
+                ('winner_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.bracketslot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tournament', 'bracket_type', 'round', 'position'), name='bracketslot_unique_position')],
+            },
+        ),
+    ]
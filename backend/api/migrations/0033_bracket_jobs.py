@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_bracket_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BracketJob',
+            fields=[
+                ('job_id', models.AutoField(primary_key=True, serialize=False)),
+                ('format', models.CharField(max_length=50)),
+                ('status', models.CharField(default='Queued', max_length=20)),
+                ('progress', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('checkpoint', models.JSONField(blank=True, default=dict)),
+                ('message', models.TextField(blank=True, default='')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bracket_jobs', to='api.tournament')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'job_id'], name='bracketjob_status')],
+            },
+        ),
+    ]
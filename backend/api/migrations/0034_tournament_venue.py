@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:33
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_bracket_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='courts',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='rest_slots',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='slot_minutes',
+            field=models.PositiveIntegerField(default=60),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='venue_closes',
+            field=models.TimeField(default=datetime.time(21, 0)),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='venue_opens',
+            field=models.TimeField(default=datetime.time(9, 0)),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_tournament_venue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='rating_change',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='user_rating_change',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='rating',
+            field=models.FloatField(default=1500.0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating',
+            field=models.FloatField(default=1500.0),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.15 on 2026-10-18 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0035_ratings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilingSession',
+            fields=[
+                ('session_id', models.AutoField(primary_key=True, serialize=False)),
+                ('operation', models.CharField(blank=True, default='', max_length=100)),
+                ('format', models.CharField(default='collapsed', max_length=20)),
+                ('remaining', models.PositiveIntegerField(default=10)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profiling_sessions', to='api.tournament')),
+            ],
+        ),
+    ]
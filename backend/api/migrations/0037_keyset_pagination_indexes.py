@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0036_profiling_sessions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='match',
+            name='match_tournament_round_seed',
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', 'round', 'seed', 'match_id'], name='match_tournament_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(fields=['tournament_id', 'participant_id'], name='participant_tournament_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['tournament_id', 'team_id'], name='team_tournament_keyset'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0037_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='bracket_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
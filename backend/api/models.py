@@ -1,7 +1,23 @@
+import datetime
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
 
+def score_value(score):
+    """
+    Integer value of a score string, or None for "N/A", empty or unparsable
+    scores. Every reader of scores goes through this (or the score1_value and
+    score2_value columns it fills), so a score means the same everywhere.
+    """
+    if not score or score == 'N/A':
+        return None
+    try:
+        return int(score)
+    except (ValueError, TypeError):
+        return None
+
+
 class User(AbstractUser):
     user_id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100)
@@ -9,6 +25,8 @@ class User(AbstractUser):
     phone = models.CharField(max_length=15, blank=True, null=True)
     password = models.CharField(max_length=128)
     uuid = models.UUIDField(null=False, unique=True)
+    # Elo rating across every tournament played, see api/ratings.py
+    rating = models.FloatField(default=1500.0)
 
     username = None  # Remove the username field
     USERNAME_FIELD = 'email'  # Set email as the unique identifier
@@ -35,6 +53,17 @@ class Tournament(models.Model):
     password = models.TextField(null=True)
     is_private = models.BooleanField()
     current_phase = models.IntegerField(default=1)
+    # Venue used to give matches real courts and times (see bracket/schedule.py);
+    # matches are not scheduled while courts is unset
+    courts = models.PositiveIntegerField(null=True, blank=True)
+    slot_minutes = models.PositiveIntegerField(default=60)
+    venue_opens = models.TimeField(default=datetime.time(9, 0))
+    venue_closes = models.TimeField(default=datetime.time(21, 0))
+    rest_slots = models.PositiveIntegerField(default=1)
+    # Bumped whenever the bracket changes; cached snapshots are keyed on it
+    # (see api/snapshot.py), and keeping it here makes a bump visible to
+    # every process however the cache is configured
+    bracket_version = models.PositiveIntegerField(default=1)
 
     def __str__(self):
         return f"Tournament {self.tournament_id})"
@@ -55,11 +84,43 @@ class Team(models.Model):
     is_private = models.BooleanField()
     created_by_uuid = models.ForeignKey(
         User, on_delete=models.CASCADE, to_field="uuid")
+    # Elo rating within the tournament, see api/ratings.py
+    rating = models.FloatField(default=1500.0)
+
+    class Meta:
+        # Keyset pages of a tournament's teams (see graphene/pagination.py)
+        indexes = [
+            models.Index(fields=['tournament_id', 'team_id'], name='team_tournament_keyset'),
+        ]
 
     def __str__(self):
         return f"Team {self.name} ({self.tournament_id.name})"
 
 
+class TeamStanding(models.Model):
+    # Running totals for a team, maintained incrementally as match scores change
+    team = models.OneToOneField(
+        Team, on_delete=models.CASCADE, primary_key=True, related_name="standing")
+    wins = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    ties = models.PositiveIntegerField(default=0)
+    points_for = models.IntegerField(default=0)
+    points_against = models.IntegerField(default=0)
+    # Bumped on every applied change
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Standing for team {self.team_id}: {self.record}"
+
+    @property
+    def record(self):
+        # Same "W-L" / "W-L-T" format the frontend shows for Team.record
+        record = f"{self.wins}-{self.losses}"
+        if self.ties > 0:
+            record += f"-{self.ties}"
+        return record
+
+
 class Participant(models.Model):
     participant_id = models.AutoField(primary_key=True)
     user_id = models.ForeignKey(
@@ -69,6 +130,11 @@ class Participant(models.Model):
     team_id = models.ForeignKey(
         'Team', on_delete=models.SET_NULL, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tournament_id', 'participant_id'], name='participant_tournament_keyset'),
+        ]
+
     def __str__(self):
         return f"Participant {self.participant_id} in Tournament {self.tournament_id.tournament_id}"
 
@@ -80,6 +146,12 @@ class Match(models.Model):
     end_date = models.DateTimeField()
     score1 = models.CharField(max_length=10)
     score2 = models.CharField(max_length=10)
+    # Integer copies of score1/score2 and the team with the higher score of a
+    # completed match, kept in sync on save so results can be queried in SQL
+    score1_value = models.IntegerField(null=True, blank=True)
+    score2_value = models.IntegerField(null=True, blank=True)
+    winner_team = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, blank=True, related_name='won_matches')
     seed = models.PositiveIntegerField(default=0)
     round = models.PositiveIntegerField(default=1)
     # MIGHT NOT NEED THIS - calculate through start_date and end_date
@@ -87,14 +159,74 @@ class Match(models.Model):
     court = models.CharField(max_length=100)
     verified = models.PositiveIntegerField(default=0)
     bracket_type = models.CharField(max_length=20, default='winners')
+    # Elo changes this match applied to team 1 and to each user of team 1
+    # (team 2's side moved by the negative), so a corrected score can take
+    # them back; null while the match is unrated
+    rating_change = models.FloatField(null=True, blank=True)
+    user_rating_change = models.FloatField(null=True, blank=True)
 
     # Using a related name for easier reverse lookups
     participants = models.ManyToManyField(
         'Participant', through='MatchParticipant')
 
+    class Meta:
+        # Access paths of GenerateNextRound: a round ordered by seed, and a
+        # bracket's matches by status (ordered by round). The first also
+        # serves keyset pages of a tournament's matches, which end in match_id
+        indexes = [
+            models.Index(fields=['tournament', 'round', 'seed', 'match_id'], name='match_tournament_keyset'),
+            models.Index(fields=['tournament', 'bracket_type', 'status', 'round'], name='match_bracket_status_round'),
+        ]
+
+    # What a bracket snapshot shows of a match (see snapshot.py); saving a
+    # match only invalidates the snapshot when one of these changed
+    SNAPSHOT_FIELDS = (
+        'round', 'bracket_type', 'seed', 'court', 'status', 'score1', 'score2', 'verified', 'winner_team_id')
+
     def __str__(self):
         return f"Match {self.match_id}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        match = super().from_db(db, field_names, values)
+        match.saved_snapshot_state = match.snapshot_state()
+        return match
+
+    def snapshot_state(self):
+        """Values of SNAPSHOT_FIELDS; deferred fields that were never loaded read as None."""
+        return tuple(self.__dict__.get(field) for field in self.SNAPSHOT_FIELDS)
+
+    def save(self, *args, **kwargs):
+        self.sync_result()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'score1_value', 'score2_value', 'winner_team'}
+        super().save(*args, **kwargs)
+
+    def int_scores(self):
+        """(score1, score2) as score_value reads them; raises ValueError unless both have a value."""
+        scores = (score_value(self.score1), score_value(self.score2))
+        if None in scores:
+            raise ValueError(f"Match {self.pk} has no score: {self.score1}-{self.score2}")
+        return scores
+
+    def sync_result(self):
+        """Refresh score1_value, score2_value and winner_team from the score strings and status."""
+        self.score1_value = score_value(self.score1)
+        self.score2_value = score_value(self.score2)
+
+        winning_number = None
+        if self.status == "Completed" and self.score1_value is not None and self.score2_value is not None:
+            if self.score1_value > self.score2_value:
+                winning_number = 1
+            elif self.score2_value > self.score1_value:
+                winning_number = 2
+
+        self.winner_team_id = None
+        if winning_number and self.pk:
+            self.winner_team_id = MatchParticipant.objects.filter(
+                match_id=self.pk, team_number=winning_number).values_list('team_id', flat=True).first()
+
 
 class MatchParticipant(models.Model):
     match_id = models.ForeignKey(Match, on_delete=models.CASCADE)
@@ -107,6 +239,100 @@ class MatchParticipant(models.Model):
     class Meta:
         # Ensures a participant can only appear once per match
         unique_together = ('match_id', 'participant_id')
+        indexes = [
+            # Side lookups by team_number within a match
+            models.Index(fields=['match_id', 'team_number'], name='matchpart_match_team_number'),
+            # A team's matches, joined to Match to filter on status
+            models.Index(fields=['team_id', 'match_id'], name='matchpart_team_match'),
+        ]
 
     def __str__(self):
         return f"Match {self.match_id} - Participant {self.participant_id.user_id} in Team {self.team_number}"
+
+
+class BracketSlot(models.Model):
+    # One match position of a precomputed double elimination bracket (see
+    # bracket/graph.py), with edges to where its winner and loser go next
+    slot_id = models.AutoField(primary_key=True)
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='bracket_slots')
+    bracket_type = models.CharField(max_length=20)
+    round = models.PositiveIntegerField()
+    position = models.PositiveIntegerField()
+    team1 = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    team2 = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # Whether a team will ever reach each side; a slot expecting one team is a bye
+    expects_team1 = models.BooleanField(default=True)
+    expects_team2 = models.BooleanField(default=True)
+    winner_to = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    winner_to_side = models.PositiveSmallIntegerField(null=True, blank=True)
+    loser_to = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    loser_to_side = models.PositiveSmallIntegerField(null=True, blank=True)
+    # Bracket reset: only played if side 2 of the slot feeding it wins
+    if_necessary = models.BooleanField(default=False)
+    match = models.OneToOneField(
+        Match, on_delete=models.SET_NULL, null=True, blank=True, related_name='bracket_slot')
+    # Set once the slot's winner and loser have been sent on
+    resolved = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tournament', 'bracket_type', 'round', 'position'], name='bracketslot_unique_position'),
+        ]
+
+    def __str__(self):
+        return f"Slot {self.bracket_type} round {self.round} #{self.position}"
+
+    @property
+    def is_ready(self):
+        """Every team that will reach the slot has arrived."""
+        return (self.team1_id is not None or not self.expects_team1) and \
+            (self.team2_id is not None or not self.expects_team2)
+
+    @property
+    def is_bye(self):
+        return self.expects_team1 != self.expects_team2
+
+
+class BracketJob(models.Model):
+    # A bracket generation run by the worker (see api/jobs.py), checkpointed
+    # after every chunk of matches so a crashed job resumes where it stopped
+    job_id = models.AutoField(primary_key=True)
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='bracket_jobs')
+    format = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, default="Queued")
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    checkpoint = models.JSONField(default=dict, blank=True)
+    message = models.TextField(blank=True, default="")
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Touched by the worker after every chunk; a running job that stops
+    # being touched is picked up again
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'job_id'], name='bracketjob_status'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} ({self.format}, {self.status})"
+
+
+class ProfilingSession(models.Model):
+    # Turns on stack sampling of the GraphQL operations on one tournament
+    # (see api/profiling.py); started with `python manage.py profile_tournament`
+    session_id = models.AutoField(primary_key=True)
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='profiling_sessions')
+    # Operation name to profile; blank profiles every operation on the tournament
+    operation = models.CharField(max_length=100, blank=True, default="")
+    format = models.CharField(max_length=20, default="collapsed")
+    # Operations still to profile before the session ends by itself
+    remaining = models.PositiveIntegerField(default=10)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Profiling {self.operation or 'all operations'} on tournament {self.tournament_id}"
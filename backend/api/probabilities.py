@@ -0,0 +1,225 @@
+"""
+Advance probabilities.
+
+The chance each team has of winning its tournament, finishing in the top two
+or top four, and its expected place, from playing the rest of the tournament
+out many times (see bracket/simulation.py) with strengths fitted to the
+completed results. The state the simulation starts from is read the same way
+GenerateNextRound reads it for the tournament's format.
+
+Results are cached under the tournament's bracket version (see snapshot.py),
+which every score update bumps, so they are simulated again after the next
+score update and served from the cache until then.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .bracket.graph import plan_double_elimination_graph
+from .bracket.queries import first_participant_ids, match_results, swiss_standings
+from .bracket.simulation import (
+    GraphState, KnockoutState, LeagueState, fit_strengths, graph_slots, simulate, win_matrix)
+from .models import Match, MatchParticipant, Team
+
+SIMULATIONS = 100_000
+PROBABILITIES_TIMEOUT = 60 * 60
+
+
+@dataclass(frozen=True)
+class AdvanceProbability:
+    team_id: int
+    team_name: str
+    win_probability: float
+    top_two_probability: float
+    top_four_probability: float
+    expected_place: float
+
+
+def _cache_key(tournament_id, version):
+    return f"advance-probabilities:{tournament_id}:{version}"
+
+
+def get_advance_probabilities(tournament):
+    """AdvanceProbability for every team of the tournament taking part, most likely winner first."""
+    # The version comes with the tournament row, so no extra query
+    key = _cache_key(tournament.tournament_id, tournament.bracket_version)
+    probabilities = cache.get(key)
+    if probabilities is None:
+        probabilities = advance_probabilities(tournament)
+        cache.set(key, probabilities, PROBABILITIES_TIMEOUT)
+    return probabilities
+
+
+def advance_probabilities(tournament, simulations=None, seed=None, processes=None):
+    if simulations is None:
+        simulations = SIMULATIONS
+    if processes is None:
+        processes = getattr(settings, "SIMULATION_PROCESSES", 1)
+
+    teams = list(Team.objects.filter(tournament_id=tournament).order_by('team_id').values_list('team_id', 'name'))
+    index = {team_id: position for position, (team_id, _) in enumerate(teams)}
+
+    results = [result for result in match_results(tournament) if result[0] in index and result[1] in index]
+    strengths = fit_strengths(
+        len(teams),
+        [index[result[0]] for result in results],
+        [index[result[1]] for result in results],
+        [np.sign(result[2] - result[3]) * 0.5 + 0.5 for result in results],
+    )
+    state = _simulation_state(tournament, index)
+    outcome = simulate(win_matrix(strengths), state, simulations, seed=seed, processes=processes)
+
+    taking_part = np.isfinite(state.reached if not isinstance(state, LeagueState) else state.scores)
+    probabilities = [
+        AdvanceProbability(
+            team_id=team_id,
+            team_name=name,
+            win_probability=float(outcome.win[position]),
+            top_two_probability=float(outcome.top_two[position]),
+            top_four_probability=float(outcome.top_four[position]),
+            expected_place=float(outcome.expected_place[position]),
+        )
+        for position, (team_id, name) in enumerate(teams)
+        if taking_part[position]
+    ]
+    probabilities.sort(key=lambda probability: (-probability.win_probability, probability.expected_place))
+    return probabilities
+
+
+def _simulation_state(tournament, index):
+    if tournament.bracket_slots.exists():
+        return _graph_state(tournament, index)
+    if not Match.objects.filter(tournament=tournament).exists():
+        raise Exception("No matches found in this tournament.")
+
+    if tournament.format == "Swiss System":
+        return _league_state(tournament, index, swiss=True)
+    if tournament.format in ("Round Robin to Single Elimination", "Round Robin to Double Elimination"):
+        if not Match.objects.filter(tournament=tournament, round__gt=1).exists():
+            return _league_state(tournament, index, then=tournament.format)
+    if "Double Elimination" in tournament.format:
+        raise Exception("Advance probabilities need a double elimination bracket laid out as slots.")
+    if tournament.format == "Round Robin to Single Elimination":
+        return _knockout_state(tournament, index, first_round=2)
+    if tournament.format == "Round Robin":
+        return _league_state(tournament, index)
+    return _knockout_state(tournament, index)
+
+
+def _sides_by_match(matches):
+    """Map of match_id to its [team1_id, team2_id], None for a missing side."""
+    sides = {}
+    rows = MatchParticipant.objects.filter(match_id__in=matches).values_list('match_id', 'team_number', 'team_id')
+    for match_id, team_number, team_id in rows:
+        sides.setdefault(match_id, [None, None])[team_number - 1] = team_id
+    return sides
+
+
+def _knockout_state(tournament, index, first_round=1):
+    matches = Match.objects.filter(tournament=tournament, round__gte=first_round)
+    sides = _sides_by_match(matches)
+
+    # Teams start at the last round they played, which is where those already
+    # knocked out stay; the teams of the current round then play on
+    reached = np.full(len(index), -np.inf)
+    rows = list(matches.order_by('round', 'seed').values_list('match_id', 'round', 'status', 'winner_team_id'))
+    for match_id, round_number, _, _ in rows:
+        for team_id in sides.get(match_id, ()):
+            if team_id in index:
+                reached[index[team_id]] = round_number
+
+    last_round = rows[-1][1]
+    current = []
+    for match_id, round_number, status, winner_id in rows:
+        if round_number != last_round:
+            continue
+        team1, team2 = (index.get(team_id, -1) for team_id in sides.get(match_id, (None, None)))
+        if team1 < 0:
+            team1, team2 = team2, team1
+        if team1 < 0:
+            continue
+        current.append((team1, team2, index.get(winner_id, -1)))
+    if not current:
+        raise Exception("The current round has no matches with teams.")
+    return KnockoutState(matches=tuple(current), round=last_round, reached=reached)
+
+
+def _graph_state(tournament, index):
+    rows = sorted(
+        tournament.bracket_slots.select_related('match'),
+        key=lambda slot: (slot.round, slot.bracket_type != "winners", slot.bracket_type, slot.position))
+    positions = {slot.slot_id: position for position, slot in enumerate(rows)}
+
+    reached = np.full(len(index), -np.inf)
+    slots = []
+    for slot in rows:
+        team1, team2 = (index.get(team_id, -1) for team_id in (slot.team1_id, slot.team2_id))
+        for team in (team1, team2):
+            if team >= 0:
+                reached[team] = 0
+        winner = -1
+        if slot.match is not None and slot.match.status == "Completed":
+            winner = index.get(slot.match.winner_team_id, -1)
+        slots.append({
+            'round': slot.round,
+            'expects': (slot.expects_team1, slot.expects_team2),
+            'entries': (None, None),
+            'if_necessary': slot.if_necessary,
+            'winner_to': (positions[slot.winner_to_id], slot.winner_to_side) if slot.winner_to_id else None,
+            'loser_to': (positions[slot.loser_to_id], slot.loser_to_side) if slot.loser_to_id else None,
+            'team1': team1,
+            'team2': team2,
+            'winner': winner,
+        })
+    return GraphState(slots=tuple(slots), reached=reached)
+
+
+def _league_state(tournament, index, swiss=False, then=None):
+    matches = Match.objects.filter(tournament=tournament)
+    sides = _sides_by_match(matches)
+
+    scores = np.full(len(index), -np.inf)
+    for team_ids in sides.values():
+        for team_id in team_ids:
+            if team_id in index:
+                scores[index[team_id]] = 0
+    if swiss:
+        # Only teams with a participant are paired
+        taking_part = first_participant_ids(tournament)
+        for team_id, position in index.items():
+            if team_id not in taking_part:
+                scores[position] = -np.inf
+    for standing in swiss_standings(tournament):
+        position = index.get(standing.team_id)
+        if position is not None and np.isfinite(scores[position]):
+            scores[position] = standing.score
+
+    remaining = []
+    for match_id in matches.filter(status="Scheduled").values_list('match_id', flat=True):
+        team1, team2 = (index.get(team_id, -1) for team_id in sides.get(match_id, (None, None)))
+        if team1 >= 0 and team2 >= 0:
+            remaining.append((team1, team2))
+
+    swiss_rounds = 0
+    if swiss:
+        # Swiss tournaments here have no set length; play the usual
+        # ceil(log2(teams)) rounds
+        playing = int(np.isfinite(scores).sum())
+        last_round = matches.order_by('-round').values_list('round', flat=True).first() or 0
+        swiss_rounds = max(0, math.ceil(math.log2(max(playing, 2))) - last_round)
+
+    stage_slots = ()
+    if then == "Round Robin to Double Elimination":
+        playing = int(np.isfinite(scores).sum())
+        stage_slots = graph_slots(plan_double_elimination_graph(range(playing), first_round=2))
+    stages = {
+        None: None,
+        "Round Robin to Single Elimination": "single",
+        "Round Robin to Double Elimination": "double",
+    }
+    return LeagueState(
+        scores=scores, remaining=tuple(remaining), swiss_rounds=swiss_rounds, then=stages[then],
+        stage_slots=stage_slots)
@@ -0,0 +1,194 @@
+"""
+Opt-in sampling profiler for GraphQL operations.
+
+A ProfilingSession marks one tournament (and optionally one operation name)
+for profiling. While it is active, every matching operation that
+MetricsGraphQLView runs, recognised by its tournamentId variable, is sampled:
+a background thread reads the request thread's Python stack every
+SAMPLE_INTERVAL seconds, and when the operation finishes the samples are
+written to settings.PROFILE_DIR as either collapsed stacks (one
+`frame;frame;frame count` line per distinct stack, for flamegraph.pl or
+speedscope) or a speedscope JSON file, named after the operation.
+
+Sessions are started and stopped from the database with
+`python manage.py profile_tournament`, so no redeploy is needed. Each
+process rereads the active sessions at most every REFRESH_SECONDS, which
+keeps the lookup off the request path. A session ends after `remaining`
+operations or at expires_at, whichever comes first.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ProfilingSession
+
+SAMPLE_INTERVAL = 0.002
+REFRESH_SECONDS = 5.0
+FORMATS = ("collapsed", "speedscope")
+
+_sessions = []
+_sessions_loaded_at = None
+_sessions_lock = threading.Lock()
+
+
+def _frame_name(code):
+    path = code.co_filename
+    # Shorten paths inside the project to the part below backend/
+    base = str(settings.BASE_DIR) + os.sep
+    if path.startswith(base):
+        path = path[len(base):]
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Counts the stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.names = {}
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                name = self.names.get(code)
+                if name is None:
+                    name = self.names[code] = _frame_name(code)
+                stack.append(name)
+                frame = frame.f_back
+            if stack:
+                # Root first
+                self.samples[tuple(reversed(stack))] += 1
+
+
+def collapsed_stacks(samples):
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in samples.most_common())
+
+
+def speedscope_profile(samples, name, interval):
+    index, stacks, weights = {}, [], []
+    for stack, count in samples.most_common():
+        stacks.append([index.setdefault(frame, len(index)) for frame in stack])
+        weights.append(count * interval * 1000)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": [{"name": frame} for frame in index]},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": stacks,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "swoosh api.profiling",
+    }
+
+
+def write_profile(samples, operation, tournament_id, format, interval=SAMPLE_INTERVAL):
+    """Write samples to settings.PROFILE_DIR and return the path."""
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    # Operation names come from the client
+    label = re.sub(r'[^A-Za-z0-9_-]', '', operation or "")[:64] or "anonymous"
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S-%f')
+    name = f"{label}-tournament{tournament_id}-{stamp}"
+    if format == "speedscope":
+        path = os.path.join(settings.PROFILE_DIR, f"{name}.speedscope.json")
+        content = json.dumps(speedscope_profile(samples, name, interval))
+    else:
+        path = os.path.join(settings.PROFILE_DIR, f"{name}.collapsed")
+        content = collapsed_stacks(samples)
+    with open(path, "w") as profile:
+        profile.write(content)
+    return path
+
+
+def active_sessions(refresh=False):
+    """Active sessions, reread from the database at most every REFRESH_SECONDS."""
+    global _sessions, _sessions_loaded_at
+    now = time.monotonic()
+    with _sessions_lock:
+        if refresh or _sessions_loaded_at is None or now - _sessions_loaded_at > REFRESH_SECONDS:
+            _sessions = list(ProfilingSession.objects.filter(remaining__gt=0, expires_at__gt=timezone.now()))
+            _sessions_loaded_at = now
+        return _sessions
+
+
+def session_for(operation, variables):
+    """The active session matching an operation and its variables, if any."""
+    variables = variables or {}
+    tournament_id = variables.get('tournamentId', variables.get('tournament_id'))
+    if tournament_id is None:
+        return None
+    sessions = active_sessions()
+    if not sessions:
+        return None
+    for session in sessions:
+        if str(session.tournament_id) == str(tournament_id) and session.operation in ("", operation):
+            return session
+    return None
+
+
+@contextmanager
+def profiled(operation, variables):
+    """Sample the current thread during the block if a session covers the operation."""
+    session = session_for(operation, variables)
+    if session is None:
+        yield None
+        return
+    # Claim one of the session's operations; another process may have taken the last
+    claimed = ProfilingSession.objects.filter(pk=session.pk, remaining__gt=0).update(remaining=F('remaining') - 1)
+    if not claimed:
+        active_sessions(refresh=True)
+        yield None
+        return
+    sampler = StackSampler(threading.get_ident()).start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        write_profile(sampler.samples, operation, session.tournament_id, session.format, sampler.interval)
+
+
+def start_session(tournament_id, operation="", format="collapsed", count=10, minutes=30):
+    if format not in FORMATS:
+        raise Exception(f"Unknown profile format {format}, expected one of {', '.join(FORMATS)}.")
+    session = ProfilingSession.objects.create(
+        tournament_id=tournament_id, operation=operation, format=format, remaining=count,
+        expires_at=timezone.now() + timedelta(minutes=minutes))
+    active_sessions(refresh=True)
+    return session
+
+
+def stop_sessions(tournament_id):
+    stopped = ProfilingSession.objects.filter(tournament_id=tournament_id, remaining__gt=0).update(remaining=0)
+    active_sessions(refresh=True)
+    return stopped
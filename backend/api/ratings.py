@@ -0,0 +1,166 @@
+"""
+Elo ratings of teams and users (see bracket/elo.py).
+
+A team is rated on its matches within its tournament, a user on the matches of
+every team they have played for. Both are kept up to date as scores come in:
+apply_match_rating takes back whatever a match changed before, which is
+stored on the match, and rates its current result, much as standings.py moves
+standings from a match's previous result to its new one. A corrected score is
+rated against the current ratings, so after corrections the ratings can
+differ slightly from rating the matches in order; replay_ratings (run with
+`python manage.py replay_ratings`) rebuilds every rating from the history.
+"""
+import math
+
+from django.db import transaction
+from django.db.models import Avg
+
+from .bracket.elo import INITIAL_RATING, rating_change, replay_ratings as replay
+from .models import Match, MatchParticipant, Participant, Team, User
+
+BATCH_SIZE = 1000
+
+
+def match_outcome(match):
+    """What team 1 scored for its rating (1, 0.5 or 0), or None if the match has no result."""
+    if match.status != "Completed" or match.score1_value is None or match.score2_value is None:
+        return None
+    if match.score1_value == match.score2_value:
+        return 0.5
+    return 1.0 if match.score1_value > match.score2_value else 0.0
+
+
+def _mean(values):
+    return sum(values) / len(values)
+
+
+def apply_match_rating(match, team1_id, team2_id):
+    """Rate the current result of match between its two teams, replacing what it was rated before."""
+    if team1_id is None or team2_id is None:
+        return
+    with transaction.atomic():
+        teams = {team.team_id: team for team in Team.objects.select_for_update().filter(pk__in=[team1_id, team2_id])}
+        members = list(
+            Participant.objects.filter(team_id__in=[team1_id, team2_id]).values_list('team_id', 'user_id'))
+        users = {user.user_id: user for user in User.objects.select_for_update().filter(
+            pk__in=[user_id for _, user_id in members])}
+        team1, team2 = teams[team1_id], teams[team2_id]
+        side1 = [users[user_id] for team_id, user_id in members if team_id == team1_id]
+        side2 = [users[user_id] for team_id, user_id in members if team_id == team2_id]
+
+        if match.rating_change is not None:
+            team1.rating -= match.rating_change
+            team2.rating += match.rating_change
+        if match.user_rating_change is not None:
+            _move(side1, side2, -match.user_rating_change)
+
+        change = user_change = None
+        outcome = match_outcome(match)
+        if outcome is not None:
+            change = float(rating_change(team1.rating, team2.rating, outcome))
+            team1.rating += change
+            team2.rating -= change
+            if side1 and side2:
+                user_change = float(rating_change(
+                    _mean([user.rating for user in side1]), _mean([user.rating for user in side2]), outcome))
+                _move(side1, side2, user_change)
+
+        Team.objects.bulk_update([team1, team2], ['rating'])
+        User.objects.bulk_update(users.values(), ['rating'])
+        # update() rather than save(), this is not a change to the bracket
+        Match.objects.filter(pk=match.pk).update(rating_change=change, user_rating_change=user_change)
+        match.rating_change, match.user_rating_change = change, user_change
+
+
+def _move(side1, side2, change):
+    for user in side1:
+        user.rating += change
+    for user in side2:
+        user.rating -= change
+
+
+def remove_tournament_ratings(tournament_id):
+    """Take the rating changes of a tournament's matches back out of its users' ratings and reset its teams."""
+    rated = Match.objects.filter(tournament_id=tournament_id, user_rating_change__isnull=False)
+    sides = MatchParticipant.objects.filter(match_id__in=rated).values_list(
+        'match_id', 'team_number', 'team_id', 'match_id__user_rating_change')
+    members = Participant.objects.filter(tournament_id=tournament_id).values_list('team_id', 'user_id')
+
+    users_by_team = {}
+    for team_id, user_id in members:
+        users_by_team.setdefault(team_id, []).append(user_id)
+    changes = {}
+    for _, team_number, team_id, change in sides:
+        for user_id in users_by_team.get(team_id, ()):
+            changes[user_id] = changes.get(user_id, 0.0) + (change if team_number == 1 else -change)
+
+    with transaction.atomic():
+        users = list(User.objects.select_for_update().filter(pk__in=changes))
+        for user in users:
+            user.rating -= changes[user.user_id]
+        User.objects.bulk_update(users, ['rating'], batch_size=BATCH_SIZE)
+        Team.objects.filter(tournament_id=tournament_id).update(rating=INITIAL_RATING)
+
+
+def rank_by_rating(entries):
+    """TeamEntry objects best first by the mean rating of each team's users."""
+    ratings = dict(
+        Participant.objects.filter(team_id__in=[entry.team_id for entry in entries])
+        .values('team_id').annotate(rating=Avg('user_id__rating')).values_list('team_id', 'rating'))
+    return sorted(entries, key=lambda entry: -(ratings.get(entry.team_id) or INITIAL_RATING))
+
+
+def replay_ratings():
+    """
+    Recompute every team and user rating and every match's rating changes
+    from all completed matches, in the order they were played.
+    """
+    matches = list(
+        Match.objects.filter(status="Completed", score1_value__isnull=False, score2_value__isnull=False)
+        .order_by('end_date', 'match_id').values_list('match_id', 'score1_value', 'score2_value'))
+    position = {match_id: index for index, (match_id, _, _) in enumerate(matches)}
+    outcomes = [0.5 if score1 == score2 else float(score1 > score2) for _, score1, score2 in matches]
+
+    sides = MatchParticipant.objects.filter(match_id__status="Completed").values_list(
+        'match_id', 'team_number', 'team_id')
+    users_by_team = {}
+    for team_id, user_id in Participant.objects.values_list('team_id', 'user_id'):
+        users_by_team.setdefault(team_id, []).append(user_id)
+
+    team_ids, user_ids = {}, {}
+    team_members, user_members = ([], [], []), ([], [], [])
+    for match_id, team_number, team_id in sides:
+        if match_id not in position:
+            continue
+        for members, ids, player in (
+                (team_members, team_ids, [team_id]), (user_members, user_ids, users_by_team.get(team_id, ()))):
+            for player_id in player:
+                members[0].append(position[match_id])
+                members[1].append(ids.setdefault(player_id, len(ids)))
+                members[2].append(team_number)
+
+    teams = replay(len(team_ids), *team_members, outcomes)
+    users = replay(len(user_ids), *user_members, outcomes)
+
+    with transaction.atomic():
+        Team.objects.update(rating=INITIAL_RATING)
+        User.objects.update(rating=INITIAL_RATING)
+        Match.objects.update(rating_change=None, user_rating_change=None)
+        Team.objects.bulk_update(
+            [Team(team_id=team_id, rating=float(teams.ratings[index])) for team_id, index in team_ids.items()],
+            ['rating'], batch_size=BATCH_SIZE)
+        User.objects.bulk_update(
+            [User(user_id=user_id, rating=float(users.ratings[index])) for user_id, index in user_ids.items()],
+            ['rating'], batch_size=BATCH_SIZE)
+        Match.objects.bulk_update(
+            [
+                Match(match_id=match_id, rating_change=_stored(teams.changes[index]),
+                      user_rating_change=_stored(users.changes[index]))
+                for index, (match_id, _, _) in enumerate(matches)
+            ],
+            ['rating_change', 'user_rating_change'], batch_size=BATCH_SIZE)
+    return len(matches)
+
+
+def _stored(change):
+    return None if math.isnan(change) else float(change)
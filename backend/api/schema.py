@@ -2,6 +2,11 @@ import graphene
 from graphene_django.filter import DjangoFilterConnectionField
 
 from .graphene.types import *
+from .graphene.prefetch import optimize_queryset
+from .graphene.pagination import keyset_page
+from .bracket.queries import swiss_standings
+from .probabilities import get_advance_probabilities
+from .snapshot import get_bracket_snapshot
 from .graphene.mutations import Mutation
 from api.graphene.delete_mutations import *
 from api.graphene.create_mutations import *
@@ -30,7 +35,16 @@ class Query(graphene.ObjectType):
         TeamNode, tournament_id=graphene.String(required=True))
 
     def resolve_teams_by_tournament_id(self, info, tournament_id):
-        return Team.objects.filter(tournament_id__tournament_id=tournament_id)
+        return optimize_queryset(Team.objects.filter(tournament_id__tournament_id=tournament_id), info)
+
+    # Keyset paginated variants of the *ByTournamentId lists (see graphene/pagination.py)
+    tournament_teams = graphene.Field(
+        TeamNode._meta.connection, tournament_id=graphene.ID(required=True),
+        first=graphene.Int(), after=graphene.String())
+
+    def resolve_tournament_teams(self, info, tournament_id, first=None, after=None):
+        teams = optimize_queryset(Team.objects.filter(tournament_id=tournament_id), info)
+        return keyset_page(teams, ('team_id',), TeamNode._meta.connection, first, after)
 
     match = graphene.relay.Node.Field(MatchNode)
     all_matches = DjangoFilterConnectionField(MatchNode)
@@ -42,7 +56,52 @@ class Query(graphene.ObjectType):
         MatchNode, tournament_id=graphene.String())
 
     def resolve_all_matches_by_tournament_id(self, info, tournament_id):
-        return Match.objects.filter(tournament__tournament_id=tournament_id)
+        return optimize_queryset(Match.objects.filter(tournament__tournament_id=tournament_id), info)
+
+    tournament_matches = graphene.Field(
+        MatchNode._meta.connection, tournament_id=graphene.ID(required=True),
+        first=graphene.Int(), after=graphene.String(),
+        round=graphene.Int(), bracket_type=graphene.String(), status=graphene.String())
+
+    def resolve_tournament_matches(self, info, tournament_id, first=None, after=None, **filters):
+        matches = Match.objects.filter(
+            tournament_id=tournament_id, **{field: value for field, value in filters.items() if value is not None})
+        return keyset_page(
+            optimize_queryset(matches, info), ('round', 'seed', 'match_id'), MatchNode._meta.connection, first, after)
+
+    bracket_snapshot = graphene.Field(
+        BracketSnapshotType, tournament_id=graphene.String(required=True))
+
+    def resolve_bracket_snapshot(self, info, tournament_id):
+        return get_bracket_snapshot(tournament_id)
+
+    swiss_standings = graphene.List(
+        SwissStandingType, tournament_id=graphene.String(required=True))
+
+    def resolve_swiss_standings(self, info, tournament_id):
+        try:
+            tournament = Tournament.objects.get(pk=tournament_id)
+        except Tournament.DoesNotExist:
+            raise Exception(f"Tournament with ID {tournament_id} does not exist")
+        return swiss_standings(tournament)
+
+    advance_probabilities = graphene.List(
+        AdvanceProbabilityType, tournament_id=graphene.String(required=True))
+
+    def resolve_advance_probabilities(self, info, tournament_id):
+        try:
+            tournament = Tournament.objects.get(pk=tournament_id)
+        except Tournament.DoesNotExist:
+            raise Exception(f"Tournament with ID {tournament_id} does not exist")
+        return get_advance_probabilities(tournament)
+
+    job_status = graphene.Field(BracketJobType, id=graphene.ID(required=True))
+
+    def resolve_job_status(self, info, id):
+        try:
+            return BracketJob.objects.get(pk=id)
+        except BracketJob.DoesNotExist:
+            raise Exception(f"Job with ID {id} does not exist")
 
     participants_by_tournament_id = graphene.List(
         ParticipantType, tournament_id=graphene.String(
@@ -52,9 +111,17 @@ class Query(graphene.ObjectType):
     def resolve_participants_by_tournament_id(self, info, tournament_id):
         try:
             # ✅ Use the correct field
-            return Participant.objects.filter(tournament_id=int(tournament_id))
+            return optimize_queryset(Participant.objects.filter(tournament_id=int(tournament_id)), info)
         except Tournament.DoesNotExist:
             raise Exception("Tournament not found.")
 
+    tournament_participants = graphene.Field(
+        ParticipantNode._meta.connection, tournament_id=graphene.ID(required=True),
+        first=graphene.Int(), after=graphene.String())
+
+    def resolve_tournament_participants(self, info, tournament_id, first=None, after=None):
+        participants = optimize_queryset(Participant.objects.filter(tournament_id=tournament_id), info)
+        return keyset_page(participants, ('participant_id',), ParticipantNode._meta.connection, first, after)
+
 
 schema = graphene.Schema(query=Query, mutation=Mutation)
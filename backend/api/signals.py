@@ -0,0 +1,44 @@
+"""
+Model signal handlers that keep cached bracket snapshots current.
+
+Bulk writes (bulk_create, queryset.update) do not send signals; the code
+doing them calls bump_bracket_version itself.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Match, MatchParticipant, Team
+from .snapshot import bump_bracket_version
+
+
+@receiver(post_save, sender=Match)
+def match_saved(sender, instance, created, **kwargs):
+    # Saves that leave what the snapshot shows alone (dates, ratings) keep
+    # the cached snapshot and do not take the tournament row lock
+    state = instance.snapshot_state()
+    if created or state != getattr(instance, 'saved_snapshot_state', None):
+        bump_bracket_version(instance.tournament_id)
+    instance.saved_snapshot_state = state
+
+
+@receiver(post_delete, sender=Match)
+def match_deleted(sender, instance, **kwargs):
+    bump_bracket_version(instance.tournament_id)
+
+
+@receiver([post_save, post_delete], sender=MatchParticipant)
+def match_participant_changed(sender, instance, origin=None, **kwargs):
+    # Cascades from a deleted match or team are covered by their own handler
+    if getattr(origin, 'model', type(origin)) in (Match, Team):
+        return
+    if MatchParticipant.match_id.is_cached(instance):
+        tournament_id = instance.match_id.tournament_id
+    else:
+        tournament_id = Match.objects.filter(pk=instance.match_id_id).values_list('tournament_id', flat=True).first()
+    bump_bracket_version(tournament_id)
+
+
+@receiver([post_save, post_delete], sender=Team)
+def team_changed(sender, instance, **kwargs):
+    # Snapshots include team names
+    bump_bracket_version(instance.tournament_id_id)
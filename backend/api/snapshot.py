@@ -0,0 +1,93 @@
+"""
+Precomputed bracket snapshots.
+
+A snapshot is the whole bracket of a tournament as plain data: rounds, then
+brackets, then matches with their teams, scores and winner. It is built with
+three queries and cached under the tournament's bracket version, which is bumped
+whenever one of its match participants or teams is written, or a match is
+written with a change to what the snapshot shows of it (see api/signals.py
+and persist_plan), so readers never see a stale bracket and
+repeated reads are served from the cache.
+
+The version is a column of the tournament, not a cache entry: with the
+default per-process cache a bump made by one worker, or by the
+run_bracket_jobs process, would not reach the others. Reading it costs one
+primary key lookup per read, and each process then caches the snapshots of
+the versions it has seen.
+"""
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Tournament, Match, MatchParticipant
+
+SNAPSHOT_TIMEOUT = 60 * 60
+
+
+def _snapshot_key(tournament_id, version):
+    return f"bracket-snapshot:{tournament_id}:{version}"
+
+
+def bracket_version(tournament_id):
+    """The tournament's bracket version; raises an Exception if it does not exist."""
+    version = Tournament.objects.filter(pk=tournament_id).values_list('bracket_version', flat=True).first()
+    if version is None:
+        raise Exception(f"Tournament with ID {tournament_id} does not exist")
+    return version
+
+
+def bump_bracket_version(tournament_id):
+    """
+    Invalidate the cached snapshot of a tournament. The bump is part of the
+    current transaction, so other readers move to the new version when the
+    data it covers is committed, and not before.
+    """
+    if tournament_id is None:
+        return
+    Tournament.objects.filter(pk=tournament_id).update(bracket_version=F('bracket_version') + 1)
+
+
+def build_bracket_snapshot(tournament_id):
+    matches = Match.objects.filter(tournament_id=tournament_id).order_by('round', 'bracket_type', 'seed', 'match_id')
+    sides = MatchParticipant.objects.filter(match_id__tournament_id=tournament_id).order_by(
+        'match_id', 'team_number').values_list('match_id', 'team_number', 'team_id', 'team_id__name')
+
+    teams_by_match = {}
+    for match_id, team_number, team_id, name in sides:
+        teams_by_match.setdefault(match_id, []).append({
+            'team_number': team_number,
+            'team_id': team_id,
+            'name': name,
+        })
+
+    rounds = []
+    for match in matches:
+        if not rounds or rounds[-1]['round'] != match.round:
+            rounds.append({'round': match.round, 'brackets': []})
+        brackets = rounds[-1]['brackets']
+        if not brackets or brackets[-1]['bracket_type'] != match.bracket_type:
+            brackets.append({'bracket_type': match.bracket_type, 'matches': []})
+        brackets[-1]['matches'].append({
+            'match_id': match.match_id,
+            'seed': match.seed,
+            'court': match.court,
+            'status': match.status,
+            'score1': match.score1,
+            'score2': match.score2,
+            'verified': match.verified,
+            'winner_team_id': match.winner_team_id,
+            'teams': teams_by_match.get(match.match_id, []),
+        })
+
+    return {'tournament_id': int(tournament_id), 'rounds': rounds}
+
+
+def get_bracket_snapshot(tournament_id):
+    """The snapshot of the tournament's bracket, from the cache when it is current."""
+    version = bracket_version(tournament_id)
+    key = _snapshot_key(tournament_id, version)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_bracket_snapshot(tournament_id)
+        snapshot['version'] = version
+        cache.set(key, snapshot, timeout=SNAPSHOT_TIMEOUT)
+    return snapshot
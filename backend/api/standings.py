@@ -0,0 +1,96 @@
+"""
+Incremental team standings.
+
+A match contributes wins/losses/ties and points to its two teams only while it
+is "Completed". Whenever a match changes, the difference between what it
+contributed before and what it contributes now is applied to the TeamStanding
+rows of its teams, so re-applying the same score is a no-op and corrections to
+an already scored match simply move the totals by the delta.
+"""
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from .models import Team, TeamStanding, score_value
+
+# (wins, losses, ties, points_for, points_against)
+NO_CHANGE = (0, 0, 0, 0, 0)
+
+
+@dataclass(frozen=True)
+class MatchResult:
+    """The parts of a match that decide what it contributes to standings."""
+    status: str
+    score1: str
+    score2: str
+
+    @classmethod
+    def of(cls, match):
+        return cls(status=match.status, score1=match.score1, score2=match.score2)
+
+    def contribution(self):
+        """Pair of (wins, losses, ties, points_for, points_against) tuples for team 1 and team 2."""
+        if self.status != "Completed":
+            return NO_CHANGE, NO_CHANGE
+
+        score1 = score_value(self.score1)
+        score2 = score_value(self.score2)
+        if score1 is None or score2 is None:
+            return NO_CHANGE, NO_CHANGE
+
+        if score1 > score2:
+            return (1, 0, 0, score1, score2), (0, 1, 0, score2, score1)
+        if score2 > score1:
+            return (0, 1, 0, score1, score2), (1, 0, 0, score2, score1)
+        return (0, 0, 1, score1, score2), (0, 0, 1, score2, score1)
+
+
+def _difference(after, before):
+    return tuple(new - old for new, old in zip(after, before))
+
+
+def apply_result_change(before, after, team1_id, team2_id):
+    """
+    Move the standings of both teams from the `before` result of a match to
+    the `after` result. Either side may be None for a match that is being
+    created or deleted. Returns the updated TeamStanding rows.
+    """
+    before = before.contribution() if before else (NO_CHANGE, NO_CHANGE)
+    after = after.contribution() if after else (NO_CHANGE, NO_CHANGE)
+
+    deltas = {}
+    for team_id, old, new in ((team1_id, before[0], after[0]), (team2_id, before[1], after[1])):
+        delta = _difference(new, old)
+        if team_id is not None and any(delta):
+            deltas[team_id] = delta
+    if not deltas:
+        return []
+
+    updated = []
+    with transaction.atomic():
+        standings = {
+            standing.team_id: standing
+            for standing in TeamStanding.objects.select_for_update().filter(team_id__in=deltas)
+        }
+        for team_id, (wins, losses, ties, points_for, points_against) in deltas.items():
+            standing = standings.get(team_id) or TeamStanding(team_id=team_id)
+            standing.wins = max(0, standing.wins + wins)
+            standing.losses = max(0, standing.losses + losses)
+            standing.ties = max(0, standing.ties + ties)
+            standing.points_for += points_for
+            standing.points_against += points_against
+            standing.version += 1
+            standing.save()
+
+            # Team.record stays the string the frontend displays
+            Team.objects.filter(pk=team_id).update(record=standing.record)
+            updated.append(standing)
+
+    return updated
+
+
+def reset_tournament_standings(tournament_id):
+    """Clear standings and records for every team of a tournament, e.g. after its matches are deleted."""
+    with transaction.atomic():
+        TeamStanding.objects.filter(team__tournament_id=tournament_id).delete()
+        Team.objects.filter(tournament_id=tournament_id).update(record="0-0")
@@ -1,3 +1,1752 @@
-from django.test import TestCase
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from time import perf_counter
+from unittest.mock import patch
 
-# TODO - add some simple database unit tests in
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from benchmarks.frontend_operations import load_operations
+
+from .bracket.elo import INITIAL_RATING, rating_change, replay_ratings
+from .bracket.engine import (
+    TeamEntry, plan_round_robin, plan_seeded_elimination, plan_swiss_round)
+from .bracket.graph import LOSERS, WINNERS, plan_double_elimination_graph
+from .bracket.seeding import MAX_TABLE_SIZE, SEED_ORDERS, bracket_size, first_round_pairs, seed_order
+from .bracket.persistence import persist_plan
+from .bracket.playout import FORMATS, play_out
+from .bracket.schedule import Venue, schedule_matches, schedule_plan
+from .bracket.simulation import GraphState, KnockoutState, LeagueState, graph_slots, places, simulate, win_matrix
+from .bracket.queries import first_participant_ids, team_entries, teams_with_first_participant
+from .bracket.slots import advance_match, bracket_champion
+from .bracket.timetable import reschedule_matches
+from .fixtures import generate_fixtures
+from .bracket.swiss import SwissPlayer, pair_swiss, plan_swiss_pairing
+from .bracket.tiebreaks import compute_swiss_standings
+from .graphene.create_mutations import (
+    DeleteMatches, GenerateDoubleEliminationMatches, GenerateMatches, GenerateRoundRobinMatches,
+    GenerateRoundRobinToDoubleElimination, GenerateSwissMatches)
+from .graphene.update_mutations import GenerateNextRound, UpdateMatch, UpdateMatchScore
+from . import broadcast, events, jobs, ratings
+from .logs import KeyValueFormatter, SampleFilter, lazy, traced
+from .graphene.delete_mutations import KickTeam
+from .loaders import LoaderMiddleware
+from .metrics import RollingHistogram, histogram_snapshot, reset_histograms
+from .profiling import StackSampler, speedscope_profile, start_session
+from .models import (
+    User, Tournament, Participant, Team, TeamStanding, Match, MatchParticipant, BracketSlot, BracketJob, score_value)
+from .schema import schema
+from .snapshot import bracket_version
+from .standings import NO_CHANGE, MatchResult
+
+
+def make_tournament(num_teams, format="Single Elimination"):
+    """Create a tournament with num_teams teams of one participant each."""
+    owner_uuid = uuid.uuid4()
+    owner = User.objects.create(name="Owner", email=f"owner-{owner_uuid}@example.com", uuid=owner_uuid)
+    tournament = Tournament.objects.create(
+        name="Test Tournament",
+        start_date=timezone.now(),
+        end_date=timezone.now() + timedelta(days=1),
+        created_by=owner,
+        format=format,
+        show_email=False,
+        show_phone=False,
+        is_private=False,
+    )
+    teams = []
+    for i in range(num_teams):
+        user_uuid = uuid.uuid4()
+        user = User.objects.create(name=f"Player {i}", email=f"player-{user_uuid}@example.com", uuid=user_uuid)
+        team = Team.objects.create(
+            name=f"Team {i}", tournament_id=tournament, is_private=False, created_by_uuid=user)
+        Participant.objects.create(user_id=user, tournament_id=tournament, team_id=team)
+        teams.append(team)
+    return tournament, teams
+
+
+def entries(count):
+    return [TeamEntry(team_id=i, participant_id=100 + i) for i in range(1, count + 1)]
+
+
+class BracketEngineTests(SimpleTestCase):
+    def test_seeded_elimination_gives_top_seeds_the_byes(self):
+        plan = plan_seeded_elimination(entries(5), round_number=1)
+
+        self.assertIsInstance(plan, tuple)
+        self.assertEqual(sorted(m.sides[0].team_id for m in plan if m.is_bye), [1, 2, 3])
+        self.assertEqual([m.seed for m in plan], [1, 2, 3, 4])
+        self.assertTrue(all(m.court == f"Court {m.seed}" for m in plan if not m.is_bye))
+        self.assertTrue(all(m.bracket_type == "winners" for m in plan))
+
+    def test_swiss_gives_last_entry_the_bye(self):
+        plan = plan_swiss_round(entries(5))
+
+        bye = [m for m in plan if m.is_bye][0]
+        self.assertEqual(bye.sides[0].team_id, 5)
+        self.assertEqual(bye.seed, 5)
+        self.assertTrue(all(m.bracket_type == "swiss" for m in plan))
+
+    def test_round_robin_pairs_every_team_once(self):
+        plan = plan_round_robin(entries(7))
+
+        pairs = {frozenset(side.team_id for side in m.sides) for m in plan}
+        self.assertEqual(len(plan), 21)
+        self.assertEqual(len(pairs), 21)
+        self.assertEqual(max(m.round for m in plan), 7)
+
+    def test_seeded_elimination_pairs_high_with_low(self):
+        plan = plan_seeded_elimination(entries(6), round_number=2)
+
+        self.assertEqual(len(plan), 4)
+        # In bracket order: 1 (bye), 4v5, 2 (bye), 3v6
+        self.assertTrue(plan[0].is_bye and plan[2].is_bye)
+        self.assertEqual([s.team_id for s in plan[1].sides], [4, 5])
+        self.assertEqual([s.team_id for s in plan[3].sides], [3, 6])
+        self.assertTrue(all(m.round == 2 for m in plan))
+
+    def test_entries_without_participant_have_no_side(self):
+        plan = plan_seeded_elimination([TeamEntry(1, 10), TeamEntry(2)], round_number=1)
+
+        self.assertEqual(len(plan[0].sides), 1)
+
+
+def swiss_players(scores, had_bye=()):
+    return [
+        SwissPlayer(TeamEntry(team_id, 100 + team_id), score, team_id in had_bye)
+        for team_id, score in enumerate(scores, start=1)
+    ]
+
+
+def team_pairs(pairing):
+    return [(a.team_id, b.team_id) for a, b in pairing.pairs]
+
+
+class SwissPairingTests(SimpleTestCase):
+    def test_top_half_plays_bottom_half_of_score_group(self):
+        pairing = pair_swiss(swiss_players([0] * 8), {})
+
+        self.assertEqual(team_pairs(pairing), [(1, 5), (2, 6), (3, 7), (4, 8)])
+
+    def test_rematches_are_avoided(self):
+        played = {1: {5}, 5: {1}, 2: {6}, 6: {2}}
+
+        pairing = pair_swiss(swiss_players([0] * 8), played)
+
+        self.assertEqual(pairing.rematches, 0)
+        for a, b in team_pairs(pairing):
+            self.assertNotIn(b, played.get(a, ()))
+
+    def test_odd_player_floats_to_next_score_group(self):
+        pairing = pair_swiss(swiss_players([2, 1, 1, 1, 0, 0, 0, 0]), {})
+
+        # 1 floats down to the top of the next group, whose remaining players
+        # pair among themselves before the last group
+        self.assertEqual(team_pairs(pairing), [(1, 2), (3, 4), (5, 7), (6, 8)])
+
+    def test_bye_goes_to_lowest_ranked_player_without_one(self):
+        pairing = pair_swiss(swiss_players([2, 1, 1, 0, 0], had_bye={5}), {})
+
+        self.assertEqual(pairing.bye.team_id, 4)
+        self.assertEqual(len(pairing.pairs), 2)
+
+    def test_rematch_only_when_unavoidable(self):
+        played = {1: {2}, 2: {1}}
+
+        pairing = pair_swiss(swiss_players([0, 0]), played)
+
+        self.assertEqual(team_pairs(pairing), [(1, 2)])
+        self.assertEqual(pairing.rematches, 1)
+
+    def test_plan_numbers_courts_and_bye(self):
+        plan = plan_swiss_pairing(pair_swiss(swiss_players([0] * 5), {}), round_number=2)
+
+        self.assertTrue(plan[0].is_bye)
+        self.assertEqual(plan[0].seed, 5)
+        self.assertEqual([m.court for m in plan[1:]], ["Court 1", "Court 2"])
+        self.assertTrue(all(m.round == 2 and m.bracket_type == "swiss" for m in plan))
+
+
+class SwissTiebreakTests(SimpleTestCase):
+    def test_tiebreaks_of_a_small_event(self):
+        # Round 1: 1 beats 2, 3 beats 4. Round 2: 1 beats 3, 2 draws 4.
+        results = [(1, 2, 2, 0), (3, 4, 1, 0), (1, 3, 3, 1), (2, 4, 1, 1)]
+
+        standings = {s.team_id: s for s in compute_swiss_standings([1, 2, 3, 4], results)}
+
+        self.assertEqual([standings[t].score for t in (1, 2, 3, 4)], [2, 0.5, 1, 0.5])
+        self.assertEqual(standings[1].buchholz, 1.5)
+        self.assertEqual(standings[2].sonneborn_berger, 0.25)
+        self.assertEqual(standings[3].sonneborn_berger, 0.5)
+        self.assertAlmostEqual(standings[1].opponent_win_percentage, (1 / 3 + 0.5) / 2)
+        self.assertEqual((standings[2].ties, standings[2].losses), (1, 1))
+
+    def test_ranking_breaks_score_ties_by_buchholz(self):
+        # 2 and 3 both have one win, but 3 beat the stronger opponent
+        results = [(1, 2, 1, 0), (3, 4, 1, 0), (1, 4, 1, 0), (2, 5, 1, 0), (3, 5, 0, 1)]
+
+        ranked = compute_swiss_standings([1, 2, 3, 4, 5], results)
+
+        self.assertEqual(ranked[0].team_id, 1)
+        ordered = [s.team_id for s in ranked]
+        self.assertLess(ordered.index(2), ordered.index(3))
+        self.assertEqual([s.rank for s in ranked], [1, 2, 3, 4, 5])
+
+    def test_bye_counts_as_a_point(self):
+        standings = compute_swiss_standings([1, 2, 3], [(1, 2, 1, 0)], byes=[3])
+
+        self.assertEqual({s.team_id: s.score for s in standings}, {1: 1, 2: 0, 3: 1})
+
+    def test_median_buchholz_drops_best_and_worst_opponent(self):
+        results = [(1, 2, 1, 0), (1, 3, 1, 0), (1, 4, 1, 0), (2, 3, 1, 0), (2, 4, 1, 0), (3, 4, 1, 0)]
+
+        standings = {s.team_id: s for s in compute_swiss_standings([1, 2, 3, 4], results)}
+
+        self.assertEqual(standings[1].buchholz, 2 + 1 + 0)
+        self.assertEqual(standings[1].median_buchholz, 1)
+
+    def test_median_buchholz_of_a_team_without_games(self):
+        with np.errstate(all='raise'):
+            standings = {s.team_id: s for s in compute_swiss_standings([1, 2, 3], [(1, 2, 1, 0)], byes=[3])}
+
+        self.assertEqual(standings[3].median_buchholz, 0)
+
+
+class SeedingTests(SimpleTestCase):
+    def test_table_covers_every_bracket_up_to_the_limit(self):
+        self.assertEqual(max(SEED_ORDERS), MAX_TABLE_SIZE)
+        for size, order in SEED_ORDERS.items():
+            self.assertEqual(sorted(order), list(range(size)))
+        self.assertEqual(seed_order(2 * MAX_TABLE_SIZE)[:len(SEED_ORDERS[4])], [0, 8191, 4095, 4096])
+
+    def test_byes_go_to_the_top_seeds(self):
+        for count in (2, 3, 5, 6, 7, 12, 100, 1025, 4096):
+            pairs = first_round_pairs(count)
+            byes = sorted(high for high, low in pairs if low is None)
+
+            self.assertEqual(len(pairs), bracket_size(count) // 2)
+            self.assertEqual(byes, list(range(bracket_size(count) - count)))
+
+    def test_top_seeds_are_kept_apart(self):
+        pairs = first_round_pairs(64)
+        position = {seed: index for index, pair in enumerate(pairs) for seed in pair}
+
+        # The top 2^k seeds are in different 1/2^k parts of the bracket
+        for k in range(1, 6):
+            parts = {position[seed] * 2 ** k // len(pairs) for seed in range(2 ** k)}
+            self.assertEqual(len(parts), 2 ** k)
+
+
+class BracketGraphTests(SimpleTestCase):
+    def test_every_team_but_the_champion_loses_twice(self):
+        for count in (2, 3, 5, 8, 13, 1024, 1500):
+            slots = plan_double_elimination_graph(entries(count))
+            played = [slot for slot in slots if all(slot.expects) and not slot.if_necessary]
+            self.assertEqual(len(played), 2 * count - 2, count)
+
+    def test_top_seeds_meet_only_in_the_final(self):
+        order = seed_order(8)
+
+        self.assertEqual(order, [0, 7, 3, 4, 1, 6, 2, 5])
+        self.assertLess(order.index(0), 4)
+        self.assertGreaterEqual(order.index(1), 4)
+
+    def test_byes_go_to_top_seeds(self):
+        slots = {slot.key: slot for slot in plan_double_elimination_graph(entries(6))}
+
+        first = slots[(WINNERS, 1, 1)]
+        self.assertEqual(first.entries, (entries(6)[0], None))
+        self.assertTrue(first.is_bye)
+        # Nobody loses a bye, so the losers bracket slot it feeds is a bye as well
+        self.assertEqual(first.loser_to, ((LOSERS, 1, 1), 1))
+        self.assertTrue(slots[(LOSERS, 1, 1)].is_bye)
+
+    def test_edges_point_at_later_rounds(self):
+        slots = plan_double_elimination_graph(entries(16), first_round=2)
+        rounds = {slot.key: slot.round for slot in slots}
+
+        self.assertEqual(min(rounds.values()), 2)
+        for slot in slots:
+            for edge in (slot.winner_to, slot.loser_to):
+                if edge is not None:
+                    self.assertGreater(rounds[edge[0]], slot.round)
+
+
+class ScheduleTests(SimpleTestCase):
+    venue = Venue(courts=3, slot_minutes=30, opens=time(9), closes=time(12), rest_slots=1)
+    start = datetime(2026, 5, 1, 9, tzinfo=dt_timezone.utc)
+
+    def test_round_robin_schedule_respects_venue(self):
+        plan = schedule_plan(plan_round_robin(entries(8)), self.venue, self.start)
+
+        teams_at, courts_at = set(), set()
+        for match in plan:
+            self.assertTrue(time(9) <= match.start_date.time() < time(12))
+            self.assertEqual(match.end_date - match.start_date, timedelta(minutes=30))
+            self.assertIn(match.court, ["Court 1", "Court 2", "Court 3"])
+            self.assertNotIn((match.court, match.start_date), courts_at)
+            courts_at.add((match.court, match.start_date))
+            for side in match.sides:
+                # Neither double booked nor playing back to back
+                for other in (match.start_date, match.start_date - timedelta(minutes=30)):
+                    self.assertNotIn((side.team_id, other), teams_at)
+                teams_at.add((side.team_id, match.start_date))
+
+        # Resting every other slot, each team needs 13 slots for its 7 matches
+        self.assertEqual(max(match.start_date for match in plan), datetime(2026, 5, 3, 10, 30, tzinfo=dt_timezone.utc))
+
+    def test_every_court_of_a_slot_is_filled_first(self):
+        slots = schedule_matches([(1, 2), (3, 4), (5, 6), (7, 8)], self.venue, self.start)
+
+        self.assertEqual([slot.court for slot in slots], [1, 2, 3, 1])
+        self.assertEqual(slots[3].start, self.start + timedelta(minutes=30))
+
+    def test_busy_teams_and_courts_are_waited_for(self):
+        overrun_until = self.start + timedelta(minutes=50)
+        slots = schedule_matches(
+            [(1, 2), (3, 4)], self.venue, self.start,
+            team_free_at={1: overrun_until}, court_free_at={1: overrun_until})
+
+        # Team 1 rests a slot after its late match ends; court 1 is free from the next slot
+        self.assertEqual(slots[0].start, self.start + timedelta(minutes=90))
+        self.assertEqual((slots[1].court, slots[1].start), (2, self.start))
+
+
+class SimulationTests(SimpleTestCase):
+    # Team 0 beats anyone nine times in ten, the rest are even
+    P = win_matrix([9.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0])
+
+    def assertProbabilities(self, probabilities, teams=8):
+        self.assertAlmostEqual(probabilities.win.sum(), 1)
+        self.assertAlmostEqual(probabilities.top_two.sum(), 2)
+        self.assertAlmostEqual(probabilities.top_four.sum(), 4)
+        self.assertAlmostEqual(probabilities.expected_place.mean(), (teams + 1) / 2, delta=1)
+
+    def test_places_share_the_better_place(self):
+        reached = np.array([[3, np.inf, 1, 1, -np.inf]])
+
+        self.assertEqual(places(reached).tolist(), [[1, 0, 2, 2, 4]])
+
+    def test_knockout_favours_the_strongest_team(self):
+        state = KnockoutState(matches=tuple((2 * i, 2 * i + 1, -1) for i in range(4)), round=1, reached=np.zeros(8))
+
+        probabilities = simulate(self.P, state, 20000, seed=1)
+
+        self.assertProbabilities(probabilities)
+        # Three wins in a row at 0.9 each
+        self.assertAlmostEqual(probabilities.win[0], 0.9 ** 3, delta=0.02)
+
+    def test_decided_matches_are_not_replayed(self):
+        state = KnockoutState(matches=((0, 1, 1), (2, 3, -1)), round=2, reached=np.array([0.0, 0, 0, 0, 1, 1, 1, 1]))
+
+        probabilities = simulate(self.P, state, 5000, seed=1)
+
+        self.assertEqual(probabilities.win[0], 0)
+        self.assertEqual(probabilities.top_two[1], 1)
+        self.assertAlmostEqual(probabilities.win[1], 0.5, delta=0.03)
+
+    def test_double_elimination_graph(self):
+        planned = plan_double_elimination_graph(list(range(8)))
+        teams = {slot.key: tuple(-1 if seed is None else seed for seed in slot.entries) for slot in planned}
+        state = GraphState(slots=graph_slots(planned, teams=teams), reached=np.zeros(8))
+
+        probabilities = simulate(self.P, state, 20000, seed=1)
+
+        self.assertProbabilities(probabilities)
+        # Losing once is not enough to knock the strongest team out
+        self.assertGreater(probabilities.win[0], 0.9 ** 3)
+
+    def test_league_and_elimination_stage(self):
+        remaining = tuple((i, j) for i in range(8) for j in range(i + 1, 8))
+        for then, stage_slots in ((None, ()), ("single", ()), ("double", graph_slots(
+                plan_double_elimination_graph(list(range(8)), first_round=2)))):
+            state = LeagueState(scores=np.zeros(8), remaining=remaining, then=then, stage_slots=stage_slots)
+
+            probabilities = simulate(self.P, state, 10000, seed=1)
+
+            self.assertProbabilities(probabilities)
+            self.assertEqual(np.argmax(probabilities.win), 0)
+
+    def test_swiss_rounds_and_processes(self):
+        state = LeagueState(scores=np.array([1.0, 1, 0, 0, 0, 0, 0, -np.inf]), swiss_rounds=2)
+
+        with patch("api.bracket.simulation.CHUNK_CELLS", 8000):
+            serial = simulate(self.P, state, 4000, seed=3)
+            parallel = simulate(self.P, state, 4000, seed=3, processes=2)
+
+        self.assertAlmostEqual(serial.win.sum(), 1)
+        self.assertEqual(serial.win[7], 0)
+        self.assertEqual(serial.expected_place[7], 8)
+        np.testing.assert_allclose(serial.win, parallel.win)
+
+
+class EloTests(SimpleTestCase):
+    def test_replay_matches_rating_one_match_at_a_time(self):
+        rng = np.random.default_rng(4)
+        first = rng.integers(0, 20, 500)
+        second = (first + rng.integers(1, 20, 500)) % 20
+        outcomes = rng.integers(0, 3, 500) / 2
+
+        expected = np.full(20, INITIAL_RATING)
+        for team1, team2, outcome in zip(first, second, outcomes):
+            change = rating_change(expected[team1], expected[team2], outcome)
+            expected[team1] += change
+            expected[team2] -= change
+        replay = replay_ratings(
+            20, np.repeat(np.arange(500), 2), np.column_stack([first, second]).ravel(), np.tile([1, 2], 500), outcomes)
+
+        np.testing.assert_allclose(replay.ratings, expected)
+        self.assertEqual(replay.matches_played.sum(), 1000)
+
+    def test_sides_of_several_players_move_together(self):
+        # Players 0 and 1 beat player 2; match 1 has no second side
+        replay = replay_ratings(3, [0, 0, 0, 1], [0, 1, 2, 2], [1, 1, 2, 1], [1.0, 1.0])
+
+        self.assertEqual(replay.ratings[0], replay.ratings[1])
+        self.assertAlmostEqual(replay.ratings[0] - INITIAL_RATING, 16)
+        self.assertAlmostEqual(replay.ratings[2], INITIAL_RATING - 16)
+        self.assertTrue(np.isnan(replay.changes[1]))
+
+
+class GenerateMatchesTests(TestCase):
+    def test_generate_matches_persists_plan(self):
+        tournament, _ = make_tournament(5)
+
+        result = GenerateMatches.mutate(None, None, tournament.tournament_id)
+
+        # Padded to 8 positions, the three empty ones giving byes
+        self.assertEqual(len(result.matches), 4)
+        self.assertEqual(Match.objects.filter(tournament=tournament, status="Bye").count(), 3)
+        self.assertEqual(MatchParticipant.objects.filter(match_id__tournament=tournament).count(), 5)
+
+    def test_byes_only_in_the_first_round(self):
+        tournament, _ = make_tournament(11)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+
+        for round_number in range(1, 5):
+            play_round(tournament, round_number)
+            result = GenerateNextRound.mutate(None, None, tournament.tournament_id)
+
+        self.assertIn("has a winner", result.message)
+        byes = Match.objects.filter(tournament=tournament, status="Bye")
+        self.assertEqual(byes.count(), 5)
+        self.assertEqual(set(byes.values_list('round', flat=True)), {1})
+        self.assertEqual(Match.objects.filter(tournament=tournament, round=4).count(), 1)
+
+    def test_round_robin_persists_full_schedule(self):
+        tournament, _ = make_tournament(4, format="Round Robin")
+
+        GenerateRoundRobinMatches.mutate(None, None, tournament.tournament_id)
+
+        self.assertEqual(Match.objects.filter(tournament=tournament).count(), 6)
+        self.assertEqual(MatchParticipant.objects.filter(match_id__tournament=tournament).count(), 12)
+
+
+def play_round(tournament, round_number):
+    """Score every scheduled match of the round as a verified 2-1 win for team 1."""
+    for match in Match.objects.filter(tournament=tournament, round=round_number, status="Scheduled"):
+        UpdateMatchScore.mutate(None, None, match.match_id, "2", "1", verified=3)
+
+
+class PersistenceTests(TestCase):
+    def test_schedule_is_written_in_bulk(self):
+        tournament, teams = make_tournament(16)
+        plan = plan_round_robin([
+            TeamEntry(team.team_id, team.participant_set.get().participant_id) for team in teams])
+
+        with CaptureQueriesContext(connection) as queries:
+            persist_plan(tournament, plan)
+
+        self.assertEqual(Match.objects.filter(tournament=tournament).count(), 120)
+        self.assertEqual(MatchParticipant.objects.filter(match_id__tournament=tournament).count(), 240)
+        self.assertLess(len(queries), 10)
+
+    def test_next_round_advances_winners(self):
+        tournament, _ = make_tournament(4)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+        play_round(tournament, 1)
+
+        result = GenerateNextRound.mutate(None, None, tournament.tournament_id)
+
+        self.assertTrue(result.success, result.message)
+        final = Match.objects.get(tournament=tournament, round=2)
+        self.assertEqual(final.matchparticipant_set.count(), 2)
+
+
+class TeamLookupTests(TestCase):
+    def test_team_setup_cost_does_not_grow_with_teams(self):
+        small, _ = make_tournament(2)
+        with CaptureQueriesContext(connection) as small_queries:
+            team_entries(teams_with_first_participant(small))
+            first_participant_ids(small)
+
+        Team.objects.all().delete()
+        User.objects.all().delete()
+        large, teams = make_tournament(12)
+        Team.objects.create(name="Empty", tournament_id=large, is_private=False, created_by_uuid=large.created_by)
+        with CaptureQueriesContext(connection) as large_queries:
+            entries = team_entries(teams_with_first_participant(large))
+            participant_ids = first_participant_ids(large)
+
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertEqual(len(entries), 12)
+        self.assertEqual(set(participant_ids), {team.team_id for team in teams})
+
+
+class StandingsTests(TestCase):
+    def setUp(self):
+        self.tournament, self.teams = make_tournament(2)
+        GenerateMatches.mutate(None, None, self.tournament.tournament_id)
+        self.match = Match.objects.get(tournament=self.tournament)
+        self.team1, self.team2 = [
+            mp.team_id for mp in self.match.matchparticipant_set.order_by('team_number')]
+
+    def score(self, score1, score2):
+        UpdateMatchScore.mutate(None, None, self.match.match_id, score1, score2)
+
+    def test_score_updates_standings_and_record(self):
+        self.score("3", "1")
+
+        standing = TeamStanding.objects.get(team=self.team1)
+        self.assertEqual((standing.wins, standing.losses, standing.points_for, standing.points_against), (1, 0, 3, 1))
+        self.team2.refresh_from_db()
+        self.assertEqual(self.team2.record, "0-1")
+
+    def test_repeating_a_score_is_idempotent(self):
+        self.score("3", "1")
+        self.score("3", "1")
+
+        standing = TeamStanding.objects.get(team=self.team1)
+        self.assertEqual((standing.wins, standing.points_for, standing.version), (1, 3, 1))
+
+    def test_correction_moves_result_between_teams(self):
+        self.score("3", "1")
+        self.score("1", "1")
+        self.score("0", "2")
+
+        first = TeamStanding.objects.get(team=self.team1)
+        second = TeamStanding.objects.get(team=self.team2)
+        self.assertEqual((first.wins, first.losses, first.ties, first.points_for), (0, 1, 0, 0))
+        self.assertEqual((second.wins, second.losses, second.ties, second.points_for), (1, 0, 0, 2))
+
+    def test_match_edits_move_standings_by_their_change(self):
+        UpdateMatch.mutate(None, None, self.match.match_id, score1="3", score2="1", status="Completed")
+        UpdateMatch.mutate(None, None, self.match.match_id, score1="3", score2="1")
+        UpdateMatch.mutate(None, None, self.match.match_id, score1="1", score2="2")
+
+        first = TeamStanding.objects.get(team=self.team1)
+        second = TeamStanding.objects.get(team=self.team2)
+        self.assertEqual((first.wins, first.losses, first.points_for), (0, 1, 1))
+        self.assertEqual((second.wins, second.losses, second.points_for), (1, 0, 2))
+
+    def test_score_entry_cost_is_constant(self):
+        self.score("3", "1")
+        with CaptureQueriesContext(connection) as queries:
+            self.score("4", "1")
+        baseline = len(queries)
+
+        for _ in range(5):
+            match = Match.objects.create(
+                tournament=self.tournament, start_date=timezone.now(), end_date=timezone.now(),
+                status="Completed", court="Court", score1="1", score2="0")
+            for team_number, team in ((1, self.team1), (2, self.team2)):
+                MatchParticipant.objects.create(
+                    match_id=match, participant_id=team.participant_set.get(), team_number=team_number, team_id=team)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.score("5", "1")
+        self.assertEqual(len(queries), baseline)
+
+
+class MatchResultTests(TestCase):
+    def test_save_keeps_integer_scores_and_winner_in_sync(self):
+        tournament, _ = make_tournament(2)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+        match = Match.objects.get(tournament=tournament)
+        self.assertEqual((match.score1_value, match.score2_value, match.winner_team), (0, 0, None))
+
+        UpdateMatchScore.mutate(None, None, match.match_id, "1", "4")
+        match.refresh_from_db()
+        team2 = match.matchparticipant_set.get(team_number=2).team_id
+        self.assertEqual((match.score1_value, match.score2_value, match.winner_team), (1, 4, team2))
+
+        UpdateMatchScore.mutate(None, None, match.match_id, "4", "4")
+        match.refresh_from_db()
+        self.assertIsNone(match.winner_team)
+
+    def test_missing_scores_read_the_same_everywhere(self):
+        for score in ("N/A", "", "3-1"):
+            match = Match(status="Completed", score1=score, score2="2")
+            match.sync_result()
+
+            self.assertIsNone(score_value(score))
+            self.assertEqual((match.score1_value, match.winner_team), (None, None))
+            self.assertEqual(MatchResult.of(match).contribution(), (NO_CHANGE, NO_CHANGE))
+            with self.assertRaises(ValueError):
+                match.int_scores()
+
+    def test_debug_logging_adds_no_queries(self):
+        tournament, _ = make_tournament(2)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+        match = Match.objects.get(tournament=tournament)
+        UpdateMatchScore.mutate(None, None, match.match_id, "1", "4")
+
+        with CaptureQueriesContext(connection) as quiet:
+            UpdateMatchScore.mutate(None, None, match.match_id, "4", "1")
+        with self.assertLogs("api.graphene", "DEBUG"), CaptureQueriesContext(connection) as logged:
+            UpdateMatchScore.mutate(None, None, match.match_id, "1", "4")
+
+        self.assertEqual(len(logged), len(quiet))
+
+    def test_byes_have_no_integer_scores(self):
+        tournament, _ = make_tournament(3)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+
+        bye = Match.objects.get(tournament=tournament, status="Bye")
+        self.assertEqual((bye.score1_value, bye.score2_value), (None, None))
+
+    def test_swiss_round_pairs_teams_by_wins(self):
+        tournament, _ = make_tournament(4, format="Swiss System")
+        GenerateSwissMatches.mutate(None, None, tournament.tournament_id)
+        play_round(tournament, 1)
+
+        result = GenerateNextRound.mutate(None, None, tournament.tournament_id)
+
+        self.assertTrue(result.success, result.message)
+        self.assertIn("Swiss", result.message)
+        winners = set(Match.objects.filter(tournament=tournament, round=1).values_list('winner_team', flat=True))
+        for match in Match.objects.filter(tournament=tournament, round=2):
+            teams = {mp.team_id_id for mp in match.matchparticipant_set.all()}
+            self.assertIn(len(teams & winners), (0, 2))
+
+    def test_swiss_round_cost_does_not_grow_with_teams(self):
+        def next_round_queries(num_teams):
+            tournament, _ = make_tournament(num_teams, format="Swiss System")
+            GenerateSwissMatches.mutate(None, None, tournament.tournament_id)
+            play_round(tournament, 1)
+            with CaptureQueriesContext(connection) as queries:
+                result = GenerateNextRound.mutate(None, None, tournament.tournament_id)
+            self.assertTrue(result.success, result.message)
+            pairs = [
+                frozenset(match.matchparticipant_set.values_list('team_id', flat=True))
+                for match in Match.objects.filter(tournament=tournament).exclude(status="Bye")
+            ]
+            self.assertEqual(len(pairs), len(set(pairs)))
+            return len(queries)
+
+        self.assertEqual(next_round_queries(6), next_round_queries(24))
+
+
+MATCHES_BY_TOURNAMENT = """
+query GetMatchesByTournament($tournamentId: String!) {
+  allMatchesByTournamentId(tournamentId: $tournamentId) {
+    matchId
+    score1
+    tournament { tournamentId name createdBy { userId uuid name } }
+    matchparticipantSet {
+      edges {
+        node {
+          teamNumber
+          participantId {
+            participantId
+            userId { userId name }
+            teamId { teamId name }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def execute(query, **variables):
+    return schema.execute(
+        query, variables=variables, context_value=RequestFactory().post('/graphql/'),
+        middleware=[LoaderMiddleware()])
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        tournament, _ = make_tournament(4, format="Round Robin")
+        GenerateRoundRobinMatches.mutate(None, None, tournament.tournament_id)
+        self.body = json.dumps({
+            "query": MATCHES_BY_TOURNAMENT, "operationName": "GetMatchesByTournament",
+            "variables": {"tournamentId": str(tournament.tournament_id)},
+        })
+        reset_histograms()
+
+    def post(self, **headers):
+        response = self.client.post('/graphql/', self.body, content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    @override_settings(DEBUG=True)
+    def test_metrics_header_returns_extensions(self):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.post(**{"X-Debug-Metrics": "1"})
+
+        metrics = body["extensions"]["metrics"]
+        self.assertEqual(len(body["data"]["allMatchesByTournamentId"]), 6)
+        self.assertEqual(metrics["operation"], "GetMatchesByTournament")
+        # The profiler's session lookup is not the operation's
+        self.assertEqual(metrics["queries"], len([q for q in queries if 'api_profilingsession' not in q['sql']]))
+        self.assertIn("Query.allMatchesByTournamentId", [r["field"] for r in metrics["resolvers"]])
+        self.assertTrue(metrics["slowestQueries"])
+
+    def test_requests_are_recorded_without_extensions(self):
+        self.assertNotIn("extensions", self.post())
+        # Not DEBUG and not staff, so the header is ignored
+        self.assertNotIn("extensions", self.post(**{"X-Debug-Metrics": "1"}))
+
+        queries = histogram_snapshot()["GetMatchesByTournament"]["queries"]
+        self.assertEqual(queries["count"], 2)
+        self.assertGreater(queries["p50"], 0)
+
+    def test_failed_requests_are_recorded(self):
+        # Mutations are refused over GET with an exception from the view
+        response = self.client.get(
+            '/graphql/', {"query": "mutation Refused { __typename }", "operationName": "Refused"},
+            headers={"Accept": "application/json"})
+
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(histogram_snapshot()["Refused"]["queries"]["count"], 1)
+
+    @override_settings(DEBUG=True)
+    def test_profiler_queries_are_not_counted(self):
+        plain = self.post(**{"X-Debug-Metrics": "1"})["extensions"]["metrics"]["queries"]
+        tournament_id = json.loads(self.body)["variables"]["tournamentId"]
+        with tempfile.TemporaryDirectory() as directory, override_settings(PROFILE_DIR=directory):
+            start_session(tournament_id)
+            profiled = self.post(**{"X-Debug-Metrics": "1"})["extensions"]["metrics"]["queries"]
+
+        self.assertEqual(profiled, plain)
+
+    def test_rolling_histogram_keeps_the_last_values(self):
+        histogram = RollingHistogram((1, 10), window=3)
+        for value in (100, 1, 5, 50):
+            histogram.record(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 3)
+        self.assertEqual(snapshot["buckets"], [[1, 1], [10, 1], [None, 1]])
+
+
+def spin(seconds):
+    end = perf_counter() + seconds
+    while perf_counter() < end:
+        pass
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.tournament, _ = make_tournament(4, format="Round Robin")
+        GenerateRoundRobinMatches.mutate(None, None, self.tournament.tournament_id)
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profile_dir.cleanup)
+
+    def post(self, operation="GetMatchesByTournament"):
+        with override_settings(PROFILE_DIR=self.profile_dir.name):
+            response = self.client.post('/graphql/', json.dumps({
+                "query": MATCHES_BY_TOURNAMENT.replace("GetMatchesByTournament", operation),
+                "operationName": operation,
+                "variables": {"tournamentId": str(self.tournament.tournament_id)},
+            }), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return sorted(os.listdir(self.profile_dir.name))
+
+    def test_sampler_records_the_running_stack(self):
+        sampler = StackSampler(threading.get_ident(), interval=0.001).start()
+        spin(0.05)
+        sampler.stop()
+
+        self.assertTrue(any("spin" in stack[-1] for stack in sampler.samples))
+
+    def test_session_profiles_matching_operations_only(self):
+        start_session(self.tournament.tournament_id, operation="GetMatchesByTournament", count=1)
+
+        self.assertEqual(self.post("OtherOperation"), [])
+        files = self.post()
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith(f"GetMatchesByTournament-tournament{self.tournament.tournament_id}-"))
+        self.assertTrue(files[0].endswith(".collapsed"))
+        # The session's one operation is used up
+        self.assertEqual(self.post(), files)
+
+    def test_speedscope_profile_shares_frames(self):
+        samples = Counter({("main", "a"): 3, ("main", "b"): 1})
+
+        profile = speedscope_profile(samples, "test", 0.001)
+
+        self.assertEqual([frame["name"] for frame in profile["shared"]["frames"]], ["main", "a", "b"])
+        self.assertEqual(profile["profiles"][0]["samples"], [[0, 1], [0, 2]])
+        self.assertEqual(profile["profiles"][0]["weights"], [3.0, 1.0])
+
+
+class FrontendOperationsTests(SimpleTestCase):
+    def test_load_test_documents_are_found(self):
+        operations = load_operations()
+
+        self.assertEqual(operations["GET_MATCHES_BY_TOURNAMENT"][0], "GetMatchesByTournament")
+        self.assertEqual(operations["UPDATE_MATCH_SCORE"][0], "UpdateMatchScore")
+        self.assertIn("generateNextRound(tournamentId: $tournamentId)", operations["GENERATE_NEXT_ROUND"][1])
+
+
+class LoaderTests(TestCase):
+    def run_bracket_query(self, num_teams):
+        tournament, _ = make_tournament(num_teams, format="Round Robin")
+        GenerateRoundRobinMatches.mutate(None, None, tournament.tournament_id)
+        with CaptureQueriesContext(connection) as queries:
+            result = execute(MATCHES_BY_TOURNAMENT, tournamentId=str(tournament.tournament_id))
+        self.assertIsNone(result.errors)
+        return result.data['allMatchesByTournamentId'], len(queries)
+
+    def test_each_nesting_level_costs_one_query(self):
+        small, small_queries = self.run_bracket_query(4)
+        large, large_queries = self.run_bracket_query(12)
+
+        self.assertEqual(len(large), 66)
+        self.assertEqual(small_queries, large_queries)
+        # At most matches, tournament, creator, match participants, participants, users, teams
+        self.assertLessEqual(large_queries, 7)
+
+    def test_relations_resolve_to_the_right_rows(self):
+        matches, _ = self.run_bracket_query(3)
+
+        for match in matches:
+            sides = [edge['node'] for edge in match['matchparticipantSet']['edges']]
+            self.assertEqual(sorted(side['teamNumber'] for side in sides), [1, 2])
+            for side in sides:
+                team = Team.objects.get(pk=side['participantId']['teamId']['teamId'])
+                self.assertEqual(team.participant_set.get().user_id.name, side['participantId']['userId']['name'])
+
+    def test_filtered_relation_still_filters(self):
+        tournament, _ = make_tournament(4, format="Round Robin")
+        GenerateRoundRobinMatches.mutate(None, None, tournament.tournament_id)
+
+        result = execute("""
+            query ($tournamentId: String!) {
+              allMatchesByTournamentId(tournamentId: $tournamentId) {
+                matchparticipantSet(teamNumber: A_2) { edges { node { teamNumber } } }
+              }
+            }""", tournamentId=str(tournament.tournament_id))
+
+        self.assertIsNone(result.errors)
+        for match in result.data['allMatchesByTournamentId']:
+            self.assertEqual([edge['node']['teamNumber'] for edge in match['matchparticipantSet']['edges']], [2])
+
+
+class PrefetchTests(TestCase):
+    def test_bracket_query_is_fetched_up_front(self):
+        tournament, _ = make_tournament(8, format="Round Robin")
+        GenerateRoundRobinMatches.mutate(None, None, tournament.tournament_id)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = execute(MATCHES_BY_TOURNAMENT, tournamentId=str(tournament.tournament_id))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(result.data['allMatchesByTournamentId']), 28)
+        # Matches joined to tournament and creator, then match participants
+        # joined to participant, user and team
+        self.assertEqual(len(queries), 2)
+
+    def test_unselected_relations_are_not_joined(self):
+        tournament, _ = make_tournament(2)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = execute("""
+                query ($tournamentId: String!) {
+                  teamsByTournamentId(tournamentId: $tournamentId) { name }
+                }""", tournamentId=str(tournament.tournament_id))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+    def test_fragments_are_followed(self):
+        tournament, _ = make_tournament(4)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = execute("""
+                query ($tournamentId: String!) {
+                  participantsByTournamentId(tournamentId: $tournamentId) { ...Member }
+                }
+                fragment Member on ParticipantType { userId { name } teamId { name } }
+                """, tournamentId=str(tournament.tournament_id))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(result.data['participantsByTournamentId']), 4)
+        self.assertEqual(len(queries), 1)
+
+
+TOURNAMENT_MATCHES = """
+query ($tournamentId: ID!, $first: Int, $after: String, $round: Int) {
+  tournamentMatches(tournamentId: $tournamentId, first: $first, after: $after, round: $round) {
+    edges { cursor node { matchId round seed } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        self.tournament, self.teams = make_tournament(6, format="Round Robin")
+        GenerateRoundRobinMatches.mutate(None, None, self.tournament.tournament_id)
+
+    def pages(self, query, field, **variables):
+        after, pages = None, []
+        while True:
+            result = execute(query, tournamentId=str(self.tournament.tournament_id), after=after, **variables)
+            self.assertIsNone(result.errors)
+            connection = result.data[field]
+            pages.append([edge['node'] for edge in connection['edges']])
+            if not connection['pageInfo']['hasNextPage']:
+                return pages
+            after = connection['pageInfo']['endCursor']
+
+    def test_pages_follow_round_seed_and_id(self):
+        pages = self.pages(TOURNAMENT_MATCHES, 'tournamentMatches', first=4)
+
+        self.assertEqual([len(page) for page in pages], [4, 4, 4, 3])
+        expected = Match.objects.filter(tournament=self.tournament).order_by('round', 'seed', 'match_id')
+        self.assertEqual(
+            [int(node['matchId']) for page in pages for node in page], [match.match_id for match in expected])
+
+    def test_filters_and_later_rows(self):
+        first = execute(TOURNAMENT_MATCHES, tournamentId=str(self.tournament.tournament_id), first=2, round=2)
+        self.assertEqual({edge['node']['round'] for edge in first.data['tournamentMatches']['edges']}, {2})
+
+        # Rows added before the cursor do not shift the next page
+        cursor = first.data['tournamentMatches']['pageInfo']['endCursor']
+        extra = [TeamEntry(team.team_id) for team in self.teams[:3]]
+        persist_plan(self.tournament, plan_seeded_elimination(extra, round_number=1))
+        rest = execute(TOURNAMENT_MATCHES, tournamentId=str(self.tournament.tournament_id), after=cursor)
+        # 15 matches, 3 in round 1 and the first 2 of round 2 before the cursor
+        self.assertEqual(len(rest.data['tournamentMatches']['edges']), 10)
+
+    def test_next_page_is_bounded_on_the_leading_column(self):
+        first = execute(TOURNAMENT_MATCHES, tournamentId=str(self.tournament.tournament_id), first=4)
+        cursor = first.data['tournamentMatches']['pageInfo']['endCursor']
+
+        with CaptureQueriesContext(connection) as queries:
+            execute(TOURNAMENT_MATCHES, tournamentId=str(self.tournament.tournament_id), after=cursor)
+        sql = next(query['sql'] for query in queries.captured_queries if 'FROM "api_match"' in query['sql'])
+        # The index range starts at the cursor's round (3 matches a round, so
+        # the fourth is in round 2), not at the tournament's first row
+        self.assertIn('"api_match"."round" >= 2', sql)
+
+    def test_teams_and_participants(self):
+        teams = self.pages("""
+            query ($tournamentId: ID!, $after: String) {
+              tournamentTeams(tournamentId: $tournamentId, first: 4, after: $after) {
+                edges { node { name } } pageInfo { hasNextPage endCursor }
+              }
+            }""", 'tournamentTeams')
+        self.assertEqual([node['name'] for page in teams for node in page], [team.name for team in self.teams])
+
+        participants = self.pages("""
+            query ($tournamentId: ID!, $after: String) {
+              tournamentParticipants(tournamentId: $tournamentId, first: 5, after: $after) {
+                edges { node { participantId } } pageInfo { hasNextPage endCursor }
+              }
+            }""", 'tournamentParticipants')
+        self.assertEqual([len(page) for page in participants], [5, 1])
+
+    def test_page_size_and_cursor_are_checked(self):
+        too_many = execute(TOURNAMENT_MATCHES, tournamentId=str(self.tournament.tournament_id), first=1000)
+        self.assertIn("first must be between", str(too_many.errors[0]))
+        invalid = execute(TOURNAMENT_MATCHES, tournamentId=str(self.tournament.tournament_id), after="offset:10")
+        self.assertIn("Invalid cursor", str(invalid.errors[0]))
+
+BRACKET_SNAPSHOT = """
+query ($tournamentId: String!) {
+  bracketSnapshot(tournamentId: $tournamentId) {
+    version
+    rounds { round brackets { bracketType matches { matchId score1 score2 winnerTeamId teams { teamNumber name } } } }
+  }
+}
+"""
+
+
+class BracketSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tournament, _ = make_tournament(5)
+        GenerateMatches.mutate(None, None, self.tournament.tournament_id)
+
+    def snapshot(self):
+        result = execute(BRACKET_SNAPSHOT, tournamentId=str(self.tournament.tournament_id))
+        self.assertIsNone(result.errors)
+        return result.data['bracketSnapshot']
+
+    def test_snapshot_groups_matches_by_round_and_bracket(self):
+        snapshot = self.snapshot()
+
+        self.assertEqual([r['round'] for r in snapshot['rounds']], [1])
+        matches = snapshot['rounds'][0]['brackets'][0]['matches']
+        self.assertEqual(len(matches), 4)
+        self.assertEqual(sum(len(match['teams']) for match in matches), 5)
+
+    def test_repeated_reads_are_served_from_cache(self):
+        self.snapshot()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.snapshot()
+
+        # Only the version is read
+        self.assertEqual(len(queries), 1)
+        self.assertIn('bracket_version', queries[0]['sql'])
+
+    def test_bump_from_another_process_is_seen(self):
+        before = self.snapshot()
+
+        # What another worker's bump looks like here: the row changes, this
+        # process's cache does not
+        Tournament.objects.filter(pk=self.tournament.pk).update(bracket_version=F('bracket_version') + 1)
+
+        self.assertEqual(self.snapshot()['version'], before['version'] + 1)
+
+    def test_score_update_invalidates_snapshot(self):
+        before = self.snapshot()
+        match = Match.objects.filter(tournament=self.tournament, status="Scheduled").first()
+
+        UpdateMatchScore.mutate(None, None, match.match_id, "3", "0")
+
+        after = self.snapshot()
+        self.assertGreater(after['version'], before['version'])
+        scored = [m for m in after['rounds'][0]['brackets'][0]['matches'] if m['matchId'] == match.match_id][0]
+        self.assertEqual((scored['score1'], scored['score2']), ("3", "0"))
+        self.assertEqual(scored['winnerTeamId'], match.matchparticipant_set.get(team_number=1).team_id_id)
+
+    def test_saves_that_change_nothing_shown_keep_the_version(self):
+        match = Match.objects.filter(tournament=self.tournament, status="Scheduled").first()
+        UpdateMatchScore.mutate(None, None, match.match_id, "3", "0")
+        version = bracket_version(self.tournament.pk)
+
+        UpdateMatchScore.mutate(None, None, match.match_id, "3", "0")
+        match = Match.objects.get(pk=match.pk)
+        match.end_date += timedelta(minutes=5)
+        match.save()
+        self.assertEqual(bracket_version(self.tournament.pk), version)
+
+        match.court = "Court 9"
+        match.save()
+        self.assertEqual(bracket_version(self.tournament.pk), version + 1)
+
+    def test_unknown_tournament_is_an_error(self):
+        result = execute(BRACKET_SNAPSHOT, tournamentId="999999")
+
+        self.assertIsNotNone(result.errors)
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+# Events handled on commit in the test's thread; the worker thread would
+# query the database on a connection of its own
+@override_settings(DOMAIN_EVENTS_ASYNC=False)
+class BroadcastTests(TestCase):
+    def setUp(self):
+        self.backend = RecordingBackend()
+        self.previous_backend, broadcast._backend = broadcast._backend, self.backend
+
+    def tearDown(self):
+        broadcast._backend = self.previous_backend
+
+    def test_mutations_publish_diffs_after_commit(self):
+        tournament, teams = make_tournament(2)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+        match = Match.objects.get(tournament=tournament)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UpdateMatchScore.mutate(None, None, match.match_id, "5", "2", verified=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            KickTeam.mutate(None, None, teams[0].team_id, tournament.tournament_id)
+
+        channels = {channel for channel, _ in self.backend.published}
+        self.assertEqual(channels, {broadcast.channel_name(tournament.tournament_id)})
+        (_, updated), (_, removed) = self.backend.published
+        self.assertEqual(updated['type'], "match_updated")
+        self.assertEqual((updated['match']['score1'], len(updated['match']['teams'])), ("5", 2))
+        self.assertEqual((removed['type'], removed['team_id']), ("team_removed", teams[0].team_id))
+
+    def test_nothing_is_published_for_rolled_back_work(self):
+        tournament, _ = make_tournament(2)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            UpdateMatchScore.mutate(None, None, Match.objects.get(tournament=tournament).match_id, "1", "0")
+
+        self.assertTrue(callbacks)
+        self.assertEqual(self.backend.published, [])
+
+
+class InProcessBackendTests(TestCase):
+    async def test_publish_reaches_subscribers_from_other_threads(self):
+        backend = broadcast.InProcessBackend()
+        first = backend.subscribe("tournament:1")
+        second = backend.subscribe("tournament:1")
+        other = backend.subscribe("tournament:2")
+
+        delivered = await sync_to_async(backend.publish, thread_sensitive=False)("tournament:1", {"type": "ping"})
+
+        self.assertEqual(delivered, 2)
+        self.assertEqual(await first.get(timeout=1), {"type": "ping"})
+        self.assertEqual(await second.get(timeout=1), {"type": "ping"})
+        self.assertIsNone(await other.get(timeout=0.01))
+        for subscription in (first, second, other):
+            subscription.close()
+        self.assertEqual(backend.subscriber_count(), 0)
+
+    async def test_slow_subscriber_is_told_to_resync(self):
+        backend = broadcast.InProcessBackend()
+        subscription = backend.subscribe("tournament:1")
+
+        for i in range(broadcast.SUBSCRIBER_BUFFER + 1):
+            subscription.deliver({"type": "match_updated", "n": i})
+
+        self.assertEqual(await subscription.get(timeout=1), {"type": "resync"})
+        self.assertIsNone(await subscription.get(timeout=0.01))
+
+    async def test_event_stream_sends_published_events(self):
+        tournament, _ = await sync_to_async(make_tournament)(0)
+        response = await self.async_client.get(f"/events/tournaments/{tournament.tournament_id}/")
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = response.streaming_content
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        broadcast.get_backend().publish(broadcast.channel_name(tournament.tournament_id), {"type": "team_removed"})
+        self.assertEqual(await anext(stream), b'event: team_removed\ndata: {"type": "team_removed"}\n\n')
+        await stream.aclose()
+
+    async def test_event_stream_of_unknown_tournament_is_not_found(self):
+        response = await self.async_client.get("/events/tournaments/999999/")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class SwissStandingsQueryTests(TestCase):
+    def test_swiss_standings_field(self):
+        tournament, _ = make_tournament(4, format="Swiss System")
+        GenerateSwissMatches.mutate(None, None, tournament.tournament_id)
+        play_round(tournament, 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = execute("""
+                query ($tournamentId: String!) {
+                  swissStandings(tournamentId: $tournamentId) { teamId rank score buchholz opponentWinPercentage }
+                }""", tournamentId=str(tournament.tournament_id))
+
+        self.assertIsNone(result.errors)
+        standings = result.data['swissStandings']
+        self.assertEqual([s['score'] for s in standings], [1, 1, 0, 0])
+        self.assertEqual([s['rank'] for s in standings], [1, 2, 3, 4])
+        # Tournament, results and teams
+        self.assertEqual(len(queries), 3)
+
+
+def play_bracket(tournament, winning_side=lambda match: 1, limit=40):
+    """Score every open match for the given side and advance until the bracket has a champion."""
+    for _ in range(limit):
+        for match in Match.objects.filter(tournament=tournament, status="Scheduled"):
+            score1, score2 = ("2", "1") if winning_side(match) == 1 else ("1", "2")
+            UpdateMatchScore.mutate(None, None, match.match_id, score1, score2, verified=3)
+        result = GenerateNextRound.mutate(None, None, tournament.tournament_id)
+        if "has a winner" in result.message:
+            return result
+    raise AssertionError("Bracket did not finish")
+
+
+class DoubleEliminationSlotTests(TestCase):
+    def test_bracket_is_laid_out_when_generated(self):
+        tournament, _ = make_tournament(6, format="Double Elimination")
+
+        result = GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+
+        self.assertEqual(BracketSlot.objects.filter(tournament=tournament).count(), 15)
+        # Two byes in the first round are decided straight away
+        self.assertEqual(
+            sorted(match.status for match in result.matches), ["Bye", "Bye", "Scheduled", "Scheduled"])
+        self.assertEqual(Match.objects.filter(tournament=tournament, round=2, bracket_type="winners").count(), 0)
+
+    def test_bracket_plays_through_to_a_champion(self):
+        tournament, _ = make_tournament(6, format="Double Elimination")
+        GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+
+        result = play_bracket(tournament)
+
+        self.assertTrue(result.success)
+        played = Match.objects.filter(tournament=tournament, status="Completed")
+        self.assertEqual(played.count(), 2 * 6 - 2)
+        champion = bracket_champion(tournament)
+        self.assertIn(champion.name, result.message)
+        self.assertFalse(played.filter(bracket_type="losers", winner_team=champion).exists())
+
+    def test_bracket_reset_when_losers_champion_wins_the_final(self):
+        tournament, _ = make_tournament(4, format="Double Elimination")
+        GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+
+        play_bracket(tournament, winning_side=lambda match: 2 if match.bracket_type == "championship" else 1)
+
+        finals = Match.objects.filter(tournament=tournament, bracket_type="championship").order_by('round')
+        self.assertEqual(finals.count(), 2)
+        self.assertEqual(bracket_champion(tournament), finals[1].winner_team)
+
+    def test_advancing_a_result_is_independent_of_bracket_size(self):
+        counts = []
+        for size in (8, 64):
+            tournament, _ = make_tournament(size, format="Double Elimination")
+            GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+            match = Match.objects.filter(tournament=tournament, status="Scheduled").first()
+            UpdateMatchScore.mutate(None, None, match.match_id, "2", "1", verified=3)
+            match.refresh_from_db()
+
+            with CaptureQueriesContext(connection) as queries:
+                advance_match(tournament, match)
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+@override_settings(DOMAIN_EVENTS_ASYNC=False)
+class AutoAdvanceTests(TestCase):
+    def score(self, match, score1="2", score2="1"):
+        with self.captureOnCommitCallbacks(execute=True):
+            UpdateMatchScore.mutate(None, None, match.match_id, score1, score2, verified=3)
+
+    def test_next_match_starts_when_both_feeders_finish(self):
+        tournament, _ = make_tournament(8, format="Double Elimination")
+        GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+        first_round = list(Match.objects.filter(tournament=tournament, round=1).order_by('seed'))
+
+        self.score(first_round[0])
+        self.assertFalse(Match.objects.filter(tournament=tournament, round=2).exists())
+
+        self.score(first_round[1])
+        # Winners and losers of the first two matches play on while the
+        # rest of round 1 is still scheduled
+        started = Match.objects.filter(tournament=tournament, round=2)
+        self.assertEqual(sorted(started.values_list('bracket_type', flat=True)), ["losers", "winners"])
+        self.assertEqual(Match.objects.filter(tournament=tournament, round=1, status="Scheduled").count(), 2)
+
+    def test_result_is_advanced_only_once(self):
+        tournament, _ = make_tournament(2, format="Double Elimination")
+        GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+        match = Match.objects.get(tournament=tournament, round=1)
+
+        self.score(match)
+        result = GenerateNextRound.mutate(None, None, tournament.tournament_id)
+
+        self.assertFalse(result.success)
+        self.assertEqual(Match.objects.filter(tournament=tournament, bracket_type="championship").count(), 1)
+
+    def test_advanced_winner_can_no_longer_change(self):
+        tournament, _ = make_tournament(4, format="Double Elimination")
+        GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+        match = Match.objects.filter(tournament=tournament, round=1).first()
+        self.score(match)
+
+        # Same winner, so nothing has to be re-routed
+        self.score(match, "3", "1")
+        with self.assertRaisesMessage(Exception, "already advanced"):
+            self.score(match, "1", "3")
+
+        match.refresh_from_db()
+        self.assertEqual((match.score1, match.score2), ("3", "1"))
+        self.assertEqual(TeamStanding.objects.get(team=match.winner_team).wins, 1)
+
+    def test_advanced_winner_can_not_be_edited_either(self):
+        tournament, _ = make_tournament(4, format="Double Elimination")
+        GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+        match = Match.objects.filter(tournament=tournament, round=1).first()
+        self.score(match)
+
+        with self.assertRaisesMessage(Exception, "already advanced"):
+            UpdateMatch.mutate(None, None, match.match_id, score1="0", score2="5")
+        with self.assertRaisesMessage(Exception, "already advanced"):
+            UpdateMatch.mutate(None, None, match.match_id, status="Scheduled")
+
+        match.refresh_from_db()
+        self.assertEqual((match.score1, match.score2, match.status), ("2", "1", "Completed"))
+
+    def test_results_edited_with_update_match_advance_too(self):
+        tournament, _ = make_tournament(4, format="Double Elimination")
+        GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+
+        for match in Match.objects.filter(tournament=tournament, round=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                UpdateMatch.mutate(None, None, match.match_id, score1="2", score2="1", status="Completed")
+
+        started = Match.objects.filter(tournament=tournament, round=2)
+        self.assertEqual(sorted(started.values_list('bracket_type', flat=True)), ["losers", "winners"])
+
+    def test_events_of_other_formats_are_ignored(self):
+        tournament, _ = make_tournament(4)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+
+        self.score(Match.objects.filter(tournament=tournament, status="Scheduled").first())
+
+        self.assertEqual(Match.objects.filter(tournament=tournament).count(), 2)
+
+
+class EventWorkerTests(SimpleTestCase):
+    def test_worker_handles_events_in_order(self):
+        handled = []
+
+        @dataclass(frozen=True)
+        class Ping:
+            n: int
+
+        events.subscribe(Ping)(lambda event: handled.append(event.n))
+        worker = events.EventWorker()
+        for n in range(5):
+            worker.submit(Ping(n))
+        worker.join()
+
+        self.assertEqual(handled, [0, 1, 2, 3, 4])
+
+    def test_failing_handler_does_not_stop_the_worker(self):
+        handled = []
+
+        @dataclass(frozen=True)
+        class Flaky:
+            fail: bool
+
+        def handler(event):
+            if event.fail:
+                raise ValueError("boom")
+            handled.append(event)
+
+        events.subscribe(Flaky)(handler)
+        worker = events.EventWorker()
+        with self.assertLogs("api.events", "ERROR") as logs:
+            worker.submit(Flaky(True))
+            worker.submit(Flaky(False))
+            worker.join()
+
+        self.assertEqual(handled, [Flaky(False)])
+        self.assertIn("boom", logs.output[0])
+
+
+def log_record(level, message, *args, **extra):
+    record = logging.LogRecord("api.test", level, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class LoggingTests(SimpleTestCase):
+    def test_lazy_is_only_called_when_the_message_is_emitted(self):
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return "value"
+
+        logger = logging.getLogger("api.test")
+        with self.assertLogs(logger, "INFO") as logs:
+            logger.debug("skipped %s", lazy(expensive))
+            logger.info("kept %s", lazy(expensive))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(logs.records[0].getMessage(), "kept value")
+
+    def test_sample_filter_keeps_every_warning(self):
+        sample = SampleFilter(rate=0)
+        self.assertFalse(sample.filter(log_record(logging.INFO, "info")))
+        self.assertTrue(sample.filter(log_record(logging.WARNING, "warning")))
+        self.assertTrue(SampleFilter(rate=1).filter(log_record(logging.DEBUG, "debug")))
+
+    def test_key_value_formatter_quotes_values(self):
+        line = KeyValueFormatter().format(
+            log_record(logging.INFO, "Scored %s", "match 3", fields={'match': 3, 'team': 'Team "A"'}))
+
+        self.assertIn('level=INFO logger=api.test message="Scored match 3" match=3 team="Team \\"A\\""', line)
+
+    def test_traced_logs_duration_only_at_debug(self):
+        logger = logging.getLogger("api.test")
+        with self.assertLogs(logger, "DEBUG") as logs:
+            with traced(logger, "Traced", job=1):
+                pass
+        self.assertEqual(logs.records[0].fields['job'], 1)
+        self.assertIn('ms', logs.records[0].fields)
+
+        with self.assertNoLogs(logger, "INFO"):
+            with traced(logger, "Traced"):
+                pass
+
+
+class SimulatedCrash(BaseException):
+    pass
+
+
+class BracketJobTests(TestCase):
+    def enqueue(self, tournament, format):
+        return execute("""
+            mutation ($tournamentId: ID!, $format: String!) {
+              enqueueBracketGeneration(tournamentId: $tournamentId, format: $format) { success message jobId }
+            }""", tournamentId=str(tournament.tournament_id), format=format).data['enqueueBracketGeneration']
+
+    def test_round_robin_is_generated_by_the_worker(self):
+        tournament, _ = make_tournament(6, format="Round Robin")
+        enqueued = self.enqueue(tournament, "Round Robin")
+        self.assertTrue(enqueued['success'])
+        self.assertFalse(Match.objects.filter(tournament=tournament).exists())
+
+        jobs.run_pending_jobs(once=True)
+
+        status = execute("""
+            query ($id: ID!) { jobStatus(id: $id) { status progress total percentComplete attempts } }
+            """, id=enqueued['jobId']).data['jobStatus']
+        self.assertEqual(status, {
+            'status': "Completed", 'progress': 5, 'total': 5, 'percentComplete': 100.0, 'attempts': 1})
+        self.assertEqual(Match.objects.filter(tournament=tournament).count(), 15)
+
+    def test_crashed_job_resumes_from_its_checkpoint(self):
+        tournament, _ = make_tournament(8, format="Round Robin")
+        job = jobs.enqueue_bracket_generation(tournament, "Round Robin")
+        real_persist_plan = jobs.persist_plan
+        calls = []
+
+        def persist_then_crash(tournament, plan):
+            if len(calls) == 3:
+                raise SimulatedCrash()
+            calls.append(plan)
+            return real_persist_plan(tournament, plan)
+
+        with patch.object(jobs, 'persist_plan', persist_then_crash):
+            with self.assertRaises(SimulatedCrash):
+                jobs.run_job(jobs.claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress), ("Running", 3))
+        # Nothing is claimed again until the crashed worker's heartbeat goes stale
+        self.assertIsNone(jobs.claim_next_job())
+        BracketJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - jobs.STALE_AFTER * 2)
+
+        jobs.run_pending_jobs(once=True)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.attempts), ("Completed", 7, 2))
+        pairs = [
+            frozenset(match.matchparticipant_set.values_list('team_id', flat=True))
+            for match in Match.objects.filter(tournament=tournament)
+        ]
+        self.assertEqual(len(pairs), 28)
+        self.assertEqual(len(set(pairs)), 28)
+
+    def test_worker_that_lost_its_job_stops(self):
+        tournament, _ = make_tournament(4, format="Round Robin")
+        jobs.enqueue_bracket_generation(tournament, "Round Robin")
+        job = jobs.claim_next_job()
+        BracketJob.objects.filter(pk=job.pk).update(attempts=job.attempts + 1)
+
+        jobs.run_job(job)
+
+        self.assertFalse(Match.objects.filter(tournament=tournament).exists())
+
+    def test_two_stage_tournament_queues_each_stage(self):
+        tournament, _ = make_tournament(4, format="Round Robin to Double Elimination")
+        self.enqueue(tournament, "Round Robin to Double Elimination")
+        jobs.run_pending_jobs(once=True)
+        self.assertEqual(set(Match.objects.filter(tournament=tournament).values_list('round', 'bracket_type')),
+                         {(1, "round_robin")})
+        play_round(tournament, 1)
+
+        self.enqueue(tournament, "Round Robin to Double Elimination")
+        jobs.run_pending_jobs(once=True)
+
+        job = BracketJob.objects.filter(tournament=tournament).latest('job_id')
+        self.assertEqual(job.status, "Completed", job.message)
+        self.assertTrue(BracketSlot.objects.filter(tournament=tournament).exists())
+
+    def test_only_one_job_per_tournament_at_a_time(self):
+        tournament, _ = make_tournament(4, format="Round Robin")
+        self.enqueue(tournament, "Round Robin")
+
+        enqueued = self.enqueue(tournament, "Round Robin")
+
+        self.assertFalse(enqueued['success'])
+        self.assertIn("already queued", enqueued['message'])
+
+
+class RoundRobinScheduleTests(TestCase):
+    def test_generated_round_robin_gets_courts_and_times(self):
+        tournament, _ = make_tournament(6, format="Round Robin")
+
+        result = GenerateRoundRobinMatches.mutate(
+            None, None, tournament.tournament_id, courts=2, slot_minutes=45,
+            venue_opens=time(8), venue_closes=time(18), rest_slots=0)
+
+        tournament.refresh_from_db()
+        self.assertEqual((tournament.courts, tournament.slot_minutes), (2, 45))
+        self.assertEqual({match.court for match in result.matches}, {"Court 1", "Court 2"})
+        starts = sorted({match.start_date for match in result.matches})
+        self.assertEqual(len(starts), 8)
+        self.assertEqual(starts[1] - starts[0], timedelta(minutes=45))
+
+    def test_overrun_pushes_back_only_matches_not_started(self):
+        tournament, _ = make_tournament(4, format="Round Robin")
+        GenerateRoundRobinMatches.mutate(
+            None, None, tournament.tournament_id, courts=1, slot_minutes=60,
+            venue_opens=time(0), venue_closes=time(23, 59), rest_slots=0)
+        matches = list(Match.objects.filter(tournament=tournament).order_by('start_date'))
+        first = matches[0]
+        # The first match is still going when it should have ended
+        now = first.end_date
+
+        result = execute("""
+            mutation ($tournamentId: ID!, $now: DateTime) {
+              rescheduleMatches(tournamentId: $tournamentId, now: $now) { success message }
+            }""", tournamentId=str(tournament.tournament_id), now=now.isoformat())
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['rescheduleMatches']['message'], "Rescheduled 5 matches.")
+        first.refresh_from_db()
+        self.assertEqual(first.start_date, matches[0].start_date)
+        rescheduled = Match.objects.filter(tournament=tournament).exclude(pk=first.pk).order_by('start_date')
+        self.assertEqual(rescheduled[0].start_date, now + timedelta(minutes=60))
+        self.assertEqual(len({match.start_date for match in rescheduled}), 5)
+
+    def test_rescheduling_before_the_start_keeps_the_start(self):
+        tournament, _ = make_tournament(4, format="Round Robin")
+        tournament.start_date += timedelta(days=2)
+        tournament.save(update_fields=['start_date'])
+        GenerateRoundRobinMatches.mutate(
+            None, None, tournament.tournament_id, courts=1, slot_minutes=60,
+            venue_opens=time(0), venue_closes=time(23, 59), rest_slots=0)
+        tournament.refresh_from_db()
+        first = Match.objects.filter(tournament=tournament).earliest('start_date').start_date
+
+        moved = reschedule_matches(tournament, now=timezone.now())
+
+        self.assertEqual(len(moved), 6)
+        self.assertEqual(min(match.start_date for match in moved), first)
+
+    def test_unusable_venue_is_not_saved(self):
+        tournament, _ = make_tournament(4, format="Round Robin")
+
+        with self.assertRaisesMessage(Exception, "The venue must be open for at least one slot a day."):
+            GenerateRoundRobinMatches.mutate(
+                None, None, tournament.tournament_id, courts=2, slot_minutes=60,
+                venue_opens=time(18), venue_closes=time(8))
+
+        tournament.refresh_from_db()
+        self.assertIsNone(tournament.courts)
+        self.assertFalse(Match.objects.filter(tournament=tournament).exists())
+
+
+@patch("api.probabilities.SIMULATIONS", 2000)
+class AdvanceProbabilityTests(TestCase):
+    query = """
+        query ($tournamentId: String!) {
+          advanceProbabilities(tournamentId: $tournamentId) {
+            teamId teamName winProbability topTwoProbability topFourProbability expectedPlace
+          }
+        }"""
+
+    def setUp(self):
+        cache.clear()
+
+    def probabilities(self, tournament):
+        result = execute(self.query, tournamentId=str(tournament.tournament_id))
+        self.assertIsNone(result.errors)
+        return {row['teamId']: row for row in result.data['advanceProbabilities']}
+
+    def assertSumsToOne(self, rows):
+        self.assertAlmostEqual(sum(row['winProbability'] for row in rows.values()), 1)
+
+    def test_single_elimination_is_cached_until_the_next_score(self):
+        tournament, teams = make_tournament(4)
+        GenerateMatches.mutate(None, None, tournament.tournament_id)
+        play_round(tournament, 1)
+        GenerateNextRound.mutate(None, None, tournament.tournament_id)
+
+        rows = self.probabilities(tournament)
+        self.assertSumsToOne(rows)
+        final = Match.objects.get(tournament=tournament, round=2)
+        finalists = set(final.matchparticipant_set.values_list('team_id', flat=True))
+        for team in teams:
+            expected = 1 if team.team_id in finalists else 0
+            self.assertEqual(rows[team.team_id]['topTwoProbability'], expected)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.probabilities(tournament), rows)
+        # Only the tournament lookup, the rest comes from the cache
+        self.assertEqual(len(queries), 1)
+
+        UpdateMatchScore.mutate(None, None, final.match_id, "2", "1", verified=3)
+        final.refresh_from_db()
+
+        rows = self.probabilities(tournament)
+        self.assertEqual(rows[final.winner_team_id]['winProbability'], 1)
+        self.assertEqual(rows[final.winner_team_id]['expectedPlace'], 1)
+
+    def test_double_elimination_bracket(self):
+        tournament, _ = make_tournament(6, format="Double Elimination")
+        GenerateDoubleEliminationMatches.mutate(None, None, tournament.tournament_id)
+        match = Match.objects.filter(tournament=tournament, status="Scheduled").first()
+        UpdateMatchScore.mutate(None, None, match.match_id, "2", "1", verified=3)
+
+        rows = self.probabilities(tournament)
+
+        self.assertEqual(len(rows), 6)
+        self.assertSumsToOne(rows)
+        self.assertAlmostEqual(sum(row['topFourProbability'] for row in rows.values()), 4)
+
+    def test_league_formats(self):
+        for format, generate in (
+                ("Swiss System", GenerateSwissMatches),
+                ("Round Robin", GenerateRoundRobinMatches),
+                ("Round Robin to Double Elimination", GenerateRoundRobinToDoubleElimination)):
+            tournament, teams = make_tournament(5, format=format)
+            generate.mutate(None, None, tournament.tournament_id)
+            play_round(tournament, 1)
+
+            rows = self.probabilities(tournament)
+
+            self.assertEqual(len(rows), 5, format)
+            self.assertSumsToOne(rows)
+
+    def test_tournament_without_matches(self):
+        tournament, _ = make_tournament(4)
+
+        result = execute(self.query, tournamentId=str(tournament.tournament_id))
+
+        self.assertIn("No matches", str(result.errors))
+
+
+class RatingTests(TestCase):
+    def score(self, match, score1, score2):
+        UpdateMatchScore.mutate(None, None, match.match_id, score1, score2, verified=3)
+
+    def test_scores_update_team_and_user_ratings(self):
+        tournament, teams = make_tournament(2)
+        match = GenerateMatches.mutate(None, None, tournament.tournament_id).matches[0]
+        winner, loser = (side.team_id for side in match.matchparticipant_set.order_by('team_number'))
+
+        self.score(match, "2", "1")
+        winner.refresh_from_db()
+        loser.refresh_from_db()
+        self.assertEqual((winner.rating, loser.rating), (INITIAL_RATING + 16, INITIAL_RATING - 16))
+        self.assertEqual(User.objects.get(participants__team_id=winner).rating, INITIAL_RATING + 16)
+
+        # A corrected score replaces the first result instead of adding to it
+        self.score(match, "1", "2")
+        winner.refresh_from_db()
+        self.assertEqual(winner.rating, INITIAL_RATING - 16)
+        self.assertEqual(User.objects.get(participants__team_id=loser).rating, INITIAL_RATING + 16)
+
+    def test_replay_rebuilds_incremental_ratings(self):
+        tournament, teams = make_tournament(4, format="Round Robin")
+        GenerateRoundRobinMatches.mutate(None, None, tournament.tournament_id)
+        for match in Match.objects.filter(tournament=tournament).order_by('end_date', 'match_id'):
+            self.score(match, "3", "1")
+        incremental = dict(Team.objects.filter(tournament_id=tournament).values_list('team_id', 'rating'))
+
+        Team.objects.update(rating=0)
+        ratings.replay_ratings()
+
+        replayed = dict(Team.objects.filter(tournament_id=tournament).values_list('team_id', 'rating'))
+        self.assertEqual(replayed.keys(), incremental.keys())
+        for team_id, rating in incremental.items():
+            self.assertAlmostEqual(replayed[team_id], rating)
+
+    def test_seeding_by_rating_and_deleting_matches(self):
+        tournament, teams = make_tournament(4)
+        User.objects.filter(participants__team_id=teams[2]).update(rating=1800)
+        User.objects.filter(participants__team_id=teams[1]).update(rating=1700)
+
+        matches = GenerateMatches.mutate(None, None, tournament.tournament_id, seed_by_rating=True).matches
+
+        top = min(matches, key=lambda match: match.seed)
+        self.assertEqual(
+            set(top.matchparticipant_set.values_list('team_id', flat=True)), {teams[2].team_id, teams[3].team_id})
+        self.score(top, "2", "1")
+        self.assertNotEqual(User.objects.get(participants__team_id=teams[2]).rating, 1800)
+
+        DeleteMatches.mutate(None, None, tournament.tournament_id)
+
+        self.assertAlmostEqual(User.objects.get(participants__team_id=teams[2]).rating, 1800)
+        self.assertEqual(set(Team.objects.filter(tournament_id=tournament).values_list('rating', flat=True)),
+                         {INITIAL_RATING})
+
+
+class FixtureTests(TestCase):
+    def rows(self):
+        return list(Match.objects.order_by('match_id').values_list(
+            'tournament__name', 'round', 'seed', 'bracket_type', 'status', 'score1', 'score2',
+            'winner_team__name', 'matchparticipant__team_id__name', 'matchparticipant__participant_id__user_id__uuid'))
+
+    def test_same_seed_gives_same_rows(self):
+        generate_fixtures("Double Elimination", tournaments=2, teams=6, seed=7, team_size=2)
+        first = self.rows()
+        with self.assertRaises(Exception):
+            generate_fixtures("Double Elimination", tournaments=2, teams=6, seed=7, team_size=2)
+
+        User.objects.all().delete()
+        generate_fixtures("Double Elimination", tournaments=2, teams=6, seed=7, team_size=2)
+        self.assertEqual(self.rows(), first)
+
+        User.objects.all().delete()
+        generate_fixtures("Double Elimination", tournaments=2, teams=6, seed=8, team_size=2)
+        self.assertNotEqual(self.rows(), first)
+
+    def test_every_format_is_played_to_the_end(self):
+        for format in FORMATS:
+            counts = generate_fixtures(format, tournaments=2, teams=6, seed=1)
+            self.assertEqual(counts["Team"], 12)
+            for tournament in Tournament.objects.filter(format=format):
+                matches = Match.objects.filter(tournament=tournament)
+                self.assertFalse(matches.filter(status="Scheduled").exists())
+                self.assertFalse(matches.filter(status="Completed", winner_team__isnull=True).exists())
+                wins = sum(TeamStanding.objects.filter(team__tournament_id=tournament).values_list('wins', flat=True))
+                self.assertEqual(wins, matches.filter(status="Completed").count())
+                if format == "Round Robin":
+                    self.assertEqual(matches.count(), 15)
+                elif format == "Swiss System":
+                    self.assertEqual(matches.order_by('-round').first().round, 3)
+                elif format == "Single Elimination":
+                    self.assertEqual(matches.filter(status="Completed").count(), 5)
+                elif format == "Round Robin to Single Elimination":
+                    self.assertEqual(matches.filter(round=1).count(), 15)
+                    self.assertEqual(matches.filter(round__gt=1, status="Completed").count(), 5)
+                else:
+                    self.assertIsNotNone(bracket_champion(tournament))
+
+    def test_playout_draws_only_from_the_given_source(self):
+        teams = [TeamEntry(i, i) for i in range(5)]
+        strengths = [1500.0] * 5
+        first = play_out("Swiss System", teams, strengths, random.Random(3), "random")
+        second = play_out("Swiss System", teams, strengths, random.Random(3), "random")
+        self.assertEqual(first, second)
+
+    def test_random_seed_repeats_the_draw(self):
+        draws = []
+        for _ in range(2):
+            tournament, teams = make_tournament(7)
+            GenerateMatches.mutate(None, None, tournament.tournament_id, random_seed=11)
+            index = {team.team_id: position for position, team in enumerate(teams)}
+            draws.append([
+                (match.seed, [index[side.team_id_id] for side in match.matchparticipant_set.order_by('team_number')])
+                for match in Match.objects.filter(tournament=tournament).order_by('seed')
+            ])
+        self.assertEqual(draws[0], draws[1])
@@ -116,11 +116,56 @@ TEMPLATES = [
 
 GRAPHENE = {
     "SCHEMA": "api.schema.schema",
+    # graphql-core wraps the resolver in these in order, so the last entry
+    # is the outermost
     "MIDDLEWARE": [
         "graphql_jwt.middleware.JSONWebTokenMiddleware",
+        "api.loaders.LoaderMiddleware",
+        # Outermost, so resolver timings include the loaders' queries
+        "api.metrics.MetricsMiddleware",
     ],
 }
 
+# Broker for live bracket events, see api/broadcast.py
+BRACKET_EVENTS_BACKEND = "api.broadcast.InProcessBackend"
+
+# Handle domain events (api/events.py) on a background thread after commit
+DOMAIN_EVENTS_ASYNC = True
+
+# Processes advanceProbabilities spreads its simulations over (api/probabilities.py)
+SIMULATION_PROCESSES = 1
+
+# Where sampled GraphQL profiles are written (api/profiling.py)
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles"))
+
+# Structured logs, see api/logs.py. LOG_SAMPLE_RATE is the share of debug and
+# info records kept; warnings and errors are always logged
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "sample": {
+            "()": "api.logs.SampleFilter",
+            "rate": float(os.getenv("LOG_SAMPLE_RATE", "1.0")),
+        },
+    },
+    "formatters": {
+        "key_value": {"()": "api.logs.KeyValueFormatter"},
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "filters": ["sample"],
+            "formatter": "key_value",
+        },
+    },
+    "loggers": {
+        "api": {"handlers": ["console"], "level": os.getenv("API_LOG_LEVEL", "INFO"), "propagate": False},
+        # Per-match bracket tracing, DEBUG to follow a tournament's progression
+        "api.graphene": {"level": os.getenv("API_GRAPHENE_LOG_LEVEL", "WARNING")},
+    },
+}
+
 AUTHENTICATION_BACKENDS = [
     "graphql_jwt.backends.JSONWebTokenBackend",
     "django.contrib.auth.backends.ModelBackend",
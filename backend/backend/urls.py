@@ -16,13 +16,13 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from graphene_django.views import GraphQLView
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
 from . import views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("graphql/", csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path("graphql/", csrf_exempt(views.MetricsGraphQLView.as_view(graphiql=True))),
     path('send-email/', csrf_exempt(views.send_email), name='send_email'),
+    path('events/tournaments/<int:tournament_id>/', views.bracket_events, name='bracket_events'),
 ]
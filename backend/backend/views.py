@@ -1,4 +1,4 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
@@ -6,6 +6,17 @@ import os
 import certifi
 import json
 
+from django.conf import settings
+from django.db import connection
+from graphene_django.views import GraphQLView
+
+from api import metrics, profiling
+from api.broadcast import channel_name, get_backend
+from api.models import Tournament
+
+# Seconds between keep-alive comments on an idle event stream
+EVENT_STREAM_HEARTBEAT = 15
+
 
 def send_email(request):
     if request.method == 'POST':
@@ -34,3 +45,68 @@ def send_email(request):
             return JsonResponse({'message': 'Email sent successfully!'}, status=200)
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
+
+
+async def bracket_events(request, tournament_id):
+    """
+    Server-sent event stream of bracket changes for one tournament (see
+    api/broadcast.py). Needs the ASGI server; under WSGI a stream would hold
+    a worker thread for as long as the spectator stays connected.
+    """
+    if not await Tournament.objects.filter(pk=tournament_id).aexists():
+        return JsonResponse({'error': 'Tournament not found'}, status=404)
+
+    subscription = get_backend().subscribe(channel_name(tournament_id))
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                message = await subscription.get(timeout=EVENT_STREAM_HEARTBEAT)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class MetricsGraphQLView(GraphQLView):
+    """
+    GraphQLView measuring every operation (see api/metrics.py). The metrics
+    are returned in the response extensions when the request asks for them
+    with the metrics header, and recorded in the rolling histograms always.
+    Operations on a tournament with a profiling session are also sampled
+    (see api/profiling.py).
+    """
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        request.graphql_metrics = metrics.RequestMetrics(operation_name)
+        # The profiler's own queries run outside the wrapper, so they are not counted
+        try:
+            with profiling.profiled(operation_name, variables), connection.execute_wrapper(request.graphql_metrics):
+                return super().execute_graphql_request(
+                    request, data, query, variables, operation_name, show_graphiql)
+        finally:
+            request.graphql_metrics.finish()
+            metrics.record(request.graphql_metrics)
+
+    def json_encode(self, request, d, pretty=False):
+        request_metrics = getattr(request, 'graphql_metrics', None)
+        if request_metrics is not None and self.wants_metrics(request):
+            d = {**d, "extensions": {"metrics": request_metrics.as_extension()}}
+        return super().json_encode(request, d, pretty)
+
+    @staticmethod
+    def wants_metrics(request):
+        # The extensions include SQL, so only for development and staff
+        if not request.headers.get(metrics.METRICS_HEADER):
+            return False
+        user = getattr(request, 'user', None)
+        return settings.DEBUG or bool(user and user.is_staff)
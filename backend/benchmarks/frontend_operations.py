@@ -0,0 +1,29 @@
+"""
+The GraphQL documents the frontend sends, read from its source.
+
+Every `export const NAME = gql\`...\`` in frontend/src/graphql is loaded by
+NAME, so the load test replays exactly what the frontend sends and picks up
+changes to those documents without copying them here.
+"""
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+FRONTEND_GRAPHQL = Path(settings.BASE_DIR).parent / "frontend" / "src" / "graphql"
+
+_DOCUMENT = re.compile(r"export const (\w+) = gql`(.*?)`", re.DOTALL)
+_OPERATION_NAME = re.compile(r"\b(?:query|mutation)\s+(\w+)")
+
+
+def load_operations(directory=FRONTEND_GRAPHQL):
+    """NAME -> (operation name, document) for every gql document under directory."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        raise Exception(f"Frontend GraphQL documents not found in {directory}.")
+    operations = {}
+    for path in sorted(directory.rglob("*.ts")):
+        for name, document in _DOCUMENT.findall(path.read_text()):
+            match = _OPERATION_NAME.search(document)
+            operations[name] = (match.group(1) if match else None, document.strip())
+    return operations
@@ -0,0 +1,336 @@
+"""
+Load test of the GraphQL API with the frontend's own operations.
+
+Seeds a throwaway test database (never the configured one) with synthetic
+tournaments of the chosen format and size, then plays each one through the
+way the frontend does: it opens the tournament and its teams, generates the
+bracket, and then repeatedly loads the matches, scores every scheduled
+match and asks for the next round until the tournament is over. Documents
+are read from frontend/src/graphql (see frontend_operations.py) and sent
+through the Django test client, or with --server over HTTP to a local server
+started on the test database.
+
+Every operation reports its p50/p99 latency and its queries and database
+time per call, taken from api/metrics.py. A final pass over one more
+tournament runs under tracemalloc to give each operation's peak allocation.
+Scores come from a seeded random generator, so two runs with the same
+arguments send the same requests. --output stores the results as JSON;
+--compare prints the change against a stored run, e.g. one from the
+previous commit.
+
+Run from the backend directory:
+
+    python -m benchmarks.load [--format "Round Robin"] [--teams 16] [--tournaments 3]
+                              [--server] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import resource
+import statistics
+import subprocess
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+import uuid
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import django
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+
+from api import metrics
+from api.models import User, Tournament, Participant, Team
+
+from .frontend_operations import load_operations
+
+# Tournament format -> the frontend document that generates its bracket
+GENERATE = {
+    "Single Elimination": "GENERATE_MATCHES",
+    "Double Elimination": "GENERATE_DOUBLE_ELIMINATION_MATCHES",
+    "Round Robin": "GENERATE_ROUND_ROBIN_MATCHES",
+    "Swiss System": "GENERATE_SWISS_MATCHES",
+}
+# Stops a format that never finishes from running forever
+MAX_ROUNDS = 64
+
+
+def seed(format, num_teams, index=0):
+    """A tournament of num_teams one-player teams."""
+    now = timezone.now()
+    owner = User.objects.create(
+        name=f"Load Owner {index}", email=f"owner{index}-{uuid.uuid4()}@load.local", uuid=uuid.uuid4())
+    tournament = Tournament.objects.create(
+        name=f"Load {format} {index}", start_date=now, end_date=now, created_by=owner,
+        format=format, show_email=False, show_phone=False, is_private=False)
+    users = User.objects.bulk_create([
+        User(name=f"Player {i}", email=f"player{i}-{uuid.uuid4()}@load.local", uuid=uuid.uuid4())
+        for i in range(num_teams)
+    ])
+    teams = Team.objects.bulk_create([
+        Team(name=f"Team {i}", tournament_id=tournament, is_private=False, created_by_uuid=user)
+        for i, user in enumerate(users)
+    ])
+    Participant.objects.bulk_create([
+        Participant(user_id=user, tournament_id=tournament, team_id=team) for user, team in zip(users, teams)
+    ])
+    return tournament
+
+
+class ClientTransport:
+    name = "test client"
+
+    def __init__(self):
+        self.client = Client()
+
+    def post(self, body):
+        return self.client.post('/graphql/', body, content_type='application/json').json()
+
+    def close(self):
+        pass
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ServerTransport:
+    """A WSGI server on a free local port, serving from a background thread."""
+
+    def __init__(self):
+        self.server = make_server('127.0.0.1', 0, get_wsgi_application(), handler_class=QuietHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/graphql/"
+        self.name = f"server {self.url}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def post(self, body):
+        request = urllib.request.Request(
+            self.url, data=body.encode(), headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            # GraphQL answers a rejected operation with 400 and its errors
+            return json.loads(error.read())
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Recorder:
+    """Latency, query and memory samples per operation."""
+
+    def __init__(self, transport, operations, measure_memory=False):
+        self.transport = transport
+        self.operations = operations
+        self.measure_memory = measure_memory
+        self.samples = {}
+        self.errors = {}
+        self.server_metrics = []
+        metrics.listeners.append(self.server_metrics.append)
+
+    def run(self, document, **variables):
+        operation, query = self.operations[document]
+        body = json.dumps({"query": query, "operationName": operation, "variables": variables})
+        if self.measure_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = self.transport.post(body)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        sample = self.samples.setdefault(operation, {"ms": [], "queries": [], "db_ms": [], "peak_kb": []})
+        sample["ms"].append(elapsed)
+        if self.server_metrics:
+            measured = self.server_metrics.pop()
+            self.server_metrics.clear()
+            sample["queries"].append(measured.queries)
+            sample["db_ms"].append(measured.db_ms)
+        if self.measure_memory:
+            sample["peak_kb"].append(tracemalloc.get_traced_memory()[1] / 1024)
+        if result.get("errors"):
+            self.errors.setdefault(operation, result["errors"][0].get("message"))
+        return result.get("data") or {}
+
+    def close(self):
+        metrics.listeners.remove(self.server_metrics.append)
+
+
+def play(recorder, tournament, format, rng, max_rounds=MAX_ROUNDS):
+    """Play one tournament through as the frontend would, asking for at most max_rounds next rounds."""
+    tournament_id = str(tournament.tournament_id)
+    recorder.run("GET_TOURNAMENT", id=tournament_id)
+    recorder.run("GET_TOURNAMENT_TEAMS", tournamentId=tournament_id)
+    recorder.run(GENERATE[format], tournamentId=tournament_id)
+    waiting = False
+    next_rounds = 0
+    while True:
+        data = recorder.run("GET_MATCHES_BY_TOURNAMENT", tournamentId=tournament_id)
+        # Scheduled matches with both teams known; a bracket slot can wait on another match
+        ready = [
+            match for match in data.get("allMatchesByTournamentId") or []
+            if match["status"] == "Scheduled" and len(match["matchparticipantSet"]["edges"]) == 2
+        ]
+        if ready:
+            waiting = False
+            for match in ready:
+                # No ties, elimination brackets cannot advance a tied match
+                loser = rng.randint(0, 20)
+                winner = rng.randint(loser + 1, 21)
+                score1, score2 = (winner, loser) if rng.random() < 0.5 else (loser, winner)
+                recorder.run(
+                    "UPDATE_MATCH_SCORE", matchId=match["matchId"], score1=str(score1), score2=str(score2),
+                    verified=3)
+            continue
+        # Nothing came of the last GenerateNextRound, the tournament is over
+        if waiting or next_rounds >= max_rounds:
+            break
+        result = recorder.run("GENERATE_NEXT_ROUND", tournamentId=tournament_id).get("generateNextRound")
+        next_rounds += 1
+        if not result or not result.get("success"):
+            break
+        waiting = True
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples, memory_samples):
+    summary = {}
+    for operation, sample in sorted(samples.items()):
+        summary[operation] = {
+            "calls": len(sample["ms"]),
+            "p50_ms": round(percentile(sample["ms"], 50), 3),
+            "p99_ms": round(percentile(sample["ms"], 99), 3),
+            "mean_ms": round(statistics.fmean(sample["ms"]), 3),
+            "queries_mean": round(statistics.fmean(sample["queries"]), 2) if sample["queries"] else None,
+            "queries_max": max(sample["queries"], default=None),
+            "db_ms_mean": round(statistics.fmean(sample["db_ms"]), 3) if sample["db_ms"] else None,
+            "peak_kb": round(max(memory_samples.get(operation, {}).get("peak_kb", []), default=0), 1) or None,
+        }
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(summary, baseline=None):
+    print(f"{'operation':<34} {'calls':>6} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8} {'db ms':>8} {'peak KB':>8}")
+    for operation, row in summary.items():
+        line = (f"{operation:<34} {row['calls']:>6} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+                f"{_cell(row['queries_mean'], '.1f'):>8} {_cell(row['db_ms_mean'], '.2f'):>8} "
+                f"{_cell(row['peak_kb'], '.0f'):>8}")
+        before = (baseline or {}).get(operation)
+        if before:
+            line += f"   p50 {_change(before['p50_ms'], row['p50_ms'])}"
+            if before.get('queries_mean') is not None and row['queries_mean'] is not None:
+                line += f", queries {row['queries_mean'] - before['queries_mean']:+.1f}"
+        print(line)
+
+
+def _cell(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def _change(before, after):
+    return f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--format', choices=list(GENERATE), default="Round Robin")
+    parser.add_argument('--teams', type=int, default=16)
+    parser.add_argument('--tournaments', type=int, default=3)
+    parser.add_argument('--rounds', type=int,
+                        help="Most GenerateNextRound calls per tournament; Swiss defaults to log2(teams) rounds.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--server', action='store_true', help="Send requests over HTTP to a local server.")
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    parser.add_argument('--compare', help="Results JSON of an earlier run to compare against.")
+    args = parser.parse_args()
+
+    operations = load_operations()
+    max_rounds = args.rounds
+    if max_rounds is None:
+        # Swiss pairs new rounds for as long as it is asked to
+        max_rounds = max(1, math.ceil(math.log2(args.teams))) - 1 if args.format == "Swiss System" else MAX_ROUNDS
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)["operations"]
+
+    setup_test_environment()
+    settings.DOMAIN_EVENTS_ASYNC = False
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=False)
+    transport = ServerTransport() if args.server else ClientTransport()
+    # Rejected operations are counted in the results, not logged per request
+    # (set after the server, whose setup configures logging again)
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    try:
+        rng = random.Random(args.seed)
+        tournaments = [seed(args.format, args.teams, index) for index in range(args.tournaments + 1)]
+
+        recorder = Recorder(transport, operations)
+        started = time.perf_counter()
+        for tournament in tournaments[:-1]:
+            play(recorder, tournament, args.format, rng, max_rounds)
+        elapsed = time.perf_counter() - started
+        recorder.close()
+
+        # Separate pass, tracemalloc slows everything down
+        tracemalloc.start()
+        memory = Recorder(transport, operations, measure_memory=True)
+        play(memory, tournaments[-1], args.format, rng, max_rounds)
+        memory.close()
+        tracemalloc.stop()
+    finally:
+        transport.close()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    summary = summarize(recorder.samples, memory.samples)
+    print(f"{args.tournaments} x {args.format}, {args.teams} teams, via {transport.name}: "
+          f"{sum(row['calls'] for row in summary.values())} operations in {elapsed:.2f} s")
+    print_summary(summary, baseline)
+    for operation, message in {**memory.errors, **recorder.errors}.items():
+        print(f"{operation} returned errors, first: {message}")
+
+    if args.output:
+        results = {
+            "commit": git_commit(),
+            "created": timezone.now().isoformat(),
+            "config": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+            "transport": "server" if args.server else "client",
+            "seconds": round(elapsed, 3),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "operations": summary,
+        }
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
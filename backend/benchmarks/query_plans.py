@@ -0,0 +1,146 @@
+"""
+Query plans of the GenerateNextRound access paths with and without the
+Match/MatchParticipant composite indexes.
+
+Seeds a throwaway test database (never the configured one) with 1,000 round
+robin tournaments, prints EXPLAIN output and timings for each query with the
+indexes in place, then drops them and prints the same again.
+
+Run from the backend directory:
+
+    python -m benchmarks.query_plans [--tournaments 1000] [--teams 8]
+"""
+import argparse
+import os
+import time
+import uuid
+
+import django
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import connection
+from django.utils import timezone
+
+from api.bracket.engine import TeamEntry, plan_round_robin
+from api.models import User, Tournament, Participant, Team, Match, MatchParticipant
+
+REPEAT = 200
+
+
+def seed(num_tournaments, teams_per_tournament):
+    """Bulk insert tournaments with complete round robin schedules."""
+    now = timezone.now()
+    owner = User.objects.create(name="Benchmark Owner", email="owner@benchmark.local", uuid=uuid.uuid4())
+    tournaments = Tournament.objects.bulk_create([
+        Tournament(
+            name=f"Benchmark {i}", start_date=now, end_date=now, created_by=owner,
+            format="Round Robin", show_email=False, show_phone=False, is_private=False)
+        for i in range(num_tournaments)
+    ])
+
+    users = User.objects.bulk_create([
+        User(name=f"Player {i}", email=f"player{i}@benchmark.local", uuid=uuid.uuid4())
+        for i in range(num_tournaments * teams_per_tournament)
+    ], batch_size=1000)
+    players = iter(users)
+
+    teams = Team.objects.bulk_create([
+        Team(name=f"Team {i}", tournament_id=tournament, is_private=False, created_by_uuid=owner)
+        for tournament in tournaments
+        for i in range(teams_per_tournament)
+    ], batch_size=1000)
+    participants = Participant.objects.bulk_create([
+        Participant(user_id=next(players), tournament_id=team.tournament_id, team_id=team)
+        for team in teams
+    ], batch_size=1000)
+
+    matches, sides = [], []
+    for start in range(0, len(teams), teams_per_tournament):
+        entries = [
+            TeamEntry(team.team_id, participant.participant_id)
+            for team, participant in zip(
+                teams[start:start + teams_per_tournament], participants[start:start + teams_per_tournament])
+        ]
+        tournament = teams[start].tournament_id
+        for planned in plan_round_robin(entries):
+            matches.append(Match(
+                tournament=tournament, start_date=now, end_date=now, status="Completed",
+                court=planned.court, seed=planned.seed, round=planned.round, score1="2", score2="1",
+                score1_value=2, score2_value=1, bracket_type=planned.bracket_type))
+            sides.append(planned.sides)
+    Match.objects.bulk_create(matches, batch_size=1000)
+    MatchParticipant.objects.bulk_create([
+        MatchParticipant(
+            match_id=match, participant_id_id=side.participant_id,
+            team_number=side.team_number, team_id_id=side.team_id)
+        for match, match_sides in zip(matches, sides)
+        for side in match_sides
+    ], batch_size=1000)
+
+    return tournaments[len(tournaments) // 2]
+
+
+def access_paths(tournament):
+    """The filters GenerateNextRound and its helpers run, for one tournament."""
+    match = Match.objects.filter(tournament=tournament).order_by('seed').first()
+    team = Team.objects.filter(tournament_id=tournament).first()
+    return {
+        "round ordered by seed": Match.objects.filter(tournament=tournament, round=3).order_by('seed'),
+        "bracket matches by status": Match.objects.filter(
+            tournament=tournament, bracket_type="winners", status="Completed").order_by('-round'),
+        "side of a match": MatchParticipant.objects.filter(match_id=match, team_number=1),
+        "team's completed matches": MatchParticipant.objects.filter(
+            team_id=team, match_id__status="Completed"),
+    }
+
+
+def analyze():
+    # Refresh planner statistics so the plans reflect the seeded data
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def report(label, queries):
+    print(f"\n===== {label} =====")
+    for name, queryset in queries.items():
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            list(queryset.all())
+        elapsed = (time.perf_counter() - start) / REPEAT * 1000
+        print(f"\n--- {name}: {elapsed:.3f} ms/query")
+        print(queryset.explain())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tournaments', type=int, default=1000)
+    parser.add_argument('--teams', type=int, default=8)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=False)
+    try:
+        start = time.perf_counter()
+        tournament = seed(args.tournaments, args.teams)
+        print(f"Seeded {Match.objects.count()} matches and {MatchParticipant.objects.count()} match "
+              f"participants in {time.perf_counter() - start:.1f}s")
+        queries = access_paths(tournament)
+
+        analyze()
+        report("with composite indexes", queries)
+
+        with connection.schema_editor() as schema_editor:
+            for model in (Match, MatchParticipant):
+                for index in model._meta.indexes:
+                    schema_editor.remove_index(model, index)
+        analyze()
+
+        report("foreign key indexes only", queries)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Elo rating replay timings.
+
+Builds a random history of two-team matches and times replay_ratings over it,
+as `python manage.py replay_ratings` does over the stored matches. Nothing
+touches the database, so no Django setup is needed.
+
+Run from the backend directory:
+
+    python -m benchmarks.ratings [--matches 10000 1000000] [--players 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from api.bracket.elo import replay_ratings
+
+
+def history(num_matches, num_players, seed):
+    rng = np.random.default_rng(seed)
+    first = rng.integers(0, num_players, num_matches)
+    second = (first + rng.integers(1, num_players, num_matches)) % num_players
+    outcomes = rng.integers(0, 3, num_matches) / 2
+    return (
+        np.repeat(np.arange(num_matches), 2),
+        np.column_stack([first, second]).ravel(),
+        np.tile([1, 2], num_matches),
+        outcomes,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--matches', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'matches':>9} {'players':>8} {'most played':>11} {'seconds':>8}")
+    for num_matches in args.matches:
+        members = history(num_matches, args.players, args.seed)
+        start = time.perf_counter()
+        replay = replay_ratings(args.players, *members)
+        elapsed = time.perf_counter() - start
+        print(f"{num_matches:>9} {args.players:>8} {int(replay.matches_played.max()):>11} {elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
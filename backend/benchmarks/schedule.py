@@ -0,0 +1,61 @@
+"""
+Court and time slot assignment timings.
+
+Schedules full round robins on a venue and reports how long the placement
+takes, how many slots it uses against the lower bound (enough slots for every
+match on every court, and for each team to play all of its matches with the
+required rest) and the mean idle slots a team spends between matches. Nothing
+touches the database, so no Django setup is needed.
+
+Run from the backend directory:
+
+    python -m benchmarks.schedule [--teams 16 64 256] [--courts 8] [--rest 1]
+"""
+import argparse
+import time
+from datetime import datetime, time as clock, timezone
+
+from api.bracket.engine import TeamEntry, plan_round_robin
+from api.bracket.schedule import Venue, schedule_plan
+
+START = datetime(2026, 5, 1, 8, tzinfo=timezone.utc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--teams', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--courts', type=int, default=8)
+    parser.add_argument('--slot-minutes', type=int, default=30)
+    parser.add_argument('--rest', type=int, default=1)
+    args = parser.parse_args()
+
+    # Open around the clock so slot counts are not skewed by nights
+    venue = Venue(courts=args.courts, slot_minutes=args.slot_minutes, opens=clock(0), closes=clock(23, 59),
+                  rest_slots=args.rest)
+    slot_length = args.slot_minutes * 60
+
+    print(f"{'teams':>6} {'matches':>8} {'ms':>9} {'slots':>6} {'bound':>6} {'idle/team':>10}")
+    for num_teams in args.teams:
+        plan = plan_round_robin([TeamEntry(i, i) for i in range(1, num_teams + 1)])
+
+        start = time.perf_counter()
+        scheduled = schedule_plan(plan, venue, START)
+        elapsed = time.perf_counter() - start
+
+        slots_of = {}
+        for match in scheduled:
+            index = int((match.start_date - START).total_seconds() // slot_length)
+            for side in match.sides:
+                slots_of.setdefault(side.team_id, []).append(index)
+        used = max(max(indexes) for indexes in slots_of.values()) + 1
+        per_team = num_teams - 1
+        bound = max(-(-len(plan) // args.courts), per_team + (per_team - 1) * args.rest)
+        idle = sum(
+            max(indexes) - min(indexes) + 1 - len(indexes) - (len(indexes) - 1) * args.rest
+            for indexes in slots_of.values()) / num_teams
+
+        print(f"{num_teams:>6} {len(plan):>8} {elapsed * 1000:>9.1f} {used:>6} {bound:>6} {idle:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Cost of one UpdateMatchScore call.
+
+Seeds a throwaway test database (never the configured one) with a round robin
+tournament and scores every match through the mutation, reporting the time
+and the number of queries per score update, once with the api loggers at
+their configured levels and once with everything at DEBUG, which is what the
+debug tracing costs when it is switched on.
+
+Run from the backend directory:
+
+    python -m benchmarks.score_updates [--teams 24]
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import time
+import uuid
+
+import django
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from api.bracket.engine import TeamEntry, plan_round_robin
+from api.bracket.persistence import persist_plan
+from api.graphene.update_mutations import UpdateMatchScore
+from api.models import User, Tournament, Participant, Team, Match
+
+
+def seed(num_teams):
+    now = timezone.now()
+    owner = User.objects.create(name="Benchmark Owner", email="owner@benchmark.local", uuid=uuid.uuid4())
+    tournament = Tournament.objects.create(
+        name="Benchmark", start_date=now, end_date=now, created_by=owner,
+        format="Round Robin", show_email=False, show_phone=False, is_private=False)
+    entries = []
+    for i in range(num_teams):
+        user = User.objects.create(name=f"Player {i}", email=f"player{i}@benchmark.local", uuid=uuid.uuid4())
+        team = Team.objects.create(name=f"Team {i}", tournament_id=tournament, is_private=False, created_by_uuid=user)
+        participant = Participant.objects.create(user_id=user, tournament_id=tournament, team_id=team)
+        entries.append(TeamEntry(team.team_id, participant.participant_id))
+    persist_plan(tournament, plan_round_robin(entries))
+    return tournament
+
+
+def score_all(tournament, score1, score2):
+    match_ids = list(Match.objects.filter(tournament=tournament).values_list('match_id', flat=True))
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    # Anything still printed to stdout is discarded rather than timed on a terminal
+    with connection.execute_wrapper(count), contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for match_id in match_ids:
+            UpdateMatchScore.mutate(None, None, match_id, score1, score2, verified=3)
+        elapsed = time.perf_counter() - start
+    return elapsed / len(match_ids) * 1000, len(queries) / len(match_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--teams', type=int, default=24)
+    args = parser.parse_args()
+
+    settings.DOMAIN_EVENTS_ASYNC = False
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=False)
+    try:
+        tournament = seed(args.teams)
+        print(f"{'loggers':<12} {'ms/update':>10} {'queries/update':>15}")
+        # Each pass changes the result, so every update moves standings and ratings
+        milliseconds, queries = score_all(tournament, "2", "1")
+        print(f"{'configured':<12} {milliseconds:>10.2f} {queries:>15.1f}")
+
+        api = logging.getLogger("api")
+        level, api.level = api.level, logging.DEBUG
+        handlers, api.handlers = api.handlers, [logging.NullHandler()]
+        try:
+            milliseconds, queries = score_all(tournament, "1", "2")
+        finally:
+            api.level, api.handlers = level, handlers
+        print(f"{'DEBUG':<12} {milliseconds:>10.2f} {queries:>15.1f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Monte Carlo advance probability timings.
+
+Fits strengths to random results and times simulate() on a fresh tournament of
+each format, single process and spread over a process pool, as
+advanceProbabilities does. Nothing touches the database, so no Django setup
+is needed.
+
+Run from the backend directory:
+
+    python -m benchmarks.simulation [--teams 16 64] [--simulations 100000] [--processes 4]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from api.bracket.graph import plan_double_elimination_graph
+from api.bracket.simulation import (
+    GraphState, KnockoutState, LeagueState, fit_strengths, graph_slots, simulate, win_matrix)
+
+
+def states(num_teams):
+    seeds = list(range(num_teams))
+    planned = plan_double_elimination_graph(seeds)
+    teams = {slot.key: tuple(-1 if seed is None else seed for seed in slot.entries) for slot in planned}
+    round_robin = tuple((i, j) for i in range(num_teams) for j in range(i + 1, num_teams))
+    return {
+        "single elimination": KnockoutState(
+            matches=tuple((i, i + 1, -1) for i in range(0, num_teams - 1, 2)), round=1, reached=np.zeros(num_teams)),
+        "double elimination": GraphState(slots=graph_slots(planned, teams=teams), reached=np.zeros(num_teams)),
+        "swiss": LeagueState(scores=np.zeros(num_teams), swiss_rounds=math.ceil(math.log2(num_teams))),
+        "round robin to double": LeagueState(
+            scores=np.zeros(num_teams), remaining=round_robin, then="double",
+            stage_slots=graph_slots(plan_double_elimination_graph(seeds, first_round=2))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--teams', type=int, nargs='+', default=[16, 64])
+    parser.add_argument('--simulations', type=int, default=100_000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'teams':>6} {'format':<22} {'1 process s':>12} {f'{args.processes} processes s':>14}")
+    for num_teams in args.teams:
+        first = rng.integers(0, num_teams, num_teams * 4)
+        second = (first + rng.integers(1, num_teams, first.size)) % num_teams
+        P = win_matrix(fit_strengths(num_teams, first, second, rng.integers(0, 2, first.size)))
+        for name, state in states(num_teams).items():
+            timings = []
+            for processes in (1, args.processes):
+                start = time.perf_counter()
+                simulate(P, state, args.simulations, seed=args.seed, processes=processes)
+                timings.append(time.perf_counter() - start)
+            print(f"{num_teams:>6} {name:<22} {timings[0]:>12.2f} {timings[1]:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+How many concurrent spectators one worker's in-process broker can hold.
+
+Each spectator is an asyncio task reading its own subscription, exactly as
+the bracket event stream view does. Score updates are published from a
+separate thread, as the mutations do once their transaction commits, and the
+benchmark reports the memory held per spectator and how long one event takes
+to reach every spectator.
+
+Run from the backend directory:
+
+    python -m benchmarks.spectators [--spectators 1000 10000 50000] [--events 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+
+import django
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from api.broadcast import InProcessBackend, channel_name
+
+CHANNEL = channel_name(1)
+
+
+async def spectator(subscription, events, received, done):
+    for _ in range(events):
+        message = await subscription.get()
+        received[message['n']] += 1
+        if received[message['n']] == done['target']:
+            done['at'][message['n']] = time.perf_counter()
+            done['events'][message['n']].set()
+
+
+async def run(num_spectators, events):
+    backend = InProcessBackend()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    received = [0] * events
+    done = {
+        'target': num_spectators,
+        'at': [None] * events,
+        'events': [asyncio.Event() for _ in range(events)],
+    }
+    subscriptions = [backend.subscribe(CHANNEL) for _ in range(num_spectators)]
+    tasks = [
+        asyncio.create_task(spectator(subscription, events, received, done))
+        for subscription in subscriptions
+    ]
+    await asyncio.sleep(0)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    held = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    latencies = []
+    for n in range(events):
+        published = {}
+
+        def publish():
+            published['at'] = time.perf_counter()
+            backend.publish(CHANNEL, {"type": "match_updated", "n": n, "score1": "3", "score2": "1"})
+
+        thread = threading.Thread(target=publish)
+        thread.start()
+        await done['events'][n].wait()
+        thread.join()
+        latencies.append((done['at'][n] - published['at']) * 1000)
+
+    await asyncio.gather(*tasks)
+    for subscription in subscriptions:
+        subscription.close()
+
+    return held / num_spectators, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--spectators', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--events', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'spectators':>10} {'bytes/spectator':>16} {'fan-out p50 ms':>15} {'fan-out max ms':>15}")
+    for num_spectators in args.spectators:
+        per_spectator, latencies = asyncio.run(run(num_spectators, args.events))
+        print(f"{num_spectators:>10} {per_spectator:>16.0f} {statistics.median(latencies):>15.2f} "
+              f"{max(latencies):>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
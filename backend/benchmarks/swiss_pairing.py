@@ -0,0 +1,64 @@
+"""
+Swiss pairing engine timings.
+
+Plays simulated Swiss tournaments with random results and reports the time
+pair_swiss takes per round and how many rematches it had to allow. Nothing
+touches the database, so no Django setup is needed.
+
+Run from the backend directory:
+
+    python -m benchmarks.swiss_pairing [--players 64 512 4096] [--rounds 9]
+"""
+import argparse
+import random
+import time
+
+from api.bracket.engine import TeamEntry
+from api.bracket.swiss import SwissPlayer, pair_swiss
+
+
+def simulate(num_players, rounds, seed):
+    rng = random.Random(seed)
+    scores = dict.fromkeys(range(1, num_players + 1), 0)
+    played = {team_id: set() for team_id in scores}
+    had_bye = set()
+
+    timings, rematches = [], 0
+    for _ in range(rounds):
+        players = [
+            SwissPlayer(TeamEntry(team_id, team_id), scores[team_id], team_id in had_bye)
+            for team_id in sorted(scores, key=lambda team_id: (-scores[team_id], team_id))
+        ]
+
+        start = time.perf_counter()
+        pairing = pair_swiss(players, played)
+        timings.append(time.perf_counter() - start)
+        rematches += pairing.rematches
+
+        for entry1, entry2 in pairing.pairs:
+            played[entry1.team_id].add(entry2.team_id)
+            played[entry2.team_id].add(entry1.team_id)
+            scores[rng.choice((entry1, entry2)).team_id] += 1
+        if pairing.bye is not None:
+            had_bye.add(pairing.bye.team_id)
+            scores[pairing.bye.team_id] += 1
+
+    return timings, rematches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, nargs='+', default=[64, 512, 4096])
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'players':>8} {'rounds':>7} {'mean ms/round':>14} {'max ms/round':>13} {'rematches':>10}")
+    for num_players in args.players:
+        timings, rematches = simulate(num_players, args.rounds, args.seed)
+        print(f"{num_players:>8} {args.rounds:>7} {sum(timings) / len(timings) * 1000:>14.2f} "
+              f"{max(timings) * 1000:>13.2f} {rematches:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Swiss tiebreak recomputation timings.
+
+Builds the results of simulated Swiss tournaments and times
+compute_swiss_standings over all of them, as the standings stage does before
+every round. Nothing touches the database, so no Django setup is needed.
+
+Run from the backend directory:
+
+    python -m benchmarks.swiss_tiebreaks [--players 64 512 2000] [--rounds 9]
+"""
+import argparse
+import random
+import time
+
+from api.bracket.tiebreaks import compute_swiss_standings
+
+
+def simulate_results(num_players, rounds, seed):
+    rng = random.Random(seed)
+    team_ids = list(range(1, num_players + 1))
+    results, byes = [], []
+    for _ in range(rounds):
+        rng.shuffle(team_ids)
+        if num_players % 2 == 1:
+            byes.append(team_ids[-1])
+        for team1, team2 in zip(team_ids[0::2], team_ids[1::2]):
+            results.append((team1, team2, rng.randint(0, 3), rng.randint(0, 3)))
+    return sorted(team_ids), results, byes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, nargs='+', default=[64, 512, 2000])
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'players':>8} {'results':>8} {'mean ms':>8} {'max ms':>8}")
+    for num_players in args.players:
+        team_ids, results, byes = simulate_results(num_players, args.rounds, args.seed)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            compute_swiss_standings(team_ids, results, byes)
+            timings.append(time.perf_counter() - start)
+        print(f"{num_players:>8} {len(results):>8} {sum(timings) / len(timings) * 1000:>8.2f} "
+              f"{max(timings) * 1000:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
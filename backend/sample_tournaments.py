@@ -1,47 +1,64 @@
 import os
+import uuid
+from datetime import timedelta
 import django
 
 # Set up Django environment
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
 from api.models import User, Tournament
 
 def add_sample_tournaments():
-    # Create a user
-    user = User.objects.create(
-        role='Admin',
-        name='Admin User',
+    # Create a user, or reuse the one from an earlier run
+    user, _ = User.objects.get_or_create(
         email='admin@example.com',
-        phone='9876543210',
-        password='password123'
+        defaults={
+            'name': 'Admin User',
+            'phone': '9876543210',
+            'password': make_password('password123'),
+            'uuid': uuid.uuid4(),
+        }
     )
 
     # Add sample tournaments
+    now = timezone.now()
     Tournament.objects.bulk_create([
         Tournament(
-            startDate='2024-01-01',
-            endDate='2024-01-10',
-            status='Upcoming',
-            createdBy=user,
+            name='Sample Round Robin',
+            start_date=now + timedelta(days=30),
+            end_date=now + timedelta(days=39),
+            created_by=user,
             format='Round Robin',
-            teamSize=4
+            team_size=4,
+            show_email=False,
+            show_phone=False,
+            is_private=False
         ),
         Tournament(
-            startDate='2024-02-01',
-            endDate='2024-02-15',
-            status='Ongoing',
-            createdBy=user,
-            format='Knockout',
-            teamSize=8
+            name='Sample Single Elimination',
+            start_date=now - timedelta(days=2),
+            end_date=now + timedelta(days=12),
+            created_by=user,
+            format='Single Elimination',
+            team_size=8,
+            show_email=False,
+            show_phone=False,
+            is_private=False
         ),
         Tournament(
-            startDate='2023-12-01',
-            endDate='2023-12-10',
-            status='Completed',
-            createdBy=user,
+            name='Sample Double Elimination',
+            start_date=now - timedelta(days=60),
+            end_date=now - timedelta(days=51),
+            created_by=user,
             format='Double Elimination',
-            teamSize=6
+            team_size=6,
+            show_email=False,
+            show_phone=False,
+            is_private=False
         ),
     ])
 